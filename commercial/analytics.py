@@ -1,6 +1,6 @@
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta  # type: ignore
-from django.db.models import Sum
+from django.db.models import Case, IntegerField, Sum, Value, When
 from django.utils.dateparse import parse_date
 from decimal import Decimal, InvalidOperation
 
@@ -9,27 +9,74 @@ from technical.models import EnergyDelivered
 
 
 
+def _period_windows(mode, selected_date, week_number=None, from_date=None, to_date=None):
+    """
+    The five periods of a mode, oldest first, as (label, summary window,
+    delivered window). Windows are inclusive (first, last) date pairs: the
+    monthly tables are matched on their `month` column, EnergyDelivered on
+    `date`.
+    """
+    windows = []
+    if mode == "yearly":
+        for i in range(4, -1, -1):
+            year = selected_date.year - i
+            span = (date(year, 1, 1), date(year, 12, 31))
+            windows.append((str(year), span, span))
+    elif mode == "monthly":
+        for i in range(4, -1, -1):
+            month = selected_date - relativedelta(months=i)
+            month_end = month + relativedelta(months=1) - timedelta(days=1)
+            windows.append((month.strftime("%b"), (month, month), (month, month_end)))
+    elif mode == "weekly":
+        if week_number is not None:
+            # Weeks counted from Jan 1 of the reference year (week_number starts at 1)
+            reference = date(selected_date.year, 1, 1) + timedelta(days=(week_number - 1) * 7)
+        else:
+            reference = selected_date
+            week_number = selected_date.isocalendar().week
+        for idx, i in enumerate(range(4, -1, -1)):
+            start = reference - timedelta(days=i * 7)
+            span = (start, start + timedelta(days=6))
+            # Labelled Week N, Week N-1, ... from the specified week
+            windows.append((f"Week {week_number - idx}", span, span))
+    elif mode == "daily":
+        for i in range(4, -1, -1):
+            day = selected_date - relativedelta(days=i)
+            windows.append((day.strftime("%b %d, %Y"), (day, day), (day, day)))
+    else:  # range
+        length = relativedelta(to_date, from_date).days + 1
+        for i in range(4, -1, -1):
+            start = to_date - relativedelta(days=i * length)
+            end = start + relativedelta(days=length - 1)
+            label = f"{start.strftime('%b %d, %Y')} - {end.strftime('%b %d, %Y')}"
+            windows.append((label, (start, end), (start, end)))
+    return windows
+
+
+def _bucketed_sums(queryset, field, windows, **sums):
+    """
+    One grouped query: `sums` per window index, rows bucketed with a CASE
+    over the (first, last) windows of `field`. Windows don't overlap.
+    """
+    if not windows:
+        return {}
+    bucket = Case(
+        *[When(**{f"{field}__range": window}, then=Value(i)) for i, window in enumerate(windows)],
+        output_field=IntegerField(),
+    )
+    rows = (
+        queryset.filter(**{f"{field}__range": (min(w[0] for w in windows), max(w[1] for w in windows))})
+        .annotate(bucket=bucket)
+        .filter(bucket__isnull=False)
+        .order_by()
+        .values("bucket")
+        .annotate(**{name: Sum(column) for name, column in sums.items()})
+    )
+    return {row.pop("bucket"): row for row in rows}
+
+
 def get_commercial_overview_data(mode, year=None, month=None, week=None, from_date=None, to_date=None):
-    def generate_period_list(mode, reference_date, week_number=None):
-        periods = []
-        if mode == "yearly":
-            return [date(reference_date.year - i, 1, 1) for i in range(4, -1, -1)]
-        elif mode == "monthly":
-            return [reference_date - relativedelta(months=i) for i in range(4, -1, -1)]
-        elif mode == "weekly":
-            if week_number is not None:
-                # Find the first day of the year
-                year_start = date(reference_date.year, 1, 1)
-                # Adjust to the start of the specified week (week_number starts at 1)
-                week_start = year_start + timedelta(days=(week_number - 1) * 7)
-                return [week_start - timedelta(days=i * 7) for i in range(4, -1, -1)]
-            return [reference_date - timedelta(days=i * 7) for i in range(4, -1, -1)]
-        elif mode == "daily":
-            return [reference_date - relativedelta(days=i) for i in range(4, -1, -1)]
-        elif mode == "range":
-            delta = relativedelta(to_date, from_date).days + 1
-            return [to_date - relativedelta(days=i * delta) for i in range(4, -1, -1)]
-        return periods
+    week_number = None
 
     # Determine reference date based on mode
     if mode == "monthly":
@@ -42,7 +89,7 @@ def get_commercial_overview_data(mode, year=None, month=None, week=None, from_da
         selected_date = date(year, 1, 1)
     elif mode == "weekly":
         selected_date = parse_date(to_date) if to_date else date.today()
-        week_number = int(week) if week is not None else selected_date.isocalendar().week
+        week_number = int(week) if week is not None else None
     elif mode == "daily":
         selected_date = parse_date(to_date) if to_date else date.today()
     elif mode == "range":
@@ -52,7 +99,19 @@ def get_commercial_overview_data(mode, year=None, month=None, week=None, from_da
     else:
         raise ValueError("Invalid mode")
 
-    periods = generate_period_list(mode, selected_date, week_number=week)
+    periods = _period_windows(mode, selected_date, week_number, from_date, to_date)
+    summary_windows = [summary for _, summary, _ in periods]
+
+    # One query per source table for all five periods
+    summaries = _bucketed_sums(
+        MonthlyCommercialSummary.objects.all(), "month", summary_windows,
+        revenue_billed="revenue_billed", revenue_collected="revenue_collected",
+        customers_billed="customers_billed", customers_responded="customers_responded",
+    )
+    billed = _bucketed_sums(MonthlyEnergyBilled.objects.all(), "month", summary_windows, energy="energy_mwh")
+    delivered = _bucketed_sums(
+        EnergyDelivered.objects.all(), "date", [window for _, _, window in periods], energy="energy_mwh",
+    )
 
     data = {
         "energy_delivered": [],
@@ -66,102 +125,64 @@ def get_commercial_overview_data(mode, year=None, month=None, week=None, from_da
         "collections_per_customer": [],
         "customer_response_metric": []
     }
-
-    def append_with_delta(metric_list, value, label):
-        value = Decimal(value)
-        last_value = Decimal(str(metric_list[-1]["value"])) if metric_list else None
-
-        if last_value and last_value != 0:
-            delta = round(((value - last_value) / last_value) * Decimal("100"), 2)
-        else:
-            delta = None
-
-        metric_list.append({
-            "period": label,
-            "value": float(value),
-            "delta": float(delta) if delta is not None else None
-        })
-
-    for idx, period in enumerate(periods):
-        if mode == "yearly":
-            label = str(period.year)
-            filter_kwargs = {"month__year": period.year}
-            energy_delivered_filter = {"date__year": period.year}
-        elif mode == "monthly":
-            label = period.strftime("%b")
-            filter_kwargs = {"month": period}
-            energy_delivered_filter = {"date__year": period.year, "date__month": period.month}
-        elif mode == "weekly":
-            # Label as Week N, Week N-1, etc., based on the specified week
-            week_num = week_number - idx if week_number is not None else period.isocalendar().week
-            label = f"Week {week_num}"
-            week_end = period + timedelta(days=6)
-            filter_kwargs = {"month__gte": period, "month__lte": week_end}
-            energy_delivered_filter = {"date__gte": period, "date__lte": week_end}
-        elif mode == "daily":
-            label = period.strftime("%b %d, %Y")
-            filter_kwargs = {"month": period}
-            energy_delivered_filter = {"date": period}
-        else:  # range
-            delta = relativedelta(to_date, from_date).days + 1
-            label = f"{period.strftime('%b %d, %Y')} - {(period + relativedelta(days=delta-1)).strftime('%b %d, %Y')}"
-            filter_kwargs = {"month__gte": period, "month__lte": period + relativedelta(days=delta-1)}
-            energy_delivered_filter = {"date__gte": period, "date__lte": period + relativedelta(days=delta-1)}
-
-        summary = MonthlyCommercialSummary.objects.filter(**filter_kwargs).aggregate(
-            revenue_billed=Sum("revenue_billed"),
-            revenue_collected=Sum("revenue_collected"),
-            customers_billed=Sum("customers_billed"),
-            customers_responded=Sum("customers_responded"),
-        )
-        energy_billed = MonthlyEnergyBilled.objects.filter(**filter_kwargs).aggregate(
-            energy=Sum("energy_mwh")
-        )["energy"] or 0
-        energy_delivered = EnergyDelivered.objects.filter(**energy_delivered_filter).aggregate(
-            Sum("energy_mwh")
-        )["energy_mwh__sum"] or 0
-
-        revenue_billed = summary["revenue_billed"] or 0
-        revenue_collected = summary["revenue_collected"] or 0
-        customers_billed = summary["customers_billed"] or 0
-        customers_responded = summary["customers_responded"] or 0
+    with_delta = (
+        "energy_delivered", "energy_billed", "energy_collected", "customer_response_rate",
+        "revenue_billed_per_customer", "collections_per_customer", "customer_response_metric",
+    )
+    previous = {}
+
+    for i, (label, _, _) in enumerate(periods):
+        summary = summaries.get(i, {})
+        revenue_billed = Decimal(summary.get("revenue_billed") or 0)
+        revenue_collected = Decimal(summary.get("revenue_collected") or 0)
+        customers_billed = summary.get("customers_billed") or 0
+        customers_responded = summary.get("customers_responded") or 0
+        energy_billed = Decimal(billed.get(i, {}).get("energy") or 0)
+        energy_delivered = Decimal(delivered.get(i, {}).get("energy") or 0)
 
         try:
-            billing_eff = Decimal(energy_billed) / Decimal(energy_delivered) if energy_delivered else Decimal(0)
-            collection_eff = Decimal(revenue_collected) / Decimal(revenue_billed) if revenue_billed else Decimal(0)
+            billing_eff = energy_billed / energy_delivered if energy_delivered else Decimal(0)
+            collection_eff = revenue_collected / revenue_billed if revenue_billed else Decimal(0)
             atcc = Decimal(1) - (billing_eff * collection_eff)
 
+            revenue_billed_pc = round(revenue_billed / customers_billed, 2) if customers_billed else Decimal(0)
+            collections_pc = round(revenue_collected / customers_billed, 2) if customers_billed else Decimal(0)
+            response_rate = (
+                round(Decimal(customers_responded) / customers_billed * Decimal("100"), 2)
+                if customers_billed else Decimal(0)
+            )
+            response_metric = round(collections_pc / revenue_billed_pc, 2) if revenue_billed_pc != 0 else Decimal(0)
+
             billing_eff_pct = round(billing_eff * Decimal("100"), 2)
             collection_eff_pct = round(collection_eff * Decimal("100"), 2)
             atcc_pct = round(atcc * Decimal("100"), 2)
-
-            revenue_billed_pc = round(Decimal(revenue_billed) / Decimal(customers_billed), 2) if customers_billed else Decimal(0)
-            collections_pc = round(Decimal(revenue_collected) / Decimal(customers_billed), 2) if customers_billed else Decimal(0)
-            response_rate = round(Decimal(customers_responded) / Decimal(customers_billed) * Decimal("100"), 2) if customers_billed else Decimal(0)
-
-            response_metric = (
-                round(collections_pc / revenue_billed_pc, 2)
-                if revenue_billed_pc != 0
-                else Decimal(0)
-            )
-
         except (InvalidOperation, ZeroDivisionError):
             billing_eff_pct = collection_eff_pct = atcc_pct = Decimal(0)
             revenue_billed_pc = collections_pc = response_rate = response_metric = Decimal(0)
 
-        append_with_delta(data["energy_delivered"], energy_delivered, label)
-        append_with_delta(data["energy_billed"], energy_billed, label)
-        append_with_delta(data["energy_collected"], revenue_collected, label)
+        values = {
+            "energy_delivered": energy_delivered,
+            "energy_billed": energy_billed,
+            "energy_collected": revenue_collected,
+            "customer_response_rate": response_rate,
+            "revenue_billed_per_customer": revenue_billed_pc,
+            "collections_per_customer": collections_pc,
+            "customer_response_metric": response_metric,
+        }
+        for name in with_delta:
+            value, last = values[name], previous.get(name)
+            delta = round((value - last) / last * Decimal("100"), 2) if last else None
+            data[name].append({
+                "period": label,
+                "value": float(value),
+                "delta": float(delta) if delta is not None else None,
+            })
+        previous = values
 
         data["billing_efficiency"].append({"period": label, "value": float(billing_eff_pct)})
         data["collection_efficiency"].append({"period": label, "value": float(collection_eff_pct)})
         data["atcc"].append({"period": label, "value": float(atcc_pct)})
 
-        append_with_delta(data["customer_response_rate"], response_rate, label)
-        append_with_delta(data["revenue_billed_per_customer"], revenue_billed_pc, label)
-        append_with_delta(data["collections_per_customer"], collections_pc, label)
-        append_with_delta(data["customer_response_metric"], response_metric, label)
-
     return data
 
 
@@ -0,0 +1,101 @@
+# commercial/counters.py
+"""
+Maintained customer counts.
+
+CustomerCounter has one row per (transformer, band, category, metering_type).
+commercial.signals adjusts it on every Customer save and delete. Code that
+writes customers without signals (bulk_create, queryset update())
+calls customers_created() or reconcile(); the nightly
+reconcile_customer_counters command repairs whatever drift is left.
+
+Scoped counts sum a few counter rows instead of scanning Customer:
+
+    count_customers(transformer__feeder__business_district__slug="ikeja", category="Prepaid")
+"""
+from collections import Counter
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Customer, CustomerCounter
+
+KEY_FIELDS = ("transformer_id", "band_id", "category", "metering_type")
+
+
+def counter_key(customer):
+    return tuple(getattr(customer, field) for field in KEY_FIELDS)
+
+
+def adjust(deltas):
+    """Add {key: delta} to the counters, creating the rows that don't exist yet."""
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        lookup = dict(zip(KEY_FIELDS, key))
+        rows = CustomerCounter.objects.filter(**lookup)
+        if rows.update(count=F("count") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                CustomerCounter.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # Another writer created the row since our update
+            rows.update(count=F("count") + delta)
+
+
+def customers_created(customers):
+    """Count customers inserted without signals (bulk_create, imports)."""
+    adjust(Counter(counter_key(customer) for customer in customers))
+
+
+def count_customers(**lookups):
+    """Customers matching `lookups`, which must only use the counter's key fields."""
+    return CustomerCounter.objects.filter(**lookups).aggregate(total=Sum("count"))["total"] or 0
+
+
+def live_counts(transformer_ids=None):
+    """{key: customers} counted from the Customer table."""
+    customers = Customer.objects.all()
+    if transformer_ids is not None:
+        customers = customers.filter(transformer_id__in=transformer_ids)
+    rows = customers.order_by().values(*KEY_FIELDS).annotate(n=Count("pk"))
+    return {tuple(row[field] for field in KEY_FIELDS): row["n"] for row in rows}
+
+
+def reconcile(transformer_ids=None, dry_run=False):
+    """
+    Recount customers and rewrite the counters that drifted. Returns
+    {key: (stored, actual)} for every counter changed (or, with dry_run,
+    that would be).
+    """
+    with transaction.atomic():
+        connection = connections[router.db_for_write(Customer)]
+        if connection.vendor == "postgresql" and not dry_run:
+            # Block customer writes until we commit, so none land between the recount and the rewrite
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(Customer._meta.db_table)} IN SHARE MODE")
+
+        counters = CustomerCounter.objects.all()
+        if transformer_ids is not None:
+            counters = counters.filter(transformer_id__in=transformer_ids)
+        stored = {tuple(row[:4]): (row[4], row[5]) for row in counters.values_list(*KEY_FIELDS, "pk", "count")}
+        actual = live_counts(transformer_ids)
+
+        drift, to_update, to_create, to_delete = {}, [], [], []
+        for key in stored.keys() | actual.keys():
+            pk, count = stored.get(key, (None, 0))
+            live = actual.get(key, 0)
+            if count != live:
+                drift[key] = (count, live)
+            if pk is None:
+                to_create.append(CustomerCounter(count=live, **dict(zip(KEY_FIELDS, key))))
+            elif not live:
+                to_delete.append(pk)
+            elif count != live:
+                to_update.append(CustomerCounter(pk=pk, count=live))
+
+        if not dry_run:
+            CustomerCounter.objects.filter(pk__in=to_delete).delete()
+            CustomerCounter.objects.bulk_update(to_update, ["count"], batch_size=1000)
+            CustomerCounter.objects.bulk_create(to_create, batch_size=1000)
+    return drift
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0006_remove_monthlyrevenuebilled_created_at_and_more'),
+        ('common', '0003_alter_distributiontransformer_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailycollection',
+            index=models.Index(fields=['date', 'transformer'], name='dailycollection_date_tx_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlycommercialsummary',
+            index=models.Index(fields=['month', 'transformer'], name='commsummary_month_tx_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyrevenuebilled',
+            index=models.Index(fields=['month', 'transformer'], name='revenuebilled_month_tx_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_customers(apps, schema_editor):
+    Customer = apps.get_model('commercial', 'Customer')
+    CustomerCounter = apps.get_model('commercial', 'CustomerCounter')
+    fields = ('transformer_id', 'band_id', 'category', 'metering_type')
+    rows = Customer.objects.order_by().values(*fields).annotate(n=Count('pk'))
+    CustomerCounter.objects.bulk_create(
+        (CustomerCounter(count=row.pop('n'), **row) for row in rows), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0007_dailycollection_dailycollection_date_tx_idx_and_more'),
+        ('common', '0003_alter_distributiontransformer_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('Prepaid', 'Prepaid'), ('Postpaid', 'Postpaid'), ('Unmetered', 'Unmetered')], max_length=20)),
+                ('metering_type', models.CharField(choices=[('MD1', 'MD1'), ('MD2', 'MD2'), ('Non-MD', 'Non-MD')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('band', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='common.band')),
+                ('transformer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_counters', to='common.distributiontransformer')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('transformer', 'band', 'category', 'metering_type'), name='customercounter_key_uniq'), models.UniqueConstraint(condition=models.Q(('band__isnull', True)), fields=('transformer', 'category', 'metering_type'), name='customercounter_unbanded_key_uniq')],
+            },
+        ),
+        migrations.RunPython(count_existing_customers, migrations.RunPython.noop),
+    ]
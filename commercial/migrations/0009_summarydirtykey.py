@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0008_customercounter'),
+        ('common', '0003_alter_distributiontransformer_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryDirtyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sales_rep', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='commercial.salesrepresentative')),
+                ('transformer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.distributiontransformer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['marked_at'], name='summarydirtykey_marked_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sales_rep', 'transformer', 'month'), name='summarydirtykey_key_uniq')],
+            },
+        ),
+    ]
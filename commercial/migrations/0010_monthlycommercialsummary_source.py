@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commercial', '0009_summarydirtykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlycommercialsummary',
+            name='source',
+            field=models.CharField(choices=[('feeds', 'Built from feeds'), ('imported', 'Imported')], default='imported', max_length=10),
+        ),
+    ]
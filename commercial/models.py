@@ -28,6 +28,34 @@ class Customer(UUIDModel, models.Model):
         return self.name
 
 
+class CustomerCounter(models.Model):
+    """
+    Number of customers per (transformer, band, category, metering_type),
+    kept current by commercial.signals and reconciled nightly
+    (reconcile_customer_counters). See commercial.counters.
+    """
+    transformer = models.ForeignKey(DistributionTransformer, on_delete=models.CASCADE, related_name='customer_counters')
+    band = models.ForeignKey(Band, on_delete=models.CASCADE, null=True, blank=True)
+    category = models.CharField(max_length=20, choices=Customer.CATEGORY_CHOICES)
+    metering_type = models.CharField(max_length=20, choices=Customer.METERING_TYPE_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['transformer', 'band', 'category', 'metering_type'], name='customercounter_key_uniq'
+            ),
+            # NULLs never collide in the constraint above
+            models.UniqueConstraint(
+                fields=['transformer', 'category', 'metering_type'], condition=models.Q(band__isnull=True),
+                name='customercounter_unbanded_key_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.transformer} / {self.band or '-'} / {self.category} / {self.metering_type}: {self.count}"
+
+
 class DailyEnergyDelivered(UUIDModel, models.Model):
     feeder = models.ForeignKey('common.Feeder', on_delete=models.CASCADE)
     date = models.DateField()
@@ -94,6 +122,9 @@ class MonthlyRevenueBilled(UUIDModel, models.Model):
     class Meta:
         unique_together = ('sales_rep', 'transformer', 'month')
         ordering = ['-month', 'sales_rep', 'transformer']
+        indexes = [
+            models.Index(fields=['month', 'transformer'], name='revenuebilled_month_tx_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sales_rep.name} - {self.transformer.name} - {self.month.strftime('%Y-%m')} - ₦{self.amount} ({self.customers_billed} customers)"
@@ -146,6 +177,9 @@ class DailyCollection(UUIDModel, models.Model):
     class Meta:
         unique_together = ("sales_rep", "transformer", "date", "collection_type", "vendor_name")
         ordering = ['-date', 'sales_rep', 'transformer']
+        indexes = [
+            models.Index(fields=['date', 'transformer'], name='dailycollection_date_tx_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sales_rep.name} - {self.transformer.name} - {self.date} - ₦{self.amount} ({self.customers_collected} customers)"
@@ -163,6 +197,19 @@ class DailyCollection(UUIDModel, models.Model):
 
 
 class MonthlyCommercialSummary(UUIDModel):
+    """
+    Billed and collected totals per (sales rep, transformer, month).
+    commercial.summaries builds FEEDS rows from MonthlyRevenueBilled and
+    DailyCollection; IMPORTED rows (legacy history, anything written
+    directly) are left alone by it unless a rebuild is told to replace them.
+    """
+    FEEDS = 'feeds'
+    IMPORTED = 'imported'
+    SOURCE_CHOICES = (
+        (FEEDS, 'Built from feeds'),
+        (IMPORTED, 'Imported'),
+    )
+
     sales_rep = models.ForeignKey(SalesRepresentative, on_delete=models.CASCADE)
     transformer = models.ForeignKey(DistributionTransformer, on_delete=models.CASCADE)
     month = models.DateField()
@@ -173,10 +220,37 @@ class MonthlyCommercialSummary(UUIDModel):
     revenue_billed = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     revenue_collected = models.DecimalField(max_digits=15, decimal_places=2, default=0)
 
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=IMPORTED)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("sales_rep", "transformer", "month")
+        indexes = [
+            models.Index(fields=["month", "transformer"], name="commsummary_month_tx_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.sales_rep.name} - {self.transformer.name} - {self.month.strftime('%Y-%m')}"
+
+
+class SummaryDirtyKey(models.Model):
+    """
+    A (sales_rep, transformer, month) whose MonthlyCommercialSummary must be
+    recomputed because its DailyCollection or MonthlyRevenueBilled rows
+    changed. Queued by commercial.signals, drained by commercial.summaries.
+    """
+    sales_rep = models.ForeignKey(SalesRepresentative, on_delete=models.CASCADE)
+    transformer = models.ForeignKey(DistributionTransformer, on_delete=models.CASCADE)
+    month = models.DateField()
+    marked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sales_rep', 'transformer', 'month'], name='summarydirtykey_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['marked_at'], name='summarydirtykey_marked_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.sales_rep.name} - {self.transformer.name} - {self.month.strftime('%Y-%m')}"
\ No newline at end of file
+        return f"{self.sales_rep_id} / {self.transformer_id} / {self.month:%Y-%m}"
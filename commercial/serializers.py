@@ -59,6 +59,12 @@ class DailyCollectionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class MonthlyCommercialSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MonthlyCommercialSummary
+        fields = '__all__'
+
+
 class OverviewMetricSerializer(serializers.Serializer):
     month = serializers.CharField()
 
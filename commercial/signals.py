@@ -0,0 +1,70 @@
+# commercial/signals.py
+from collections import Counter
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from common.models import Band
+
+from .counters import KEY_FIELDS, adjust, counter_key
+from .models import Customer, CustomerCounter, DailyCollection, MonthlyRevenueBilled
+from .summaries import FEEDS, mark_dirty, month_start, summary_key
+
+
+@receiver(pre_save, sender=Customer)
+def remember_customer_key(sender, instance, **kwargs):
+    # The key the customer is counted under now, None if it isn't stored yet
+    instance._counter_key = sender.objects.filter(pk=instance.pk).values_list(*KEY_FIELDS).first()
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, **kwargs):
+    deltas = Counter({counter_key(instance): 1})
+    old = getattr(instance, "_counter_key", None)
+    if old is not None:
+        deltas[old] -= 1
+    adjust(deltas)
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    adjust({counter_key(instance): -1})
+
+
+@receiver(pre_delete, sender=Band)
+def band_deleting(sender, instance, **kwargs):
+    # Customer.band is SET_NULL (no signals): move the band's counts to the unbanded rows before they cascade away
+    rows = CustomerCounter.objects.filter(band=instance).values_list("transformer_id", "category", "metering_type", "count")
+    adjust({(transformer_id, None, category, metering_type): count
+            for transformer_id, category, metering_type, count in rows})
+
+
+@receiver(pre_save, sender=MonthlyRevenueBilled)
+@receiver(pre_save, sender=DailyCollection)
+def remember_summary_key(sender, instance, **kwargs):
+    # The summary the row rolls up into now, if it is stored already and the update could move it
+    instance._summary_key = None
+    if not instance._state.adding:
+        row = sender.objects.filter(pk=instance.pk).values_list("sales_rep_id", "transformer_id", FEEDS[sender]).first()
+        if row is not None:
+            instance._summary_key = (row[0], row[1], month_start(row[2]))
+
+
+@receiver(post_save, sender=MonthlyRevenueBilled)
+@receiver(post_save, sender=DailyCollection)
+def feed_saved(sender, instance, **kwargs):
+    keys = {summary_key(instance)}
+    old = getattr(instance, "_summary_key", None)
+    if old is not None:
+        keys.add(old)
+    mark_dirty(keys)
+
+
+@receiver(post_delete, sender=MonthlyRevenueBilled)
+@receiver(post_delete, sender=DailyCollection)
+def feed_deleted(sender, instance, origin=None, **kwargs):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    # Cascades from a sales rep or transformer take its summaries (and queued keys) with them
+    if origin_model in FEEDS:
+        mark_dirty([summary_key(instance)])
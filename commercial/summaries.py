@@ -0,0 +1,230 @@
+# commercial/summaries.py
+"""
+Incremental MonthlyCommercialSummary builder.
+
+A summary row is (sales_rep, transformer, month) with
+    revenue_billed / customers_billed        ← MonthlyRevenueBilled amount / customers_billed
+    revenue_collected / customers_responded  ← DailyCollection amount / customers_collected, summed over the month
+
+commercial.signals queues the key of every feed row saved or deleted
+(old and new key when an update moves it) in SummaryDirtyKey.
+process_dirty() recomputes just those keys and upserts them in bulk; the
+bulk_* actions of the feed viewsets call refresh_after_ingest(), which runs
+it inline or, once background jobs are enabled (JOB_DEFER_ROWS), queues it
+as a commercial.refresh_summaries job (common.jobs), and
+build_commercial_summaries drains whatever is left. Writes that skip
+signals (bulk_create, queryset update()) call mark_dirty() themselves, or
+are repaired with `build_commercial_summaries --rebuild --from --to`.
+
+The builder only owns the rows it wrote (source=FEEDS). IMPORTED rows, such
+as the legacy history import_legacy_data loads without feed rows behind
+it, are never deleted and keep their totals when feed rows for their key
+show up; rebuild_range(..., replace_imported=True) hands those keys over.
+
+    mark_dirty([(sales_rep_id, transformer_id, date(2025, 3, 1))])
+    process_dirty()                                # {"keys": 1, "upserted": 1, "deleted": 0, "kept": 0}
+    rebuild_range(date(2024, 1, 1), date(2025, 3, 1))
+"""
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from common.jobs import enqueue, register
+
+from .models import DailyCollection, MonthlyCommercialSummary, MonthlyRevenueBilled, SummaryDirtyKey
+
+KEY_FIELDS = ("sales_rep_id", "transformer_id", "month")
+
+# Feed model → its date field
+FEEDS = {MonthlyRevenueBilled: "month", DailyCollection: "date"}
+
+SUMMARY_FIELDS = ("customers_billed", "customers_responded", "revenue_billed", "revenue_collected")
+
+
+def month_start(day):
+    if isinstance(day, str):
+        day = parse_date(day)
+    return day.replace(day=1)
+
+
+def summary_key(row):
+    """The summary key a MonthlyRevenueBilled or DailyCollection row rolls up into."""
+    return row.sales_rep_id, row.transformer_id, month_start(getattr(row, FEEDS[type(row)]))
+
+
+def mark_dirty(keys):
+    """Queue summary keys for recomputation; re-marking a queued key bumps its marked_at."""
+    now = timezone.now()
+    SummaryDirtyKey.objects.bulk_create(
+        [SummaryDirtyKey(marked_at=now, **dict(zip(KEY_FIELDS, key))) for key in set(keys) if None not in key],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["sales_rep", "transformer", "month"],
+        update_fields=["marked_at"],
+    )
+
+
+def _feed_totals(keys=None, month_from=None, month_to=None):
+    """
+    {key: summary fields} computed from the feeds, for `keys` or for every
+    key between month_from and month_to (inclusive, first days of months).
+    """
+    if keys is not None:
+        keys = set(keys)
+        if not keys:
+            return {}
+        months = [key[2] for key in keys]
+        month_from, month_to = min(months), max(months)
+        scope = {
+            "sales_rep_id__in": {key[0] for key in keys},
+            "transformer_id__in": {key[1] for key in keys},
+        }
+    else:
+        scope = {}
+
+    billed = (
+        MonthlyRevenueBilled.objects.filter(month__gte=month_from, month__lt=_next_month(month_to), **scope)
+        .annotate(summary_month=TruncMonth("month"))
+        .order_by()
+        .values("sales_rep_id", "transformer_id", "summary_month")
+        .annotate(revenue_billed=Sum("amount"), customers_billed=Sum("customers_billed"))
+    )
+    collected = (
+        DailyCollection.objects.filter(date__gte=month_from, date__lt=_next_month(month_to), **scope)
+        .annotate(summary_month=TruncMonth("date"))
+        .order_by()
+        .values("sales_rep_id", "transformer_id", "summary_month")
+        .annotate(revenue_collected=Sum("amount"), customers_responded=Sum("customers_collected"))
+    )
+
+    totals = {}
+    for rows in (billed, collected):
+        for row in rows:
+            key = (row.pop("sales_rep_id"), row.pop("transformer_id"), row.pop("summary_month"))
+            # The id lists cross-multiply: drop pairs nobody asked for
+            if keys is not None and key not in keys:
+                continue
+            fields = totals.setdefault(key, dict.fromkeys(SUMMARY_FIELDS, 0))
+            fields.update((name, value or 0) for name, value in row.items())
+    return totals
+
+
+def _next_month(day):
+    return day + relativedelta(months=1)
+
+
+def _existing(summaries):
+    """{key: (pk, source)} for a MonthlyCommercialSummary queryset."""
+    return {row[2:]: row[:2] for row in summaries.values_list("pk", "source", *KEY_FIELDS)}
+
+
+def _plan(totals, existing, replace_imported=False):
+    """
+    Split `totals` against the `existing` summaries of the same scope into
+    (rows to upsert, builder summary ids that lost all their feed rows,
+    number of imported summaries left as they are).
+    """
+    imported = {key for key, (_, source) in existing.items() if source == MonthlyCommercialSummary.IMPORTED}
+    if replace_imported:
+        kept = imported - totals.keys()
+    else:
+        kept = imported
+        totals = {key: fields for key, fields in totals.items() if key not in imported}
+    stale = [pk for key, (pk, source) in existing.items()
+             if source == MonthlyCommercialSummary.FEEDS and key not in totals]
+    return totals, stale, len(kept)
+
+
+def _write(totals, stale, kept):
+    """Upsert `totals` as builder rows and delete the summaries in `stale` (ids)."""
+    MonthlyCommercialSummary.objects.bulk_create(
+        [
+            MonthlyCommercialSummary(**dict(zip(KEY_FIELDS, key)), **fields, source=MonthlyCommercialSummary.FEEDS)
+            for key, fields in totals.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["sales_rep", "transformer", "month"],
+        update_fields=[*SUMMARY_FIELDS, "source"],
+    )
+    deleted = MonthlyCommercialSummary.objects.filter(pk__in=stale).delete()[0] if stale else 0
+    return {"upserted": len(totals), "deleted": deleted, "kept": kept}
+
+
+def rebuild(keys):
+    """Recompute the builder's summaries of `keys` from the feeds; imported ones are kept."""
+    keys = set(keys)
+    existing = _existing(MonthlyCommercialSummary.objects.filter(
+        sales_rep_id__in={key[0] for key in keys},
+        transformer_id__in={key[1] for key in keys},
+        month__in={key[2] for key in keys},
+    ))
+    existing = {key: row for key, row in existing.items() if key in keys}
+    return _write(*_plan(_feed_totals(keys), existing))
+
+
+def rebuild_range(month_from, month_to, dry_run=False, replace_imported=False):
+    """
+    Recompute every summary from month_from to month_to (inclusive) and drop
+    the builder's summaries without feed rows. Imported summaries are kept;
+    with replace_imported, those whose key has feed rows are overwritten.
+    With dry_run, only report what would change.
+    """
+    month_from, month_to = month_start(month_from), month_start(month_to)
+    started = timezone.now()
+    with transaction.atomic():
+        totals, stale, kept = _plan(
+            _feed_totals(month_from=month_from, month_to=month_to),
+            _existing(MonthlyCommercialSummary.objects.filter(month__gte=month_from, month__lte=month_to)),
+            replace_imported,
+        )
+        if dry_run:
+            return {"upserted": len(totals), "deleted": len(stale), "kept": kept}
+        result = _write(totals, stale, kept)
+        # What was queued in the range before we read the feeds is current now
+        SummaryDirtyKey.objects.filter(month__gte=month_from, month__lte=month_to, marked_at__lte=started).delete()
+    return result
+
+
+def process_dirty(batch_size=1000):
+    """
+    Recompute the queued keys, oldest first, batch_size keys per transaction.
+    Keys re-marked while a batch runs keep their newer marked_at and stay
+    queued for the next run.
+    """
+    started = timezone.now()
+    result = {"keys": 0, "upserted": 0, "deleted": 0, "kept": 0}
+    while True:
+        batch = list(
+            SummaryDirtyKey.objects.filter(marked_at__lte=started)
+            .order_by("marked_at", "pk")
+            .values_list("pk", *KEY_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return result
+        with transaction.atomic():
+            written = rebuild(row[1:] for row in batch)
+            SummaryDirtyKey.objects.filter(pk__in=[row[0] for row in batch], marked_at__lte=started).delete()
+        result["keys"] += len(batch)
+        for name in ("upserted", "deleted", "kept"):
+            result[name] += written[name]
+
+
+@register("commercial.refresh_summaries")
+def refresh_summaries():
+    return process_dirty()
+
+
+def refresh_after_ingest():
+    """
+    Bring the summaries up to date after a bulk feed write. Inline unless
+    background jobs are enabled (JOB_DEFER_ROWS), since only then is a
+    run_workers process there to pick up the queued refresh.
+    """
+    if getattr(settings, "JOB_DEFER_ROWS", 0):
+        return enqueue("commercial.refresh_summaries", coalesce=True)
+    return process_dirty()
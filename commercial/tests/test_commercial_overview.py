@@ -0,0 +1,52 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from commercial.analytics import get_commercial_overview_data
+from commercial.models import MonthlyCommercialSummary, MonthlyEnergyBilled
+from common.factories import DistributionTransformerFactory, SalesRepresentativeFactory
+from technical.models import EnergyDelivered
+
+
+@pytest.fixture
+def facts():
+    rep = SalesRepresentativeFactory()
+    transformer = DistributionTransformerFactory()
+    for month, billed, collected in ((date(2025, 2, 1), 1000, 500), (date(2025, 3, 1), 2000, 1500)):
+        MonthlyCommercialSummary.objects.create(
+            sales_rep=rep, transformer=transformer, month=month, customers_billed=10, customers_responded=4,
+            revenue_billed=Decimal(billed), revenue_collected=Decimal(collected),
+        )
+        MonthlyEnergyBilled.objects.create(feeder=transformer.feeder, month=month, energy_mwh=Decimal("40"))
+    for day in (date(2025, 2, 10), date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 31)):
+        EnergyDelivered.objects.create(feeder=transformer.feeder, date=day, energy_mwh=Decimal("25"))
+
+
+def _series(data, name):
+    return [(point["period"], point["value"]) for point in data[name]]
+
+
+@pytest.mark.django_db
+def test_monthly_buckets_and_derived_series(facts):
+    data = get_commercial_overview_data("monthly", year=2025, month=3)
+    assert _series(data, "energy_delivered")[-2:] == [("Feb", 25.0), ("Mar", 75.0)]
+    assert _series(data, "energy_collected")[-2:] == [("Feb", 500.0), ("Mar", 1500.0)]
+    assert data["energy_collected"][-1]["delta"] == 200.0
+    assert _series(data, "billing_efficiency")[-1] == ("Mar", 53.33)
+    assert _series(data, "collection_efficiency")[-1] == ("Mar", 75.0)
+    assert _series(data, "atcc")[-1] == ("Mar", 60.0)
+    assert _series(data, "revenue_billed_per_customer")[-1] == ("Mar", 200.0)
+    assert _series(data, "customer_response_rate")[-1] == ("Mar", 40.0)
+    assert _series(data, "energy_billed")[0] == ("Nov", 0.0)
+
+
+@pytest.mark.django_db
+def test_daily_and_range_windows(facts):
+    daily = get_commercial_overview_data("daily", to_date="2025-03-02")
+    # The monthly tables only count on the day their month column falls on
+    assert _series(daily, "energy_billed")[-2:] == [("Mar 01, 2025", 40.0), ("Mar 02, 2025", 0.0)]
+    assert _series(daily, "energy_delivered")[-2:] == [("Mar 01, 2025", 25.0), ("Mar 02, 2025", 25.0)]
+
+    ranged = get_commercial_overview_data("range", from_date="2025-03-01", to_date="2025-03-10")
+    assert [point["period"] for point in ranged["energy_delivered"]][-1] == "Mar 10, 2025 - Mar 19, 2025"
+    assert _series(ranged, "energy_delivered")[-2][1] == 50.0  # Mar 01 - Mar 09 window
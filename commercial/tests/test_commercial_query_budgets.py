@@ -0,0 +1,32 @@
+import pytest
+from common.testing import assert_query_budget
+
+
+# Ceilings measured on build_network(4). Lower them as endpoints are optimised;
+# a rise means a new per-row query (N+1) slipped into commercial/views.py.
+QUERY_BUDGETS = [
+    ("/api/overview/?year=2025&month=3", 45),
+    ("/api/metrics/sales-rep-summary/", 1),
+    ("/api/metrics/commercial/overview/?year=2025&month=3", 3),
+    ("/api/metrics/commercial/overview/?mode=yearly&year=2025", 3),
+    ("/api/metrics/commercial/overview/?mode=weekly&to_date=2025-03-20", 3),
+    ("/api/metrics/commercial/overview/?mode=range&from_date=2025-03-01&to_date=2025-03-10", 3),
+    ("/api/metrics/commercial/all-states/?year=2025&month=3", 85),
+    ("/api/metrics/commercial/state/?state=Hub&year=2025&month=3", 11),
+    ("/api/metrics/commercial/business-districts/?state=Hub&year=2025&month=3", 19),
+    ("/api/metrics/commercial/business-metrics/?year=2025&month=3", 80),
+    ("/api/metrics/commercial/service-band-metrics/?year=2025&month=3", 19),
+    ("/api/metrics/feeders/performance/?year=2025&month=3", 37),
+    ("/api/metrics/feeders/list/?state=Hub", 26),
+    ("/api/commercial/collections/", 1),
+    ("/api/commercial/monthly-commercial-summaries/", 1),
+    ("/api/daily-energy-delivered/", 1),
+    ("/api/commercial/sales-reps/", 13),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url,budget", QUERY_BUDGETS)
+def test_commercial_query_budget(api_client, build_network, url, budget):
+    build_network(4)
+    assert_query_budget(api_client, url, budget)
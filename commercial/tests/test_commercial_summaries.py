@@ -0,0 +1,150 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from commercial.models import DailyCollection, MonthlyCommercialSummary, MonthlyRevenueBilled, SummaryDirtyKey
+from commercial.summaries import mark_dirty, process_dirty, rebuild_range
+from common.jobs import work
+from common.factories import DistributionTransformerFactory, SalesRepresentativeFactory
+
+
+def _summaries():
+    return {
+        (s.sales_rep_id, s.transformer_id, s.month): (
+            s.revenue_billed, s.customers_billed, s.revenue_collected, s.customers_responded
+        )
+        for s in MonthlyCommercialSummary.objects.all()
+    }
+
+
+def _collect(rep, dt, day, amount, customers, vendor="Bank"):
+    return DailyCollection.objects.create(
+        sales_rep=rep, transformer=dt, date=day, amount=amount, customers_collected=customers,
+        collection_type="Prepaid", vendor_name=vendor,
+    )
+
+
+@pytest.fixture
+def feeds(db):
+    rep, dt = SalesRepresentativeFactory(), DistributionTransformerFactory()
+    MonthlyRevenueBilled.objects.create(sales_rep=rep, transformer=dt, month=date(2025, 3, 1),
+                                        amount=Decimal("1000.00"), customers_billed=40)
+    _collect(rep, dt, date(2025, 3, 4), Decimal("300.00"), 10)
+    _collect(rep, dt, date(2025, 3, 20), Decimal("150.00"), 5, vendor="POS")
+    _collect(rep, dt, date(2025, 4, 2), Decimal("80.00"), 3)
+    return rep, dt
+
+
+@pytest.mark.django_db
+def test_feed_writes_queue_and_rebuild_only_their_keys(feeds):
+    rep, dt = feeds
+    march, april = (rep.id, dt.id, date(2025, 3, 1)), (rep.id, dt.id, date(2025, 4, 1))
+    assert set(SummaryDirtyKey.objects.values_list("sales_rep_id", "transformer_id", "month")) == {march, april}
+
+    assert process_dirty() == {"keys": 2, "upserted": 2, "deleted": 0, "kept": 0}
+    assert _summaries() == {
+        march: (Decimal("1000.00"), 40, Decimal("450.00"), 15),
+        april: (Decimal("0.00"), 0, Decimal("80.00"), 3),
+    }
+    assert not SummaryDirtyKey.objects.exists()
+
+    # Moving a collection to another month recomputes both months; deleting the last feed row drops the summary
+    moved = DailyCollection.objects.get(date=date(2025, 4, 2))
+    moved.date = date(2025, 3, 28)
+    moved.save()
+    assert process_dirty()["keys"] == 2
+    assert _summaries()[march][2:] == (Decimal("530.00"), 18)
+    assert process_dirty()["keys"] == 0
+
+    MonthlyRevenueBilled.objects.all().delete()
+    DailyCollection.objects.all().delete()
+    assert process_dirty() == {"keys": 1, "upserted": 0, "deleted": 1, "kept": 0}
+    assert _summaries() == {}
+
+
+def _post_collection(api_client, rep, dt):
+    response = api_client.post("/api/commercial/daily-collections/bulk_create/", {"collections": [{
+        "sales_rep_id": rep.slug, "dt_id": dt.slug, "date": "2025-03-21", "amount": "50.00",
+        "customers_collected": 2, "collection_type": "Postpaid", "vendor_name": "Cash",
+    }]}, format="json")
+    assert response.status_code == 200 and response.data["created"] == 1, response.data
+
+
+@pytest.mark.django_db
+def test_bulk_create_action_refreshes_summaries_inline(api_client, feeds):
+    rep, dt = feeds
+    process_dirty()
+    _post_collection(api_client, rep, dt)
+    # No worker is assumed while background jobs are off
+    assert _summaries()[(rep.id, dt.id, date(2025, 3, 1))][2:] == (Decimal("500.00"), 17)
+    assert not SummaryDirtyKey.objects.exists()
+    assert work(once=True) == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_action_queues_a_summary_refresh(api_client, feeds, settings):
+    settings.JOB_DEFER_ROWS = 500
+    rep, dt = feeds
+    process_dirty()
+    _post_collection(api_client, rep, dt)
+    # The action queues the recompute; a worker runs it
+    assert SummaryDirtyKey.objects.exists()
+    assert work(once=True) == 1
+    assert _summaries()[(rep.id, dt.id, date(2025, 3, 1))][2:] == (Decimal("500.00"), 17)
+    assert not SummaryDirtyKey.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_command_backfills_a_window(feeds):
+    rep, dt = feeds
+    process_dirty()
+    # Writes that skip signals leave the summaries behind until a rebuild
+    DailyCollection.objects.filter(date=date(2025, 3, 4)).update(amount=Decimal("400.00"))
+    stray = MonthlyCommercialSummary.objects.create(sales_rep=rep, transformer=DistributionTransformerFactory(),
+                                                    month=date(2025, 3, 1), revenue_billed=5,
+                                                    source=MonthlyCommercialSummary.FEEDS)
+    assert rebuild_range(date(2025, 3, 1), date(2025, 3, 1), dry_run=True) == {"upserted": 1, "deleted": 1, "kept": 0}
+
+    out = StringIO()
+    call_command("build_commercial_summaries", "--rebuild", "--from", "2025-03", "--to", "2025-03", stdout=out)
+    assert "1 summaries upserted, 1 deleted, 0 imported kept" in out.getvalue()
+    assert not MonthlyCommercialSummary.objects.filter(pk=stray.pk).exists()
+    assert _summaries()[(rep.id, dt.id, date(2025, 3, 1))][2] == Decimal("550.00")
+
+    mark_dirty([(rep.id, dt.id, date(2025, 4, 1))])
+    out = StringIO()
+    call_command("build_commercial_summaries", stdout=out)
+    assert "Recomputed 1 queued keys" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_imported_summaries_are_kept(feeds):
+    rep, dt = feeds
+    february, march = (rep.id, dt.id, date(2025, 2, 1)), (rep.id, dt.id, date(2025, 3, 1))
+    # Legacy history: February has no feed rows at all, March was imported before its feeds arrived
+    for month, amount in ((date(2025, 2, 1), 700), (date(2025, 3, 1), 900)):
+        MonthlyCommercialSummary.objects.create(sales_rep=rep, transformer=dt, month=month,
+                                                revenue_billed=amount, revenue_collected=amount)
+    imported = (Decimal("900.00"), 0, Decimal("900.00"), 0)
+
+    assert process_dirty() == {"keys": 2, "upserted": 1, "deleted": 0, "kept": 1}
+    _collect(rep, dt, date(2025, 3, 30), Decimal("10.00"), 1)
+    process_dirty()
+    assert _summaries()[march] == imported
+
+    out = StringIO()
+    call_command("build_commercial_summaries", "--rebuild", "--from", "2025-02", "--to", "2025-04", stdout=out)
+    assert "1 summaries upserted, 0 deleted, 2 imported kept" in out.getvalue()
+    assert _summaries()[march] == imported
+
+    out = StringIO()
+    call_command("build_commercial_summaries", "--rebuild", "--from", "2025-02", "--to", "2025-04",
+                 "--replace-imported", stdout=out)
+    assert "2 summaries upserted, 0 deleted, 1 imported kept" in out.getvalue()
+    summaries = _summaries()
+    assert summaries[march] == (Decimal("1000.00"), 40, Decimal("460.00"), 16)
+    assert summaries[february] == (Decimal("700.00"), 0, Decimal("700.00"), 0)
+    assert MonthlyCommercialSummary.objects.get(month=date(2025, 3, 1)).source == MonthlyCommercialSummary.FEEDS
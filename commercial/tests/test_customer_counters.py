@@ -0,0 +1,77 @@
+import pytest
+from io import StringIO
+
+from django.core.management import call_command
+
+from common.models import Band, DistributionTransformer, Feeder, InjectionSubstation
+from commercial.counters import count_customers, customers_created, live_counts, reconcile
+from commercial.models import Customer, CustomerCounter
+
+
+def _stored():
+    return {
+        (c.transformer_id, c.band_id, c.category, c.metering_type): c.count
+        for c in CustomerCounter.objects.exclude(count=0)
+    }
+
+
+@pytest.fixture
+def network():
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation)
+    transformers = [DistributionTransformer.objects.create(name=f"T{i}", feeder=feeder) for i in range(2)]
+    return transformers, Band.objects.create(name="A")
+
+
+@pytest.mark.django_db
+def test_signals_keep_counters_in_step(network):
+    (t1, t2), band = network
+    a = Customer.objects.create(name="A", category="Prepaid", metering_type="MD1", band=band, transformer=t1)
+    Customer.objects.create(name="B", category="Prepaid", metering_type="MD1", band=band, transformer=t1)
+    c = Customer.objects.create(name="C", category="Postpaid", metering_type="Non-MD", transformer=t2)
+    assert _stored() == live_counts()
+
+    a.transformer, a.category = t2, "Postpaid"
+    a.save()
+    c.delete()
+    assert _stored() == live_counts()
+    assert count_customers(transformer=t2) == 1
+
+    # Customer.band is SET_NULL: the counts follow the customers to "no band"
+    band.delete()
+    assert _stored() == live_counts()
+    assert count_customers(band__isnull=True) == 2
+
+
+@pytest.mark.django_db
+def test_bulk_hook_and_reconcile(network):
+    (t1, t2), band = network
+    customers = Customer.objects.bulk_create([
+        Customer(name=f"C{i}", category="Prepaid", metering_type="MD2", band=band, transformer=t1) for i in range(3)
+    ])
+    customers_created(customers)
+    assert count_customers(transformer=t1, category="Prepaid") == 3
+
+    # Queryset updates bypass the signals until the nightly reconcile
+    Customer.objects.filter(name="C0").update(transformer=t2)
+    assert reconcile(dry_run=True) == {
+        (t1.id, band.id, "Prepaid", "MD2"): (3, 2),
+        (t2.id, band.id, "Prepaid", "MD2"): (0, 1),
+    }
+    assert count_customers(transformer=t1) == 3
+
+    out = StringIO()
+    call_command("reconcile_customer_counters", stdout=out)
+    assert "2 drifted counters fixed" in out.getvalue()
+    assert _stored() == live_counts()
+    assert reconcile() == {}
+
+
+@pytest.mark.django_db
+def test_customer_count_estimate_uses_counters(api_client, network):
+    (t1, _), band = network
+    for category in ("Prepaid", "Prepaid", "Postpaid"):
+        Customer.objects.create(name=category, category=category, metering_type="MD1", band=band, transformer=t1)
+
+    response = api_client.get(f"/api/customers/?count=estimate&transformer={t1.slug}&category=Prepaid")
+    assert response.data == {"count": 2, "estimated": False}
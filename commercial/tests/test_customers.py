@@ -0,0 +1,64 @@
+import pytest
+from datetime import date
+
+from common.models import Band, BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+from common.pagination import estimated_count
+from common.testing import query_budget
+from commercial.models import Customer
+
+
+@pytest.fixture
+def customers():
+    state = State.objects.create(name="Lagos")
+    district = BusinessDistrict.objects.create(name="Ikeja", state=state)
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation, business_district=district)
+    transformer = DistributionTransformer.objects.create(name="T1", feeder=feeder)
+    band = Band.objects.create(name="A")
+    rows = [
+        ("Prepaid", "MD1", band), ("Prepaid", "Non-MD", band),
+        ("Postpaid", "Non-MD", None), ("Unmetered", "Non-MD", band), ("Prepaid", "MD1", None),
+    ]
+    for i, (category, metering_type, customer_band) in enumerate(rows):
+        Customer.objects.create(name=f"C{i}", category=category, metering_type=metering_type,
+                                band=customer_band, transformer=transformer, joined_date=date(2025, 1, i + 1))
+    return district
+
+
+@pytest.mark.django_db
+def test_customer_count_modes(api_client, customers):
+    assert api_client.get("/api/customers/").data == {"count": 5}
+    assert api_client.get(f"/api/customers/?district={customers.slug}&category=Prepaid").data == {"count": 3}
+    # No planner estimate off PostgreSQL (and too few rows anyway): exact count
+    assert api_client.get("/api/customers/?count=estimate").data == {"count": 5, "estimated": False}
+    assert estimated_count(Customer.objects.none()) == (0, True)
+
+
+@pytest.mark.django_db
+def test_customer_facets_in_one_query(api_client, customers):
+    with query_budget(1):
+        response = api_client.get("/api/customers/?facets=true")
+    assert response.data == {
+        "count": 5,
+        "facets": {
+            "category": {"Prepaid": 3, "Postpaid": 1, "Unmetered": 1},
+            "metering_type": {"MD1": 2, "Non-MD": 3},
+            "band": {"a": 3, "none": 2},
+        },
+    }
+
+
+@pytest.mark.django_db
+def test_customer_details_are_paginated_and_projected(api_client, customers):
+    seen, url = [], "/api/customers/?details=true&page_size=2&fields=name,category"
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert all(set(row) == {"name", "category"} for row in response.data["results"])
+        seen.extend(row["name"] for row in response.data["results"])
+        url = response.data["next"]
+    assert sorted(seen) == [f"C{i}" for i in range(5)]
+
+    full = api_client.get("/api/customers/?details=true").data["results"][0]
+    assert set(full) == {"id", "name", "category", "metering_type", "band", "transformer", "joined_date"}
+    assert api_client.get("/api/customers/?details=true&fields=name,secret").status_code == 400
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from common.models import State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer
+from commercial.models import SalesRepresentative, DailyCollection
+
+
+@pytest.fixture
+def collections():
+    state = State.objects.create(name="Kano")
+    district = BusinessDistrict.objects.create(name="Hub", state=state)
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation, business_district=district)
+    transformer = DistributionTransformer.objects.create(name="T1", feeder=feeder)
+    rep = SalesRepresentative.objects.create(name="Rep", slug="rep")
+    for day in range(1, 6):
+        DailyCollection.objects.create(
+            sales_rep=rep, transformer=transformer, date=date(2025, 3, day),
+            amount=Decimal("100.50"), collection_type="Prepaid", vendor_name="Bank",
+        )
+    return transformer
+
+
+def _body(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_filtered_rows(api_client, collections):
+    response = api_client.get("/api/commercial/daily-collections/?format=csv&stream=1&date_from=2025-03-02")
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv"
+
+    rows = list(csv.DictReader(io.StringIO(_body(response))))
+    assert len(rows) == 4
+    assert rows[0]["amount"] == "100.50"
+    assert rows[0]["transformer"] == str(collections.id)
+
+
+@pytest.mark.django_db
+def test_ndjson_export_matches_list_fields(api_client, collections):
+    response = api_client.get("/api/commercial/daily-collections/?format=ndjson&stream=1")
+    lines = [json.loads(line) for line in _body(response).splitlines()]
+    listed = api_client.get("/api/commercial/daily-collections/").data["results"]
+
+    assert len(lines) == len(listed) == 5
+    assert set(lines[0]) == set(listed[0])
+
+
+@pytest.mark.django_db
+def test_format_without_stream_is_not_an_export(api_client, collections):
+    assert api_client.get("/api/commercial/daily-collections/?format=csv").status_code == 404
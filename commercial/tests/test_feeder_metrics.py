@@ -0,0 +1,47 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from commercial.models import DailyEnergyDelivered, MonthlyEnergyBilled, MonthlyRevenueBilled
+from common.factories import DistributionTransformerFactory, FeederFactory, SalesRepresentativeFactory
+from common.testing import query_budget
+
+
+@pytest.fixture
+def feeders():
+    rep = SalesRepresentativeFactory()
+    feeders = FeederFactory.create_batch(3)
+    for i, feeder in enumerate(feeders, 1):
+        DailyEnergyDelivered.objects.create(feeder=feeder, date=date(2025, 3, 1), energy_mwh=Decimal("100"))
+        DailyEnergyDelivered.objects.create(feeder=feeder, date=date(2025, 3, 2), energy_mwh=Decimal("100"))
+        MonthlyEnergyBilled.objects.create(feeder=feeder, month=date(2025, 3, 1), energy_mwh=Decimal(50 * i))
+        transformer = DistributionTransformerFactory(feeder=feeder)
+        MonthlyRevenueBilled.objects.create(
+            sales_rep=rep, transformer=transformer, month=date(2025, 3, 1), amount=Decimal(1000 * i),
+        )
+    return feeders
+
+
+@pytest.mark.django_db
+def test_feeder_metrics_in_one_query(api_client, feeders):
+    url = "/api/metrics/feeder/?month_from=2025-03-01&month_to=2025-03-01&date_from=2025-03-01&date_to=2025-03-31"
+    with query_budget(1):
+        response = api_client.get(url)
+
+    assert response.status_code == 200
+    rows = {row["feeder"]: row for row in response.data}
+    assert len(rows) == 3
+    third = rows[feeders[2].name]
+    assert third["energy_delivered"] == Decimal("200")
+    assert third["energy_billed"] == Decimal("150")
+    assert third["revenue_billed"] == Decimal("3000")
+    assert third["billing_efficiency"] == 75.0
+    assert third["atc_c"] == 100.0
+
+
+@pytest.mark.django_db
+def test_top_and_bottom_n_are_slices_of_the_ranking(api_client, feeders):
+    ranking = [row["feeder_id"] for row in api_client.get("/api/metrics/feeder/").data]
+    assert [row["feeder_id"] for row in api_client.get("/api/metrics/feeder/?top_n=2").data] == ranking[:2]
+    assert [row["feeder_id"] for row in api_client.get("/api/metrics/feeder/?bottom_n=2").data] == ranking[-2:]
@@ -1,32 +1,34 @@
 from common.models import Feeder
 from commercial.models import Customer
-from common.models import BusinessDistrict, State
+from common.dimensions import get_network
+from common.tree import get_tree
 
 def get_filtered_feeders(request):
     filters = {}
 
     if 'business_district' in request.GET:
-        district_name = request.GET.get('business_district')
-        try:
-            district = BusinessDistrict.objects.get(name__iexact=district_name)
-            filters['business_district'] = district
-        except BusinessDistrict.DoesNotExist:
+        districts = get_network().districts.named(request.GET.get('business_district'))
+        if not districts:
             return Feeder.objects.none()
+        filters['business_district_id__in'] = [district.id for district in districts]
 
     elif 'state' in request.GET:
-        state_name = request.GET.get('state')
-        try:
-            state = State.objects.get(name__iexact=state_name)
-            filters['business_district__state'] = state
-        except State.DoesNotExist:
+        state = get_network().states.by_name(request.GET.get('state'))
+        if state is None:
             return Feeder.objects.none()
+        filters['business_district_id__in'] = get_tree().ids_under('state', state.id, 'district')
 
     return Feeder.objects.filter(**filters).distinct()
 
 
 
-def get_filtered_customers(request):
-    customers = Customer.objects.all()
+def get_customer_lookups(request):
+    """
+    Location, band, category and metering type filters. Every lookup goes
+    through transformer/band/category/metering_type, so they apply to
+    Customer and CustomerCounter alike.
+    """
+    lookups = {}
 
     # Location filters
     state = request.GET.get('state')
@@ -37,27 +39,36 @@ def get_filtered_customers(request):
     band = request.GET.get('band')
 
     if transformer:
-        customers = customers.filter(transformer__slug=transformer)
+        lookups['transformer__slug'] = transformer
     elif feeder:
-        customers = customers.filter(transformer__feeder__slug=feeder)
+        lookups['transformer__feeder__slug'] = feeder
     elif substation:
-        customers = customers.filter(transformer__feeder__substation__slug=substation)
+        lookups['transformer__feeder__substation__slug'] = substation
     elif district:
-        customers = customers.filter(transformer__feeder__substation__district__slug=district)
+        lookups['transformer__feeder__business_district__slug'] = district
     elif state:
-        customers = customers.filter(transformer__feeder__substation__district__state__slug=state)
+        lookups['transformer__feeder__business_district__state__slug'] = state
 
     if band:
-        customers = customers.filter(band__slug=band)
+        lookups['band__slug'] = band
 
     # Other filters
     category = request.GET.get('category')
     if category:
-        customers = customers.filter(category=category)
+        lookups['category'] = category
 
     metering_type = request.GET.get('metering_type')
     if metering_type:
-        customers = customers.filter(metering_type=metering_type)
+        lookups['metering_type'] = metering_type
+
+    return lookups
+
+
+CUSTOMER_DATE_PARAMS = ('joined_date', 'joined_from', 'joined_to')
+
+
+def get_filtered_customers(request):
+    customers = Customer.objects.filter(**get_customer_lookups(request))
 
     # Date filtering
     joined_date = request.GET.get('joined_date')
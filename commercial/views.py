@@ -6,8 +6,10 @@ from dateutil.relativedelta import relativedelta  # type: ignore
 
 from django.db.models import (
     Sum, F, FloatField, ExpressionWrapper, Q,
-    Case, When, Value, Count, Avg, DurationField
+    Case, When, Value, Count, Avg, DurationField,
+    DecimalField, OuterRef, Subquery,
 )
+from django.db.models.functions import Cast, Coalesce
 from django.utils.dateparse import parse_date
 
 from rest_framework import viewsets, status
@@ -26,13 +28,22 @@ from commercial.models import (
 )
 from commercial.date_filters import get_date_range_from_request
 from commercial.mixins import FeederFilteredQuerySetMixin
-from commercial.utils import get_filtered_customers
+from common.concurrency import run_concurrently
+from common.dimensions import get_network
+from common.memo import memoize
+from common.mixins import DeferredActionMixin, FastReadMixin, StreamingExportMixin
+from common.pagination import KeysetPagination, estimated_count
+from common.tree import get_tree
+from common.serializers import ValuesSerializer
+from commercial.counters import count_customers
+from commercial.summaries import refresh_after_ingest
+from commercial.utils import CUSTOMER_DATE_PARAMS, get_customer_lookups, get_filtered_customers
 from commercial.metrics import (
     get_sales_rep_performance_summary
 )
 from commercial.analytics import get_commercial_overview_data
 
-from technical.models import EnergyDelivered, HourlyLoad, FeederInterruption
+from technical.models import EnergyDelivered, FeederInterruption, DailyHoursOfSupply
 from financial.models import Opex, SalaryPayment, NBETInvoice, MOInvoice
 from commercial.models import MonthlyRevenueBilled
 
@@ -50,25 +61,71 @@ def round_two_places(value):
     return Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
-class CustomerViewSet(viewsets.ViewSet):
+class CustomerViewSet(viewsets.GenericViewSet):
     """
-    Custom ViewSet to return either customer details or just counts
+    Customer counts, facets or details for the location/band/category filters.
+
+        ?count=estimate  summed from CustomerCounter when no joined_* filter is given,
+                         else the planner estimate instead of COUNT(*) for large results
+        ?facets=true     counts by category, metering_type and band (one GROUP BY)
+        ?details=true    keyset-paginated rows; ?fields=name,category to project columns
     """
+    serializer_class = CustomerSerializer
+    pagination_class = KeysetPagination
+    facet_fields = {"category": "category", "metering_type": "metering_type", "band": "band__slug"}
 
     def list(self, request):
         customers = get_filtered_customers(request)
 
         # Show full data only if explicitly asked for
         if request.GET.get("details") == "true":
-            serializer = CustomerSerializer(customers, many=True)
-            return Response(serializer.data)
-        else:
-            count = customers.count()
-            return Response({"count": count})
+            return self.details(request, customers)
+        if request.GET.get("facets") == "true":
+            return Response(self.facets(customers))
+        if request.GET.get("count") == "estimate":
+            if not any(request.GET.get(param) for param in CUSTOMER_DATE_PARAMS):
+                return Response({"count": count_customers(**get_customer_lookups(request)), "estimated": False})
+            count, exact = estimated_count(customers)
+            return Response({"count": count, "estimated": not exact})
+        return Response({"count": customers.count()})
+
+    def details(self, request, customers):
+        mapper = ValuesSerializer.for_serializer(self.get_serializer_class())
+        fields = request.GET.get("fields")
+        if fields:
+            names = {name.strip() for name in fields.split(",") if name.strip()}
+            unknown = names - set(mapper.names)
+            if unknown:
+                return Response({"error": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            mapper = mapper.only(names)
+
+        # The paginator reads its position back off each row
+        ordering = [attname for attname, _, _ in self.paginator.get_ordering(customers, self)]
+        rows = customers.values(*dict.fromkeys((*mapper.paths, *ordering)))
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(mapper.many(page))
+
+    def facets(self, customers):
+        groups = (
+            customers.order_by()
+            .values(*self.facet_fields.values())
+            .annotate(n=Count("pk"))
+        )
+        facets = {name: {} for name in self.facet_fields}
+        total = 0
+        for row in groups:
+            total += row["n"]
+            for name, path in self.facet_fields.items():
+                key = row[path] if row[path] is not None else "none"
+                facets[name][key] = facets[name].get(key, 0) + row["n"]
+        return {"count": total, "facets": facets}
 
 
-class DailyEnergyDeliveredViewSet(FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
+class DailyEnergyDeliveredViewSet(FastReadMixin, FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
     serializer_class = DailyEnergyDeliveredSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', 'feeder')
 
     def get_queryset(self):
         queryset = DailyEnergyDelivered.objects.all()
@@ -175,7 +232,7 @@ class DailyEnergyDeliveredViewSet(FeederFilteredQuerySetMixin, viewsets.ModelVie
 #             'by_state': by_state
 #         })
 
-class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
+class MonthlyRevenueBilledViewSet(DeferredActionMixin, FastReadMixin, viewsets.ModelViewSet):
     serializer_class = MonthlyRevenueBilledSerializer
 
     def get_queryset(self):
@@ -285,6 +342,10 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
             return None
             
         slug = dt_id.strip()
+        # Most uploads name existing transformers; only new ones miss the snapshot
+        transformer = get_network().transformers.by_slug(slug.lower())
+        if transformer is not None:
+            return transformer.id
         try:
             transformer = DistributionTransformer.objects.get(slug__iexact=slug)
             print(f"Transformer '{slug}' resolved to PK: {transformer.id}")
@@ -359,6 +420,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk_create')
     def bulk_create(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         # """Test endpoint to verify URL routing works"""
         # return Response({'message': 'URL routing works!', 'viewset': 'MonthlyRevenueBilledViewSet'})
 
@@ -434,6 +498,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
                     print(f"Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': revenue_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'created': len(created), 'updated': len(updated), 'errors': len(errors),
                          'created_data': created, 'updated_data': updated}
         if errors:
@@ -442,6 +509,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['patch'], url_path='bulk_update')
     def bulk_update(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         revenue_data = request.data.get('revenues', [])
         print(f"Received {len(revenue_data)} revenue records for bulk update")
         if not revenue_data:
@@ -525,6 +595,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
                     print(f"UPDATE Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': revenue_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'updated': len(updated), 'errors': len(errors), 'updated_data': updated}
         if errors:
             response_data['error_details'] = errors
@@ -532,6 +605,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'], url_path='bulk_delete')
     def bulk_delete(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         revenue_data = request.data.get('revenues', [])
         print(f"Received {len(revenue_data)} revenue records for bulk delete")
         if not revenue_data:
@@ -599,6 +675,9 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
                     print(f"DELETE Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': revenue_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'deleted': deleted, 'errors': len(errors)}
         if errors:
             response_data['error_details'] = errors
@@ -687,8 +766,51 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
 #             'by_sales_rep': by_sales_rep
 #         })
 
-class DailyCollectionViewSet(viewsets.ModelViewSet):
+class MonthlyCommercialSummaryViewSet(StreamingExportMixin, FastReadMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = MonthlyCommercialSummarySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-month', 'transformer', 'sales_rep')
+    page_size = 500
+    max_page_size = 5000
+
+    def get_queryset(self):
+        queryset = MonthlyCommercialSummary.objects.all()
+
+        state_name = self.request.GET.get('state')
+        district_name = self.request.GET.get('business_district')
+        feeder_slug = self.request.GET.get('feeder')
+        transformer_slug = self.request.GET.get('transformer')
+
+        if transformer_slug:
+            queryset = queryset.filter(transformer__slug=transformer_slug)
+        elif feeder_slug:
+            queryset = queryset.filter(transformer__feeder__slug=feeder_slug)
+        elif district_name:
+            queryset = queryset.filter(transformer__feeder__business_district__name__iexact=district_name)
+        elif state_name:
+            queryset = queryset.filter(transformer__feeder__business_district__state__name__iexact=state_name)
+
+        sales_rep_slug = self.request.GET.get('sales_rep')
+        if sales_rep_slug:
+            queryset = queryset.filter(sales_rep__slug=sales_rep_slug)
+
+        month_from, month_to = get_date_range_from_request(self.request, 'month')
+
+        if month_from and month_to:
+            queryset = queryset.filter(month__range=(month_from, month_to))
+        elif month_from:
+            queryset = queryset.filter(month__gte=month_from)
+        elif month_to:
+            queryset = queryset.filter(month__lte=month_to)
+
+        return queryset
+
+
+class DailyCollectionViewSet(DeferredActionMixin, StreamingExportMixin, FastReadMixin, viewsets.ModelViewSet):
     serializer_class = DailyCollectionSerializer
+    pagination_class = KeysetPagination
+    page_size = 500
+    max_page_size = 5000
 
     def get_queryset(self):
         queryset = DailyCollection.objects.all()
@@ -790,6 +912,10 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
             return None
             
         slug = dt_id.strip()
+        # Most uploads name existing transformers; only new ones miss the snapshot
+        transformer = get_network().transformers.by_slug(slug.lower())
+        if transformer is not None:
+            return transformer.id
         try:
             transformer = DistributionTransformer.objects.get(slug__iexact=slug)
             print(f"Transformer '{slug}' resolved to PK: {transformer.id}")
@@ -864,6 +990,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk_create')
     def bulk_create(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         collection_data = request.data.get('collections', [])
         print(f"Received {len(collection_data)} collection records for bulk create")
         if not collection_data:
@@ -933,6 +1062,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
                     print(f"Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': collection_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'created': len(created), 'updated': len(updated), 'errors': len(errors),
                          'created_data': created, 'updated_data': updated}
         if errors:
@@ -941,6 +1073,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['patch'], url_path='bulk_update')
     def bulk_update(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         collection_data = request.data.get('collections', [])
         print(f"Received {len(collection_data)} collection records for bulk update")
         if not collection_data:
@@ -1028,6 +1163,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
                     print(f"UPDATE Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': collection_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'updated': len(updated), 'errors': len(errors), 'updated_data': updated}
         if errors:
             response_data['error_details'] = errors
@@ -1035,6 +1173,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'], url_path='bulk_delete')
     def bulk_delete(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         collection_data = request.data.get('collections', [])
         print(f"Received {len(collection_data)} collection records for bulk delete")
         if not collection_data:
@@ -1106,6 +1247,9 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
                     print(f"DELETE Exception at {idx}: {e}")
                     errors.append({'index': idx, 'data': collection_item, 'errors': str(e)})
 
+        # Recompute the monthly summaries this batch touched
+        refresh_after_ingest()
+
         response_data = {'deleted': deleted, 'errors': len(errors)}
         if errors:
             response_data['error_details'] = errors
@@ -1113,7 +1257,7 @@ class DailyCollectionViewSet(viewsets.ModelViewSet):
 
 
 
-class MonthlyEnergyBilledViewSet(FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
+class MonthlyEnergyBilledViewSet(FastReadMixin, FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
     serializer_class = MonthlyEnergyBilledSerializer
 
     def get_queryset(self):
@@ -1131,7 +1275,7 @@ class MonthlyEnergyBilledViewSet(FeederFilteredQuerySetMixin, viewsets.ModelView
         return queryset
 
 
-class MonthlyCustomerStatsViewSet(FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
+class MonthlyCustomerStatsViewSet(FastReadMixin, FeederFilteredQuerySetMixin, viewsets.ModelViewSet):
     serializer_class = MonthlyCustomerStatsSerializer
 
     def get_queryset(self):
@@ -1152,7 +1296,34 @@ class MonthlyCustomerStatsViewSet(FeederFilteredQuerySetMixin, viewsets.ModelVie
 # Aggregated Metrics Endpoint
 from rest_framework.views import APIView
 
+def _feeder_total(qs, feeder_path, field):
+    """Per-feeder Sum(field) of `qs` as a correlated subquery (0 when there are no rows)."""
+    total = (
+        qs.filter(**{feeder_path: OuterRef("pk")})
+        .order_by()
+        .values(feeder_path)
+        .annotate(total=Sum(field))
+        .values("total")
+    )
+    return Coalesce(Subquery(total), Value(Decimal("0")), output_field=DecimalField(max_digits=20, decimal_places=2))
+
+
+def _percentage(numerator, denominator):
+    """numerator / denominator × 100 in SQL, 0 when the denominator is 0."""
+    return Case(
+        When(**{f"{denominator}__gt": 0}, then=Cast(numerator, FloatField()) * 100.0 / Cast(denominator, FloatField())),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
 class FeederMetricsView(APIView):
+    """
+    Energy/revenue figures and ATC&C per feeder. Every figure, the efficiencies
+    and ATC&C are computed in one SQL statement, so ordering by ATC&C and the
+    top_n / bottom_n limit run in the database.
+    """
+
     def get(self, request):
         month_from = request.GET.get('month_from')
         month_to = request.GET.get('month_to')
@@ -1170,55 +1341,61 @@ class FeederMetricsView(APIView):
         if date_to:
             date_to = datetime.strptime(date_to, "%Y-%m-%d").date()
 
-        feeders = get_filtered_feeders(request)
-        metrics = []
-
-        for feeder in feeders:
-            energy_billed = MonthlyEnergyBilled.objects.filter(
-                feeder=feeder,
-                month__range=(month_from, month_to)
-            ).aggregate(total=Sum('energy_mwh'))['total'] or 0
-
-            energy_delivered = DailyEnergyDelivered.objects.filter(
-                feeder=feeder,
-                date__range=(date_from, date_to)
-            ).aggregate(total=Sum('energy_mwh'))['total'] or 0
-
-            # revenue_collected = DailyRevenueCollected.objects.filter(
-            #     feeder=feeder,
-            #     date__range=(date_from, date_to)
-            # ).aggregate(total=Sum('amount'))['total'] or 0
-            revenue_collected=0
-
-            revenue_billed = MonthlyRevenueBilled.objects.filter(
-                feeder=feeder,
-                month__range=(month_from, month_to)
-            ).aggregate(total=Sum('amount'))['total'] or 0
-
-            collection_eff = (revenue_collected / revenue_billed) * 100 if revenue_billed else 0
-            billing_eff = (energy_billed / energy_delivered) * 100 if energy_delivered else 0
-            atc_c = 100 - (billing_eff * collection_eff / 100)
-
-            metrics.append({
-                "feeder_id": feeder.id,
-                "feeder": feeder.name,
-                "energy_billed": energy_billed,
-                "energy_delivered": energy_delivered,
-                "revenue_collected": revenue_collected,
-                "revenue_billed": revenue_billed,
-                "collection_efficiency": round(collection_eff, 2),
-                "billing_efficiency": round(billing_eff, 2),
-                "atc_c": round(atc_c, 2),
-            })
+        def in_range(qs, field, start, end):
+            if start:
+                qs = qs.filter(**{f"{field}__gte": start})
+            if end:
+                qs = qs.filter(**{f"{field}__lte": end})
+            return qs
+
+        # revenue_collected stays 0 until a collections source is wired in
+        feeders = get_filtered_feeders(request).annotate(
+            energy_billed=_feeder_total(
+                in_range(MonthlyEnergyBilled.objects.all(), "month", month_from, month_to), "feeder", "energy_mwh"
+            ),
+            energy_delivered=_feeder_total(
+                in_range(DailyEnergyDelivered.objects.all(), "date", date_from, date_to), "feeder", "energy_mwh"
+            ),
+            revenue_billed=_feeder_total(
+                in_range(MonthlyRevenueBilled.objects.all(), "month", month_from, month_to), "transformer__feeder", "amount"
+            ),
+            revenue_collected=Value(Decimal("0"), output_field=DecimalField(max_digits=20, decimal_places=2)),
+        ).annotate(
+            collection_efficiency=_percentage("revenue_collected", "revenue_billed"),
+            billing_efficiency=_percentage("energy_billed", "energy_delivered"),
+        ).annotate(
+            atc_c=ExpressionWrapper(
+                Value(100.0) - F("billing_efficiency") * F("collection_efficiency") / 100.0,
+                output_field=FloatField(),
+            ),
+        ).values(
+            "id", "name", "energy_billed", "energy_delivered", "revenue_collected", "revenue_billed",
+            "collection_efficiency", "billing_efficiency", "atc_c",
+        )
 
-        # Sort and slice by ATC&C
-        metrics.sort(key=lambda x: x['atc_c'])
+        # Ascending ATC&C; bottom_n is the tail of that order, fetched descending and flipped back
         if top_n:
-            metrics = metrics[:int(top_n)]
+            rows = list(feeders.order_by("atc_c", "pk")[:int(top_n)])
         elif bottom_n:
-            metrics = metrics[-int(bottom_n):]
-
-        return Response(metrics)    
+            rows = list(feeders.order_by("-atc_c", "-pk")[:int(bottom_n)])[::-1]
+        else:
+            rows = list(feeders.order_by("atc_c", "pk"))
+
+        metrics = [
+            {
+                "feeder_id": row["id"],
+                "feeder": row["name"],
+                "energy_billed": row["energy_billed"],
+                "energy_delivered": row["energy_delivered"],
+                "revenue_collected": row["revenue_collected"],
+                "revenue_billed": row["revenue_billed"],
+                "collection_efficiency": round(row["collection_efficiency"], 2),
+                "billing_efficiency": round(row["billing_efficiency"], 2),
+                "atc_c": round(row["atc_c"], 2),
+            }
+            for row in rows
+        ]
+        return Response(metrics)
 
 
 class SalesRepresentativeViewSet(viewsets.ModelViewSet):
@@ -1246,7 +1423,7 @@ class SalesRepresentativeViewSet(viewsets.ModelViewSet):
 
 #         return qs
 
-class SalesRepPerformanceViewSet(viewsets.ModelViewSet):
+class SalesRepPerformanceViewSet(DeferredActionMixin, viewsets.ModelViewSet):
     serializer_class = SalesRepPerformanceSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['sales_rep', 'transformer', 'month']
@@ -1290,6 +1467,10 @@ class SalesRepPerformanceViewSet(viewsets.ModelViewSet):
             return None
             
         slug = dt_id.strip()
+        # Most uploads name existing transformers; only new ones miss the snapshot
+        transformer = get_network().transformers.by_slug(slug.lower())
+        if transformer is not None:
+            return transformer.id
         try:
             transformer = DistributionTransformer.objects.get(slug__iexact=slug)
             print(f"Transformer '{slug}' resolved to PK: {transformer.id}")
@@ -1364,6 +1545,9 @@ class SalesRepPerformanceViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk_create')
     def bulk_create(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         performance_data = request.data.get('performances', [])
         print(f"Received {len(performance_data)} performance records for bulk create")
         if not performance_data:
@@ -1439,6 +1623,9 @@ class SalesRepPerformanceViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['patch'], url_path='bulk_update')
     def bulk_update(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         performance_data = request.data.get('performances', [])
         print(f"Received {len(performance_data)} performance records for bulk update")
         if not performance_data:
@@ -1529,6 +1716,9 @@ class SalesRepPerformanceViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'], url_path='bulk_delete')
     def bulk_delete(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         performance_data = request.data.get('performances', [])
         print(f"Received {len(performance_data)} performance records for bulk delete")
         if not performance_data:
@@ -1830,9 +2020,13 @@ def commercial_state_metrics_view(request):
     from_date = request.query_params.get("from_date")
     to_date = request.query_params.get("to_date")
 
-    state = State.objects.filter(name__iexact=state_name).first()
+    network = get_network()
+    state = network.states.by_name(state_name)
     if not state:
         return Response({"error": "Invalid state"}, status=400)
+    tree = get_tree()
+    district_ids = tree.ids_under("state", state.id, "district")
+    feeder_ids = tree.ids_under("state", state.id, "feeder")
 
     def generate_month_list(reference_date):
         return [reference_date - relativedelta(months=i) for i in range(4, -1, -1)]
@@ -1845,7 +2039,7 @@ def commercial_state_metrics_view(request):
 
     for m in months:
         reps = SalesRepresentative.objects.filter(
-            assigned_transformers__feeder__business_district__state=state
+            assigned_transformers__feeder__business_district_id__in=district_ids
         ).distinct()
 
         summaries = MonthlyCommercialSummary.objects.filter(
@@ -1855,7 +2049,7 @@ def commercial_state_metrics_view(request):
         )
 
         delivered = EnergyDelivered.objects.filter(
-            feeder__business_district__state=state,
+            feeder_id__in=feeder_ids,
             date__year=m.year,
             date__month=m.month,
         ).aggregate(Sum("energy_mwh"))['energy_mwh__sum'] or Decimal(0)
@@ -2054,102 +2248,94 @@ class OverviewAPIView(APIView):
             target = target or datetime.today().replace(day=1)
             months = [(target - relativedelta(months=i)).replace(day=1) for i in range(5)][::-1]
 
+        def month_queries(m):
+            """The independent aggregates one month needs, as callables."""
+            return {
+                # Commercial data aggregation
+                "comm": lambda: MonthlyCommercialSummary.objects.filter(month=m).aggregate(
+                    revenue_billed=Sum("revenue_billed"),
+                    revenue_collected=Sum("revenue_collected"),
+                    customers_billed=Sum("customers_billed"),
+                    customers_responded=Sum("customers_responded"),
+                ),
+                # Energy data aggregation
+                "energy_delivered": lambda: EnergyDelivered.objects.filter(
+                    date__year=m.year,
+                    date__month=m.month
+                ).aggregate(energy=Sum("energy_mwh"))["energy"] or Decimal("0"),
+                "energy_billed": lambda: MonthlyEnergyBilled.objects.filter(month=m).aggregate(
+                    energy=Sum("energy_mwh")
+                )["energy"] or Decimal("0"),
+                # Financial data - include all cost components
+                "opex": lambda: Opex.objects.filter(
+                    date__year=m.year,
+                    date__month=m.month
+                ).aggregate(
+                    total_opex=Sum("credit") + Sum("debit")
+                )["total_opex"] or Decimal("0"),
+                "salaries": lambda: SalaryPayment.objects.filter(
+                    month__year=m.year,
+                    month__month=m.month
+                ).aggregate(total=Sum("amount"))["total"] or Decimal("0"),
+                "nbet": lambda: NBETInvoice.objects.filter(
+                    month__year=m.year,
+                    month__month=m.month
+                ).aggregate(total=Sum("amount"))["total"] or Decimal("0"),
+                "mo": lambda: MOInvoice.objects.filter(
+                    month__year=m.year,
+                    month__month=m.month
+                ).aggregate(total=Sum("amount"))["total"] or Decimal("0"),
+                # Technical metrics: read the derived daily table rather than scanning hourly rows
+                "avg_hours_supply": lambda: float(DailyHoursOfSupply.objects.filter(
+                    date__year=m.year,
+                    date__month=m.month,
+                    hours_supplied__gt=0  # Only count days with actual supply
+                ).aggregate(avg=Avg('hours_supplied'))["avg"] or 0),
+                "interruptions": lambda: list(FeederInterruption.objects.filter(
+                    occurred_at__year=m.year,
+                    occurred_at__month=m.month,
+                    restored_at__isnull=False
+                ).values_list("occurred_at", "restored_at")),
+            }
+
+        # Every month's aggregates are independent: run them all concurrently
+        results = run_concurrently({
+            (i, name): query
+            for i, m in enumerate(months)
+            for name, query in month_queries(m).items()
+        })
+
         overview_data = []
 
-        for m in months:
-            # Commercial data aggregation
-            comm = MonthlyCommercialSummary.objects.filter(month=m).aggregate(
-                revenue_billed=Sum("revenue_billed"),
-                revenue_collected=Sum("revenue_collected"),
-                customers_billed=Sum("customers_billed"),
-                customers_responded=Sum("customers_responded"),
-            )
-            
-            # Energy data aggregation
-            energy_delivered = EnergyDelivered.objects.filter(
-                date__year=m.year, 
-                date__month=m.month
-            ).aggregate(energy=Sum("energy_mwh"))["energy"] or Decimal("0")
-            
-            energy_billed = MonthlyEnergyBilled.objects.filter(month=m).aggregate(
-                energy=Sum("energy_mwh")
-            )["energy"] or Decimal("0")
+        for i, m in enumerate(months):
+            comm = results[i, "comm"]
+            energy_delivered = results[i, "energy_delivered"]
+            energy_billed = results[i, "energy_billed"]
 
             # Extract commercial values first
             revenue_billed = comm['revenue_billed'] or Decimal("0")
             revenue_collected = comm['revenue_collected'] or Decimal("0")
             customers_billed = comm['customers_billed'] or 0
             customers_responded = comm['customers_responded'] or 0
-            
-            # Financial data - include all cost components
-            opex_costs = Opex.objects.filter(
-                date__year=m.year, 
-                date__month=m.month
-            ).aggregate(
-                total_opex=Sum("credit") + Sum("debit")
-            )["total_opex"] or Decimal("0")
-            
-            # Add other cost components - ensure proper date filtering
-            salary_costs = SalaryPayment.objects.filter(
-                month__year=m.year,
-                month__month=m.month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            
-            nbet_costs = NBETInvoice.objects.filter(
-                month__year=m.year,
-                month__month=m.month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            
-            mo_costs = MOInvoice.objects.filter(
-                month__year=m.year,
-                month__month=m.month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            
+
+            opex_costs = results[i, "opex"]
+            salary_costs = results[i, "salaries"]
+            nbet_costs = results[i, "nbet"]
+            mo_costs = results[i, "mo"]
+
             total_cost = opex_costs + salary_costs + nbet_costs + mo_costs
-            
-            # Check if we have any actual operational data for this month
-            has_operational_data = (
-                energy_delivered > 0 or 
-                revenue_billed > 0 or 
-                customers_billed > 0
-            )
-            
-            # If no operational data exists, you might want to set total_cost to 0
-            # or handle it differently based on business logic
-            if not has_operational_data and total_cost == 0:
-                # This month truly has no data
-                total_cost = Decimal("0")
-
-            # Technical metrics - improved calculation
-            # Calculate average hours of supply more accurately
-            hourly_loads = HourlyLoad.objects.filter(
-                date__year=m.year, 
-                date__month=m.month,
-                load_mw__gt=0  # Only count hours with actual load
-            ).values('feeder', 'date').annotate(
-                daily_hours=Count('hour')
-            )
-            
-            if hourly_loads.exists():
-                avg_hours_supply = hourly_loads.aggregate(
-                    avg=Avg('daily_hours')
-                )["avg"] or 0
-            else:
-                avg_hours_supply = 0
+
+            avg_hours_supply = results[i, "avg_hours_supply"]
 
             # Calculate interruption metrics properly
-            interruptions = FeederInterruption.objects.filter(
-                occurred_at__year=m.year, 
-                occurred_at__month=m.month,
-                restored_at__isnull=False
-            )
-            
-            if interruptions.exists():
+            interruptions = results[i, "interruptions"]
+
+            if interruptions:
                 total_duration = sum(
-                    (interrupt.restored_at - interrupt.occurred_at).total_seconds() / 3600 
-                    for interrupt in interruptions
+                    (restored_at - occurred_at).total_seconds() / 3600
+                    for occurred_at, restored_at in interruptions
                 )
-                avg_interruption_duration = total_duration / interruptions.count()
+                avg_interruption_duration = total_duration / len(interruptions)
                 avg_turnaround_time = avg_interruption_duration  # Same as interruption duration
             else:
                 avg_interruption_duration = 0
@@ -2218,6 +2404,7 @@ class OverviewAPIView(APIView):
         })
 
 
+@memoize
 def calculate_atcc_metrics(feeder, start_date, end_date):
     delivered = EnergyDelivered.objects.filter(
         feeder=feeder,
@@ -2296,10 +2483,10 @@ def feeders_by_location_view(request):
     if district_name:
         filters = Q(business_district__name__iexact=district_name)
     elif state_name:
-        state = State.objects.filter(name__iexact=state_name).first()
+        state = get_network().states.by_name(state_name)
         if not state:
             return Response({"error": "Invalid state"}, status=400)
-        filters = Q(business_district__state=state)
+        filters = Q(business_district_id__in=get_tree().ids_under("state", state.id, "district"))
 
     feeders = Feeder.objects.filter(filters)
     result = []
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer, Band
+from .models import State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer, Band, Job
 
 @admin.register(State)
 class StateAdmin(admin.ModelAdmin):
@@ -36,3 +36,10 @@ class DistributionTransformerAdmin(admin.ModelAdmin):
 class BandAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug']
     search_fields = ['name', 'slug']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'created_at', 'finished_at', 'locked_by']
+    search_fields = ['name', 'idempotency_key']
+    list_filter = ['status', 'name']
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .perf import connection_counter
+        from . import signals  # noqa: F401
+
+        connection_created.connect(connection_counter, dispatch_uid="common.perf.connection_counter")
@@ -0,0 +1,328 @@
+# common/benchmark.py
+"""
+Synthetic utility generator and endpoint timer behind `manage.py benchmark_api`.
+"""
+import random
+import re
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import factory.random
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+
+from common.factories import (
+    BandFactory, StateFactory, BusinessDistrictFactory, InjectionSubstationFactory,
+    FeederFactory, DistributionTransformerFactory, SalesRepresentativeFactory, StaffFactory,
+)
+from common.models import DistributionTransformer
+from common.perf import percentile, record_queries
+from commercial.counters import customers_created
+from commercial.models import (
+    Customer, DailyCollection, MonthlyCommercialSummary, MonthlyCustomerStats,
+    MonthlyEnergyBilled, MonthlyRevenueBilled,
+)
+from financial.models import MOInvoice, MYTOTariff, NBETInvoice, Opex, OpexCategory, SalaryPayment
+from technical.models import EnergyDelivered, FeederInterruption, HourlyLoad
+from technical.supply import rebuild_hours_of_supply
+
+
+# Network shape per scale. months of monthly/daily facts, hourly_days of hourly load.
+SCALES = {
+    "small": dict(states=2, districts=2, substations=2, feeders=3, transformers=10,
+                  reps=3, staff=3, customers=2, months=6, hourly_days=14),
+    "medium": dict(states=3, districts=4, substations=3, feeders=4, transformers=25,
+                   reps=5, staff=5, customers=3, months=12, hourly_days=60),
+    "large": dict(states=5, districts=6, substations=4, feeders=5, transformers=40,
+                  reps=8, staff=8, customers=4, months=24, hourly_days=365),
+}
+
+BATCH_SIZE = 5000
+
+# Extra query parameters for endpoints that need a location to answer
+ENDPOINT_PARAMS = {
+    "/api/metrics/commercial/state/": {"state": "state_name"},
+    "/api/metrics/commercial/business-districts/": {"state": "state_name"},
+    "/api/metrics/commercial/transformers-metrics/": {"feeder": "feeder_slug"},
+    "/api/financial/feeder/": {"feeder": "feeder_slug"},
+    "/api/financial/transformer-metrics/": {"feeder": "feeder_slug"},
+    "/api/financial/all-business-districts-metrics/": {"state": "state_name"},
+    # These read ?month as a date, not a month number
+    "/api/metrics/sales-rep-summary/": {"year": None, "month": None},
+    "/api/metrics/financial-summary/": {"year": None, "month": None},
+    "/api/technical/overview/state/": {"state": "state_name"},
+    "/api/technical/overview/business-districts/": {"state": "state_name"},
+    "/api/technical/overview/business-district/": {"business_district": "district_name"},
+}
+
+SKIPPED_PREFIXES = ("/admin/", "/api/_perf/")
+
+
+def _bulk(model, rows):
+    model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def generate_utility(shape, seed=42, end_month=None):
+    """
+    Build a synthetic utility of the given shape in the current database:
+    states → districts → substations → feeders → DTs, sales reps, staff and
+    customers, with monthly commercial and cost facts, daily energy and
+    collections and hourly load. Returns (row counts, context for the URLs).
+    """
+    rnd = random.Random(seed)
+    factory.random.reseed_random(seed)
+
+    end_month = end_month or date.today().replace(day=1) - relativedelta(months=1)
+    months = [end_month - relativedelta(months=i) for i in reversed(range(shape["months"]))]
+    first_day, last_day = months[0], end_month + relativedelta(months=1) - timedelta(days=1)
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+    bands = [BandFactory(name=name) for name in "ABCDE"]
+    category = OpexCategory.objects.get_or_create(name="Operations")[0]
+
+    feeders, transformers, districts = [], [], []
+    for _ in range(shape["states"]):
+        state = StateFactory()
+        for _ in range(shape["districts"]):
+            district = BusinessDistrictFactory(state=state)
+            districts.append(district)
+            for _ in range(shape["substations"]):
+                substation = InjectionSubstationFactory()
+                for _ in range(shape["feeders"]):
+                    feeders.append(FeederFactory(substation=substation, business_district=district, band=rnd.choice(bands)))
+
+    # DTs are the bulk of the hierarchy: build them unsaved, then insert in batches
+    for feeder in feeders:
+        transformers.extend(DistributionTransformerFactory.build(feeder=feeder) for _ in range(shape["transformers"]))
+    _bulk(DistributionTransformer, transformers)
+
+    reps = []
+    by_district = {}
+    for transformer in transformers:
+        by_district.setdefault(transformer.feeder.business_district_id, []).append(transformer)
+    for district in districts:
+        assigned = by_district.get(district.id, [])
+        for i in range(shape["reps"]):
+            rep = SalesRepresentativeFactory()
+            rep.assigned_transformers.set(assigned[i::shape["reps"]])
+            reps.append((rep, assigned[i::shape["reps"]]))
+
+    counts = {}
+
+    customers = [
+        Customer(
+            name=f"Customer {t.slug}-{i}",
+            category=rnd.choice([c for c, _ in Customer._meta.get_field("category").choices]),
+            metering_type=rnd.choice([c for c, _ in Customer._meta.get_field("metering_type").choices]),
+            band=t.feeder.band, transformer=t, joined_date=first_day,
+        )
+        for t in transformers for i in range(shape["customers"])
+    ]
+    counts["Customer"] = _bulk(Customer, customers)
+    customers_created(customers)
+
+    counts["EnergyDelivered"] = _bulk(EnergyDelivered, [
+        EnergyDelivered(feeder=f, date=d, energy_mwh=Decimal(rnd.randint(2000, 9000)) / 100)
+        for f in feeders for d in days
+    ])
+
+    hourly_days = days[-shape["hourly_days"]:]
+    counts["HourlyLoad"] = _bulk(HourlyLoad, [
+        HourlyLoad(feeder=f, date=d, hour=h, load_mw=Decimal(0 if rnd.random() < 0.25 else rnd.randint(50, 900)) / 100)
+        for f in feeders for d in hourly_days for h in range(24)
+    ])
+    counts["DailyHoursOfSupply"] = rebuild_hours_of_supply(hourly_days[0], hourly_days[-1])
+
+    interruptions = []
+    for f in feeders:
+        for month in months:
+            # (feeder, occurred_at, type) is unique, so draw distinct hours of the month
+            for slot in rnd.sample(range(28 * 24), rnd.randint(0, 4)):
+                occurred = timezone.make_aware(datetime(month.year, month.month, slot // 24 + 1, slot % 24))
+                interruptions.append(FeederInterruption(
+                    feeder=f, interruption_type=rnd.choice(["E/F", "O/C", "L/S", "MTNC"]),
+                    occurred_at=occurred, restored_at=occurred + timedelta(minutes=rnd.randint(10, 600)),
+                ))
+    counts["FeederInterruption"] = _bulk(FeederInterruption, interruptions)
+
+    counts["MonthlyEnergyBilled"] = _bulk(MonthlyEnergyBilled, [
+        MonthlyEnergyBilled(feeder=f, month=m, energy_mwh=Decimal(rnd.randint(40000, 200000)) / 100)
+        for f in feeders for m in months
+    ])
+    counts["MonthlyCustomerStats"] = _bulk(MonthlyCustomerStats, [
+        MonthlyCustomerStats(feeder=f, month=m, customer_count=c, customers_billed=int(c * 0.9), customer_response_count=int(c * 0.6))
+        for f in feeders for m in months for c in [rnd.randint(200, 2000)]
+    ])
+
+    summaries, revenue, collections = [], [], []
+    for rep, assigned in reps:
+        for t in assigned:
+            for m in months:
+                billed = Decimal(rnd.randint(100000, 900000))
+                collected = (billed * Decimal(rnd.randint(40, 95)) / 100).quantize(Decimal("0.01"))
+                customers = rnd.randint(20, 200)
+                summaries.append(MonthlyCommercialSummary(
+                    sales_rep=rep, transformer=t, month=m, customers_billed=customers,
+                    customers_responded=int(customers * rnd.uniform(0.4, 0.9)),
+                    revenue_billed=billed, revenue_collected=collected,
+                ))
+                revenue.append(MonthlyRevenueBilled(sales_rep=rep, transformer=t, month=m, amount=billed, customers_billed=customers))
+                for day in (5, 15, 25):
+                    collections.append(DailyCollection(
+                        sales_rep=rep, transformer=t, date=m.replace(day=day), amount=(collected / 3).quantize(Decimal("0.01")),
+                        collection_type=rnd.choice(["Prepaid", "Postpaid"]),
+                        vendor_name=rnd.choice(["BuyPower.ng", "Bank", "Cash", "POS", "Remita"]),
+                    ))
+    counts["MonthlyCommercialSummary"] = _bulk(MonthlyCommercialSummary, summaries)
+    counts["MonthlyRevenueBilled"] = _bulk(MonthlyRevenueBilled, revenue)
+    counts["DailyCollection"] = _bulk(DailyCollection, collections)
+
+    opex, salaries = [], []
+    transaction_id = 1
+    for district in districts:
+        staff = [StaffFactory(state=district.state, district=district) for _ in range(shape["staff"])]
+        for m in months:
+            for _ in range(rnd.randint(5, 20)):
+                opex.append(Opex(
+                    district=district, date=m.replace(day=rnd.randint(1, 28)), purpose="Operations",
+                    payee=f"Vendor {rnd.randint(1, 50)}", transaction_id=transaction_id, opex_category=category,
+                    debit=Decimal(rnd.randint(10000, 5000000)) / 100, credit=Decimal(rnd.randint(0, 100000)) / 100,
+                ))
+                transaction_id += 1
+            salaries.extend(
+                SalaryPayment(district=district, month=m, staff=s, payment_date=m.replace(day=25), amount=(s.salary / 12).quantize(Decimal("0.01")))
+                for s in staff
+            )
+    counts["Opex"] = _bulk(Opex, opex)
+    counts["SalaryPayment"] = _bulk(SalaryPayment, salaries)
+
+    counts["NBETInvoice"] = _bulk(NBETInvoice, [NBETInvoice(month=m, amount=Decimal(rnd.randint(10**8, 10**9))) for m in months])
+    counts["MOInvoice"] = _bulk(MOInvoice, [MOInvoice(month=m, amount=Decimal(rnd.randint(10**7, 10**8))) for m in months])
+    counts["MYTOTariff"] = _bulk(MYTOTariff, [
+        MYTOTariff(band=b, effective_date=m, rate_per_kwh=Decimal(rnd.randint(40, 210)))
+        for b in bands for m in sorted({months[0], months[len(months) // 2]})
+    ])
+
+    counts.update(Feeder=len(feeders), DistributionTransformer=len(transformers), SalesRepresentative=len(reps))
+
+    first_feeder = feeders[0]
+    context = {
+        "year": end_month.year,
+        "month": end_month.month,
+        "state_name": districts[0].state.name,
+        "district_name": districts[0].name,
+        "feeder_slug": first_feeder.slug,
+        "transformer_slug": transformers[0].slug,
+        "rep_id": str(reps[0][0].id),
+    }
+    return counts, context
+
+
+def _route(pattern):
+    route = str(pattern.pattern)
+    if route.startswith("^"):
+        route = route[1:]
+    return route[:-1] if route.endswith("$") else route
+
+
+def _serves_get(callback):
+    actions = getattr(callback, "actions", None)
+    if actions is not None:  # ViewSet route: only the methods it maps
+        return "get" in actions
+    cls = getattr(callback, "cls", None) or getattr(callback, "view_class", None)
+    return cls is None or hasattr(cls, "get")
+
+
+def discover_endpoints(context, resolver=None):
+    """
+    Concrete GET URLs for every pattern in the URLconf that can be filled in:
+    collection routes, APIViews and function views, as (url, is_viewset)
+    pairs. Detail routes (<pk>), format-suffix variants and write-only
+    actions are skipped.
+    """
+    urls = {}
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, prefix + _route(pattern))
+                continue
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = prefix + _route(pattern)
+            if "format" in pattern.pattern.regex.groupindex or "pk" in pattern.pattern.regex.groupindex:
+                continue
+            # Fill <converter:name> from the context; skip anything else that is still a regex
+            route = re.sub(r"<(?:\w+:)?(\w+)>", lambda m: str(context.get(m.group(1), m.group(0))), route)
+            if re.search(r"[<>()\[\]\\^$?*+]", route):
+                continue
+            url = "/" + route
+            if url.startswith(SKIPPED_PREFIXES) or url in urls or not _serves_get(pattern.callback):
+                continue
+            urls[url] = hasattr(pattern.callback, "actions")
+
+    walk((resolver or get_resolver()).url_patterns, "")
+    return list(urls.items())
+
+
+def endpoint_query(url, context, is_viewset=False):
+    """Dashboards get the latest generated year/month; viewset lists get no filters."""
+    params = {} if is_viewset else {"year": context["year"], "month": context["month"]}
+    for param, key in ENDPOINT_PARAMS.get(url, {}).items():
+        if key is None:
+            params.pop(param, None)
+        else:
+            params[param] = context[key]
+    return "&".join(f"{k}={v}" for k, v in params.items())
+
+
+def time_endpoint(client, url, repeat):
+    """Warm once, then time `repeat` GETs. Returns status, p50/p95 ms, queries and bytes."""
+    client.get(url)
+    latencies, queries, status, size = [], 0, None, 0
+    for _ in range(repeat):
+        with record_queries() as recorder:
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, recorder.count)
+        status = response.status_code
+        size = len(b"".join(response.streaming_content)) if response.streaming else len(response.content)
+    return {
+        "status": status,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "queries": queries,
+        "bytes": size,
+    }
+
+
+def compare_results(baseline, current, threshold=1.25, min_delta_ms=5.0):
+    """
+    Per (scale, endpoint) differences between two benchmark documents.
+    A regression is more queries, or a p95 that grew by more than `threshold`x
+    and at least `min_delta_ms`.
+    """
+    rows = []
+    for scale, result in current.get("scales", {}).items():
+        before = baseline.get("scales", {}).get(scale, {}).get("endpoints", {})
+        for url, now in result.get("endpoints", {}).items():
+            old = before.get(url)
+            if old is None or old.get("status") != 200 or now.get("status") != 200:
+                continue
+            ratio = now["p95_ms"] / old["p95_ms"] if old["p95_ms"] else 1.0
+            slower = ratio > threshold and now["p95_ms"] - old["p95_ms"] >= min_delta_ms
+            rows.append({
+                "scale": scale,
+                "endpoint": url,
+                "queries_before": old["queries"],
+                "queries_after": now["queries"],
+                "p95_before": old["p95_ms"],
+                "p95_after": now["p95_ms"],
+                "ratio": round(ratio, 2),
+                "regression": now["queries"] > old["queries"] or slower,
+            })
+    return rows
@@ -0,0 +1,81 @@
+# common/concurrency.py
+"""
+Fan-out helper for composite dashboard endpoints.
+
+run_concurrently() runs independent query callables on a process-wide thread
+pool, so a view's latency approaches its slowest query instead of the sum
+of all of them. Each worker thread uses its own database connection, which
+CONN_MAX_AGE / DB_POOL (see settings) keep open between requests.
+
+The pool size (DASHBOARD_QUERY_CONCURRENCY) caps the extra connections a
+worker process can hold. Calls run inline, in order, when the cap is 1 or
+when the caller is inside a transaction: other connections can't see its
+uncommitted rows (this includes TestCase and pytest-django tests). Tasks
+that call run_concurrently() themselves also run inline.
+"""
+import contextvars
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from common.perf import query_recorder
+
+
+THREAD_PREFIX = "dashboard-query"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def concurrency_limit():
+    return getattr(settings, "DASHBOARD_QUERY_CONCURRENCY", 4)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=concurrency_limit(), thread_name_prefix=THREAD_PREFIX)
+        return _executor
+
+
+def _run_in_worker(func):
+    try:
+        return func()
+    finally:
+        # Same as the end of a request: keep or release this thread's connection per CONN_MAX_AGE
+        close_old_connections()
+
+
+def run_concurrently(tasks):
+    """
+    Run a dict of zero-argument callables and return {key: result}. The
+    first exception raised by a task is re-raised once all have finished.
+    """
+    nested = threading.current_thread().name.startswith(THREAD_PREFIX)  # would deadlock a full pool
+    if concurrency_limit() <= 1 or len(tasks) <= 1 or nested or connection.in_atomic_block:
+        return {key: func() for key, func in tasks.items()}
+
+    executor = _get_executor()
+    recorder = query_recorder.get()
+    futures = {}
+    for key, func in tasks.items():
+        if recorder is not None:
+            func = _recorded(func, recorder)
+        # Each task gets a copy of the caller's context (request-scoped contextvars)
+        futures[key] = executor.submit(contextvars.copy_context().run, _run_in_worker, func)
+    wait(futures.values())
+    return {key: future.result() for key, future in futures.items()}
+
+
+def _recorded(func, recorder):
+    """Count a worker thread's queries against the caller's recorder and the ones it is nested in."""
+    def run():
+        with ExitStack() as stack:
+            for each in recorder.chain():
+                stack.enter_context(connection.execute_wrapper(each))
+            return func()
+    return run
@@ -0,0 +1,138 @@
+# common/dimensions.py
+"""
+In-process snapshot of the network hierarchy.
+
+States, business districts, substations, feeders, transformers and bands
+are small and rarely change, yet every view resolves names and slugs
+against them. get_network() returns an immutable Network built with one
+query per table, shared by all threads of the worker:
+
+    network = get_network()
+    state = network.states.by_name("Lagos")               # iexact, no query
+    district = network.districts.by_slug("ikeja")
+
+Scopes (state → districts → feeders → transformers) are expanded by
+common.tree, which is built from this snapshot.
+
+Saves and deletes on those models invalidate it through signals (after
+commit too, so a concurrent reload can't keep the pre-commit rows);
+NETWORK_SNAPSHOT_TTL bounds staleness across workers and after writes that
+skip signals (bulk_create, update()). Each build gets a new `version`.
+"""
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Band, BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+
+
+BandNode = namedtuple("BandNode", "id slug name")
+StateNode = namedtuple("StateNode", "id slug name")
+DistrictNode = namedtuple("DistrictNode", "id slug name state_id")
+SubstationNode = namedtuple("SubstationNode", "id slug name")
+FeederNode = namedtuple("FeederNode", "id slug name substation_id business_district_id band_id voltage_level")
+TransformerNode = namedtuple("TransformerNode", "id slug name feeder_id")
+
+
+class Dimension:
+    """One table: nodes in id order with id, slug and (case-insensitive) name lookups."""
+
+    def __init__(self, nodes):
+        self.nodes = tuple(nodes)
+        self._by_id = MappingProxyType({node.id: node for node in self.nodes})
+        self._by_slug = MappingProxyType({node.slug: node for node in self.nodes})
+        named = {}
+        for node in self.nodes:
+            named.setdefault(node.name.casefold(), []).append(node)
+        self._by_name = MappingProxyType({name: tuple(nodes) for name, nodes in named.items()})
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, id):
+        return self._by_id.get(id)
+
+    def by_slug(self, slug):
+        return self._by_slug.get(slug)
+
+    def named(self, name):
+        """Every node called `name` (names are only unique per parent for some tables)."""
+        return self._by_name.get(name.casefold(), ()) if name else ()
+
+    def by_name(self, name):
+        matches = self.named(name)
+        return matches[0] if matches else None
+
+
+class Network:
+    """Immutable snapshot of the hierarchy: one Dimension per table."""
+
+    def __init__(self, bands, states, districts, substations, feeders, transformers, version=0):
+        self.version = version
+        self.bands = Dimension(bands)
+        self.states = Dimension(states)
+        self.districts = Dimension(districts)
+        self.substations = Dimension(substations)
+        self.feeders = Dimension(feeders)
+        self.transformers = Dimension(transformers)
+
+    @classmethod
+    def load(cls, version=0):
+        return cls(
+            [BandNode(*row) for row in Band.objects.order_by("name").values_list("id", "slug", "name")],
+            [StateNode(*row) for row in State.objects.order_by("name").values_list("id", "slug", "name")],
+            [DistrictNode(*row) for row in BusinessDistrict.objects.order_by("name").values_list(
+                "id", "slug", "name", "state_id")],
+            [SubstationNode(*row) for row in InjectionSubstation.objects.order_by("name").values_list(
+                "id", "slug", "name")],
+            [FeederNode(*row) for row in Feeder.objects.order_by("name").values_list(
+                "id", "slug", "name", "substation_id", "business_district_id", "band_id", "voltage_level")],
+            [TransformerNode(*row) for row in DistributionTransformer.objects.order_by("name").values_list(
+                "id", "slug", "name", "feeder_id")],
+            version=version,
+        )
+
+
+_lock = threading.Lock()
+_network = None
+_loaded_at = 0.0
+_version = 0
+
+
+def get_network():
+    """
+    Process-wide snapshot, loaded on first use. Signals invalidate it;
+    NETWORK_SNAPSHOT_TTL bounds staleness across workers.
+    """
+    global _network, _loaded_at, _version
+    ttl = getattr(settings, "NETWORK_SNAPSHOT_TTL", 300)
+    with _lock:
+        if _network is None or (ttl and time.monotonic() - _loaded_at > ttl):
+            _version += 1
+            _network = Network.load(_version)
+            _loaded_at = time.monotonic()
+        return _network
+
+
+def invalidate_network(**kwargs):
+    global _network
+    with _lock:
+        _network = None
+
+
+def network_changed(**kwargs):
+    """Signal receiver: drop the snapshot now and again once the write commits."""
+    invalidate_network()
+    transaction.on_commit(invalidate_network)
+
+
+def warm_network():
+    """Build the snapshot ahead of the first request (NETWORK_SNAPSHOT_WARM, see raven/wsgi.py)."""
+    return get_network()
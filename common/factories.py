@@ -0,0 +1,82 @@
+# common/factories.py
+import factory
+from django.utils.text import slugify
+from factory.django import DjangoModelFactory
+
+from common.models import Band, State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer
+from commercial.models import SalesRepresentative
+from hr.models import Staff
+
+
+class BandFactory(DjangoModelFactory):
+    class Meta:
+        model = Band
+        django_get_or_create = ("name",)
+
+    name = factory.Iterator(["A", "B", "C", "D", "E"])
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class StateFactory(DjangoModelFactory):
+    class Meta:
+        model = State
+
+    name = factory.Sequence(lambda n: f"State {n}")
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class BusinessDistrictFactory(DjangoModelFactory):
+    class Meta:
+        model = BusinessDistrict
+
+    name = factory.Sequence(lambda n: f"District {n}")
+    state = factory.SubFactory(StateFactory)
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class InjectionSubstationFactory(DjangoModelFactory):
+    class Meta:
+        model = InjectionSubstation
+
+    name = factory.Sequence(lambda n: f"Substation {n}")
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class FeederFactory(DjangoModelFactory):
+    class Meta:
+        model = Feeder
+
+    name = factory.Sequence(lambda n: f"Feeder {n}")
+    band = factory.SubFactory(BandFactory)
+    voltage_level = factory.Iterator(["11kv", "33kv"])
+    substation = factory.SubFactory(InjectionSubstationFactory)
+    business_district = factory.SubFactory(BusinessDistrictFactory)
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class DistributionTransformerFactory(DjangoModelFactory):
+    class Meta:
+        model = DistributionTransformer
+
+    name = factory.Sequence(lambda n: f"DT {n}")
+    feeder = factory.SubFactory(FeederFactory)
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+
+
+class SalesRepresentativeFactory(DjangoModelFactory):
+    class Meta:
+        model = SalesRepresentative
+
+    name = factory.Faker("name")
+    slug = factory.Sequence(lambda n: f"rep-{n}")
+
+
+class StaffFactory(DjangoModelFactory):
+    class Meta:
+        model = Staff
+
+    full_name = factory.Faker("name")
+    email = factory.Faker("email")
+    gender = factory.Iterator(["Male", "Female"])
+    salary = factory.Faker("pydecimal", left_digits=6, right_digits=2, positive=True, min_value=80000, max_value=900000)
+    hire_date = factory.Faker("date_between", start_date="-15y", end_date="-1y")
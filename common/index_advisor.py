@@ -0,0 +1,218 @@
+# common/index_advisor.py
+"""
+Index advisor behind `manage.py advise_indexes`.
+
+Replays the GET endpoints against the configured database, EXPLAINs every
+SELECT they issue and, for each table the planner reads with a full scan,
+proposes an index built from the columns the query actually filters on
+(equality columns first, then one range column).
+"""
+import json
+import re
+from collections import defaultdict
+from datetime import date
+
+from django.apps import apps
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+
+from common.models import BusinessDistrict, DistributionTransformer, Feeder
+from commercial.models import DailyCollection, MonthlyCommercialSummary, SalesRepresentative
+
+
+MAX_COLUMNS = 3
+
+OPERATOR = r"(=|<>|!=|>=|<=|>|<|IN\b|IS NOT NULL|IS NULL|BETWEEN|LIKE)"
+
+
+def context_from_database():
+    """URL/filter values for discover_endpoints() taken from existing rows."""
+    district = BusinessDistrict.objects.select_related("state").order_by("name").first()
+    feeder = Feeder.objects.order_by("name").first()
+    transformer = DistributionTransformer.objects.order_by("name").first()
+    rep = SalesRepresentative.objects.order_by("name").first()
+    latest = (
+        MonthlyCommercialSummary.objects.order_by("-month").values_list("month", flat=True).first()
+        or DailyCollection.objects.order_by("-date").values_list("date", flat=True).first()
+        or date.today()
+    )
+    return {
+        "year": latest.year,
+        "month": latest.month,
+        "state_name": district.state.name if district else "",
+        "district_name": district.name if district else "",
+        "feeder_slug": feeder.slug if feeder else "",
+        "transformer_slug": transformer.slug if transformer else "",
+        "rep_id": str(rep.id) if rep else "",
+    }
+
+
+def capture_queries(client, urls):
+    """GET each url once; returns {sql: set(urls)} for the SELECTs issued."""
+    captured = defaultdict(set)
+    for url in urls:
+        with CaptureQueriesContext(connection) as ctx:
+            try:
+                client.get(url)
+            except Exception:  # a broken view's queries are still worth explaining
+                pass
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if sql.lstrip().upper().startswith("SELECT"):
+                captured[sql].add(url.split("?")[0])
+    return captured
+
+
+def _aliases(sql):
+    """{alias or table name: table name} for every table the SQL reads."""
+    names = {}
+    for table, alias in re.findall(r'(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?"?(T\d+)"?)?', sql):
+        names[table] = table
+        if alias:
+            names[alias] = table
+    return names
+
+
+def _seq_scans_postgres(plan):
+    scans = []
+    stack = [plan[0]["Plan"]] if plan else []
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def seq_scans_sqlite(rows, aliases):
+    """Tables read with a plain `SCAN` (no index) in an EXPLAIN QUERY PLAN result."""
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        if match and "USING" not in detail:
+            scans.append(aliases.get(match.group(1), match.group(1)))
+    return scans
+
+
+def scanned_tables(sql):
+    """Tables the planner reads with a sequential scan for this query."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+            return _seq_scans_postgres(json.loads(plan) if isinstance(plan, str) else plan)
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return seq_scans_sqlite(cursor.fetchall(), _aliases(sql))
+    return []
+
+
+def predicate_columns(sql, table):
+    """
+    Columns of `table` the query filters on, split into equality, range and
+    null-test columns. Date-part extracts (`__month`, `__year`) count as range.
+    """
+    refs = [table] + [alias for alias, name in _aliases(sql).items() if name == table and alias != table]
+    equality, ranges, nulls = [], [], {}
+    for ref in refs:
+        column = rf'"{ref}"\."(\w+)"'
+        for name, op in re.findall(rf"{column}\s*{OPERATOR}", sql):
+            if op in ("=", "IN"):
+                target = equality
+            elif op in ("IS NULL", "IS NOT NULL"):
+                nulls[name] = op == "IS NULL"
+                continue
+            elif op in ("<>", "!=", "LIKE"):
+                continue
+            else:
+                target = ranges
+            if name not in target:
+                target.append(name)
+        for name in re.findall(rf"(?:EXTRACT\(\s*'?\w+'?\s+FROM|django_\w+_extract\('\w+',)\s*{column}", sql):
+            if name not in ranges:
+                ranges.append(name)
+    ranges = [name for name in ranges if name not in equality]
+    return equality, ranges, nulls
+
+
+def existing_indexes(model):
+    """Column tuples of every index on the model's table that Django knows about."""
+    opts = model._meta
+    column = {f.name: f.column for f in opts.concrete_fields}
+    indexes = [(opts.pk.column,)]
+    indexes += [(f.column,) for f in opts.concrete_fields if f.db_index or f.unique]
+    indexes += [tuple(column[n] for n in fields) for fields in opts.unique_together]
+    indexes += [tuple(column[n.lstrip("-")] for n in index.fields) for index in opts.indexes if index.fields]
+    indexes += [
+        tuple(column[n] for n in constraint.fields)
+        for constraint in opts.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields
+    ]
+    return indexes
+
+
+def is_covered(columns, equality, indexes):
+    """An existing index leads with the proposal (equality columns in any order)."""
+    width = len(columns)
+    eq = set(columns[:len(equality)])
+    return any(
+        len(index) >= width and set(index[:len(eq)]) == eq and tuple(index[len(eq):width]) == tuple(columns[len(eq):])
+        for index in indexes
+    )
+
+
+def propose(model, sql):
+    """The index (as a dict) that would serve this query's scan of `model`, or None."""
+    equality, ranges, nulls = predicate_columns(sql, model._meta.db_table)
+    columns = (equality + ranges[:1])[:MAX_COLUMNS]
+    if not columns:
+        return None
+    if is_covered(columns, equality, existing_indexes(model)):
+        return None
+    by_column = {f.column: f.name for f in model._meta.concrete_fields}
+    fields = [by_column.get(c, c) for c in columns]
+    condition = {f"{by_column.get(c, c)}__isnull": v for c, v in nulls.items() if c not in columns}
+    return {"model": model._meta.label, "fields": fields, "condition": condition}
+
+
+def index_name(model, fields, condition=None):
+    name = f"{model._meta.model_name[:14]}_{'_'.join(f[:6] for f in fields)}"
+    if condition:
+        name = name[:20] + "_" + "_".join(("nl" if v else "nn") + k[0] for k, v in condition.items())
+    return name[:26] + "_idx"
+
+
+def index_snippet(model, proposal):
+    args = f"fields={proposal['fields']!r}, name={index_name(model, proposal['fields'], proposal['condition'])!r}"
+    if proposal["condition"]:
+        args += ", condition=models.Q(" + ", ".join(f"{k}={v!r}" for k, v in proposal["condition"].items()) + ")"
+    return f"models.Index({args})"
+
+
+def advise(captured, min_rows=0):
+    """
+    Turn {sql: endpoints} into proposals, one per model and column list:
+    [{model, fields, condition, snippet, rows, endpoints}].
+    """
+    by_table = {m._meta.db_table: m for m in apps.get_models()}
+    row_counts = {}
+    proposals = {}
+    for sql, endpoints in captured.items():
+        for table in set(scanned_tables(sql)):
+            model = by_table.get(table)
+            if model is None:
+                continue
+            if table not in row_counts:
+                row_counts[table] = model._default_manager.count()
+            if row_counts[table] < min_rows:
+                continue
+            proposal = propose(model, sql)
+            if proposal is None:
+                continue
+            key = (proposal["model"], tuple(proposal["fields"]), tuple(sorted(proposal["condition"].items())))
+            entry = proposals.setdefault(key, dict(
+                proposal, snippet=index_snippet(model, proposal), rows=row_counts[table], endpoints=set(),
+            ))
+            entry["endpoints"] |= endpoints
+    return sorted(proposals.values(), key=lambda p: (p["model"], -len(p["endpoints"]), p["fields"]))
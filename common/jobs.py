@@ -0,0 +1,244 @@
+# common/jobs.py
+"""
+Database-backed background jobs, no broker needed.
+
+Handlers are registered by name and enqueued from views; run_workers
+processes claim queued rows with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of workers share the table without handing out a job twice:
+
+    @register("commercial.refresh_summaries")
+    def refresh_summaries():
+        return process_dirty()
+
+    job = enqueue("commercial.refresh_summaries", coalesce=True)
+    job = enqueue("imports.load_file", {"path": path}, idempotency_key=request.headers["Idempotency-Key"])
+
+A failing handler is retried with exponential backoff (JOB_RETRY_BACKOFF
+seconds, doubled per attempt) until max_attempts; raise JobFailed to give
+up at once. While a handler runs, a heartbeat thread renews the job's
+lease every JOB_HEARTBEAT_SECONDS; a worker that dies mid-job stops
+renewing it, and another worker picks the job up once JOB_LEASE_SECONDS
+have passed since the last beat.
+
+Bulk API actions go through the queue with DeferredActionMixin: the
+request is stored as a "common.replay_request" job, the client gets 202
+and polls /api/jobs/<id>/, and a worker replays it through the same view.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# WSGI environ key marking a request replayed by a worker, so it runs instead of being deferred again
+REPLAY_ENVIRON_KEY = "raven.job_replay"
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors a retry can't fix; the job fails without further attempts."""
+
+
+_registry = {}
+
+
+def register(name, max_attempts=None):
+    """Register the decorated function as the handler for jobs called `name`."""
+    def decorator(func):
+        func.job_name = name
+        func.max_attempts = max_attempts
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _registry.get(name)
+
+
+def enqueue(name, payload=None, idempotency_key=None, max_attempts=None, delay=None, coalesce=False):
+    """
+    Queue a job for the handler registered as `name`. A job already stored
+    under `idempotency_key` is returned instead of adding another; with
+    coalesce, so is a job of this name that is queued but not started yet.
+    """
+    handler = get_handler(name)
+    if handler is None:
+        raise ValueError(f"No job handler registered as '{name}'")
+    if idempotency_key:
+        existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing
+    if coalesce:
+        existing = Job.objects.filter(name=name, status=Job.QUEUED, attempts=0).first()
+        if existing is not None:
+            return existing
+
+    job = Job(
+        name=name,
+        payload=payload or {},
+        idempotency_key=idempotency_key or None,
+        max_attempts=max_attempts or handler.max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 3),
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+    try:
+        with transaction.atomic():
+            job.save(force_insert=True)
+    except IntegrityError:
+        # Another request stored the same idempotency key since our lookup
+        if not idempotency_key:
+            raise
+        return Job.objects.get(idempotency_key=idempotency_key)
+    return job
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker=None):
+    """Lock the next runnable job for `worker` and mark it running; None when there is none."""
+    worker = worker or worker_name()
+    lease = timedelta(seconds=getattr(settings, "JOB_LEASE_SECONDS", 300))
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(Q(status=Job.QUEUED, run_after__lte=now) | Q(status=Job.RUNNING, locked_at__lt=now - lease))
+                .order_by("run_after", "created_at")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == Job.RUNNING and job.attempts >= job.max_attempts:
+                # Its last worker died on the final attempt
+                _finish(job, Job.FAILED, error=f"Lease expired on {job.locked_by} after {job.attempts} attempts")
+                continue
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_at = now
+            job.save(update_fields=["status", "attempts", "locked_by", "locked_at"])
+            return job
+
+
+def _finish(job, status, result=None, error=""):
+    owner = job.locked_by
+    fields = {
+        "status": status, "result": result, "error": error,
+        "finished_at": None if status == Job.QUEUED else timezone.now(),
+    }
+    if status == Job.QUEUED:
+        backoff = getattr(settings, "JOB_RETRY_BACKOFF", 30) * 2 ** (job.attempts - 1)
+        fields.update(run_after=timezone.now() + timedelta(seconds=backoff), locked_by="", locked_at=None)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    # Write only while we still hold the lease: once it expires the job belongs to another worker
+    return Job.objects.filter(pk=job.pk, locked_by=owner).update(**fields)
+
+
+class Heartbeat(threading.Thread):
+    """Renews a running job's lease every `interval` seconds until stopped or the lease is lost."""
+
+    def __init__(self, job, interval):
+        super().__init__(name=f"job-heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                renewed = Job.objects.filter(pk=self.job.pk, status=Job.RUNNING, locked_by=self.job.locked_by).update(
+                    locked_at=timezone.now()
+                )
+                if not renewed:
+                    # Finished, or the lease expired and another worker owns the job now
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def run(job):
+    """Run a claimed job's handler and record the outcome: succeeded, queued for a retry, or failed."""
+    handler = get_handler(job.name)
+    if handler is None:
+        return _finish(job, Job.FAILED, error=f"No job handler registered as '{job.name}'")
+    # Another connection can't see a job claimed inside a transaction (tests), so there is nothing to renew
+    heartbeat = None
+    if not connection.in_atomic_block:
+        heartbeat = Heartbeat(job, getattr(settings, "JOB_HEARTBEAT_SECONDS", 60))
+        heartbeat.start()
+    try:
+        result = handler(**job.payload)
+    except JobFailed as exc:
+        logger.warning("Job %s (%s) failed: %s", job.pk, job.name, exc)
+        return _finish(job, Job.FAILED, error=str(exc))
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) raised on attempt %s", job.pk, job.name, job.attempts)
+        status = Job.QUEUED if job.attempts < job.max_attempts else Job.FAILED
+        return _finish(job, status, error=error)
+    finally:
+        if heartbeat is not None:
+            heartbeat.stop()
+    return _finish(job, Job.SUCCEEDED, result=result)
+
+
+def work(worker=None, once=False, poll=1.0, stop=None):
+    """
+    Claim and run jobs until `stop` (a threading/multiprocessing Event) is
+    set; with once, return when nothing is runnable. Returns the jobs run.
+    """
+    worker = worker or worker_name()
+    done = 0
+    while stop is None or not stop.is_set():
+        job = claim(worker)
+        if job is None:
+            if once:
+                break
+            if stop is not None:
+                stop.wait(poll)
+            else:
+                time.sleep(poll)
+            continue
+        run(job)
+        done += 1
+    return done
+
+
+@register("common.replay_request")
+def replay_request(method, path, data):
+    """Run a deferred API request through its view, as the client sent it."""
+    request = RequestFactory().generic(
+        method, path, json.dumps(data, cls=DjangoJSONEncoder), content_type="application/json",
+        **{REPLAY_ENVIRON_KEY: True},
+    )
+    match = resolve(urlsplit(path).path)
+    response = match.func(request, *match.args, **match.kwargs)
+    body = getattr(response, "data", None)
+    if response.status_code >= 500:
+        raise RuntimeError(f"{method} {path} returned {response.status_code}: {body}")
+    if response.status_code >= 400:
+        raise JobFailed(json.dumps({"status_code": response.status_code, "data": body}, cls=DjangoJSONEncoder))
+    return {"status_code": response.status_code, "data": body}
@@ -0,0 +1,62 @@
+# common/management/commands/advise_indexes.py
+
+import json
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from common.benchmark import discover_endpoints, endpoint_query
+from common.index_advisor import advise, capture_queries, context_from_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the dashboard GET endpoints against the configured database, EXPLAIN "
+        "the queries they issue and propose composite/partial indexes for the tables "
+        "read with a full scan. Read-only: nothing is written or migrated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", action="append", help="Only endpoints containing this text.")
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Ignore tables smaller than this (default 1000).")
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of models.Index snippets.")
+
+    def handle(self, *args, **options):
+        context = context_from_database()
+        urls = discover_endpoints(context)
+        if options["endpoint"]:
+            urls = [(u, v) for u, v in urls if any(f in u for f in options["endpoint"])]
+        urls = [f"{u}?{q}" if (q := endpoint_query(u, context, v)) else u for u, v in urls]
+
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        setup_test_environment()
+        try:
+            captured = capture_queries(APIClient(), urls)
+        finally:
+            teardown_test_environment()
+            request_logger.setLevel(previous_level)
+
+        proposals = advise(captured, min_rows=options["min_rows"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(proposals, indent=2, default=sorted))
+            return
+
+        self.stdout.write(f"{len(urls)} endpoints, {len(captured)} distinct SELECTs on {connection.vendor}.")
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("✔ No unindexed scans found."))
+            return
+
+        model = None
+        for proposal in proposals:
+            if proposal["model"] != model:
+                model = proposal["model"]
+                self.stdout.write(f"\n{model} ({proposal['rows']} rows)")
+            self.stdout.write(f"    {proposal['snippet']},")
+            self.stdout.write(f"      # {len(proposal['endpoints'])} endpoint(s): " + ", ".join(sorted(proposal["endpoints"]))[:200])
@@ -0,0 +1,149 @@
+# common/management/commands/benchmark_api.py
+
+import json
+import logging
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from common.benchmark import SCALES, compare_results, discover_endpoints, endpoint_query, generate_utility, time_endpoint
+
+
+class DisableMigrations:
+    """MIGRATION_MODULES value that builds every app's tables straight from the models."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every GET endpoint in raven/urls.py against a synthetic utility.\n"
+        "Each scale is built in a throwaway test database (the configured one is never "
+        "touched), then every endpoint is timed; p50/p95 latency and query counts are "
+        "written as JSON that --compare can diff against a previous run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", action="append", choices=sorted(SCALES),
+                            help="Data scale(s) to run (default: small).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed requests per endpoint (default 5).")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic data.")
+        parser.add_argument("--endpoint", action="append", help="Only endpoints containing this text.")
+        parser.add_argument("--output", help="Write the results JSON here.")
+        parser.add_argument("--compare", help="Baseline JSON from an earlier run to diff against.")
+        parser.add_argument("--threshold", type=float, default=1.25,
+                            help="p95 slowdown ratio reported as a regression (default 1.25).")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit non-zero if --compare finds a regression.")
+        parser.add_argument("--migrations", action="store_true",
+                            help="Build the test database with migrations instead of from the models.")
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _run_scale(self, name, options):
+        shape = SCALES[name]
+        old_name = connection.settings_dict["NAME"]
+        migration_modules = settings.MIGRATION_MODULES if options["migrations"] else DisableMigrations()
+
+        with override_settings(MIGRATION_MODULES=migration_modules):
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            counts, context = generate_utility(shape, seed=options["seed"])
+            build_seconds = round(time.perf_counter() - started, 1)
+            self.stdout.write(f"[{name}] built in {build_seconds}s: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+            urls = discover_endpoints(context)
+            if options["endpoint"]:
+                urls = [(u, v) for u, v in urls if any(f in u for f in options["endpoint"])]
+
+            client = APIClient()
+            endpoints = {}
+            for url, is_viewset in urls:
+                query = endpoint_query(url, context, is_viewset)
+                try:
+                    result = time_endpoint(client, f"{url}?{query}" if query else url, options["repeat"])
+                except Exception as exc:  # a broken view shouldn't stop the run
+                    result = {"status": None, "error": f"{type(exc).__name__}: {exc}"[:300]}
+                endpoints[url] = result
+                if result.get("status") == 200:
+                    self.stdout.write(f"  {url:<70} {result['p50_ms']:>9}ms {result['p95_ms']:>9}ms {result['queries']:>6}q")
+                else:
+                    self.stdout.write(f"  {url:<70} {result.get('status') or result.get('error')}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        return {"shape": shape, "rows": counts, "build_seconds": build_seconds, "endpoints": endpoints}
+
+    def _print_comparison(self, rows):
+        regressions = [r for r in rows if r["regression"]]
+        changed = [r for r in rows if r["regression"] or r["queries_after"] != r["queries_before"] or r["ratio"] < 0.8]
+        if not changed:
+            self.stdout.write("No changes against the baseline.")
+        for r in changed:
+            line = (f"[{r['scale']}] {r['endpoint']:<65} queries {r['queries_before']} → {r['queries_after']}, "
+                    f"p95 {r['p95_before']}ms → {r['p95_after']}ms ({r['ratio']}x)")
+            self.stdout.write(self.style.ERROR(line) if r["regression"] else self.style.SUCCESS(line))
+        return regressions
+
+    def handle(self, *args, **options):
+        if options["repeat"] <= 0:
+            raise CommandError("--repeat must be positive")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Can't read baseline {options['compare']}: {exc}")
+
+        document = {
+            "meta": {
+                "created": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+                "commit": self._commit(),
+                "vendor": connection.vendor,
+                "seed": options["seed"],
+                "repeat": options["repeat"],
+            },
+            "scales": {},
+        }
+
+        # Failing views are reported in the results; keep their tracebacks out of the output
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        setup_test_environment()
+        try:
+            for name in options["scale"] or ["small"]:
+                document["scales"][name] = self._run_scale(name, options)
+        finally:
+            teardown_test_environment()
+            request_logger.setLevel(previous_level)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(document, fh, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"✔ Results written to {options['output']}"))
+
+        if baseline is not None:
+            regressions = self._print_comparison(compare_results(baseline, document, options["threshold"]))
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} endpoint(s) regressed against {options['compare']}")
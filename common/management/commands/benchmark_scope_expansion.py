@@ -0,0 +1,106 @@
+# common/management/commands/benchmark_scope_expansion.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from common.dimensions import Network, get_network
+from common.models import DistributionTransformer, Feeder
+from common.tree import LOCATION_LEVELS, SUBSTATION_LEVELS, HierarchyTree, get_tree
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare scope expansion through chained ORM joins (what LocationFilterMixin "
+        "did) with slices of the array-backed common.tree hierarchy, on the data in "
+        "the configured database. Every state, district and substation is expanded "
+        "to feeder and transformer ids, optionally per band; the id sets must match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported.")
+        parser.add_argument("--bands", action="store_true", help="Also expand every scope per band.")
+
+    def _timed(self, fn, repeat):
+        best, result, queries = None, None, 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                result = fn()
+                elapsed = time.perf_counter() - started
+            queries = len(ctx.captured_queries)
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result, queries
+
+    def _scopes(self, network, with_bands):
+        joins = {
+            "state": "business_district__state_id",
+            "district": "business_district_id",
+            "substation": "substation_id",
+        }
+        bands = [None] + ([band.id for band in network.bands] if with_bands else [])
+        for level, lookup in joins.items():
+            levels = SUBSTATION_LEVELS if level == "substation" else LOCATION_LEVELS
+            for node in getattr(network, f"{level}s"):
+                for band_id in bands:
+                    yield level, levels, lookup, node, band_id
+
+    def handle(self, *args, **options):
+        if options["repeat"] <= 0:
+            raise CommandError("--repeat must be positive")
+
+        load, network, load_queries = self._timed(Network.load, options["repeat"])
+        build, _, _ = self._timed(
+            lambda: [HierarchyTree.from_network(network, levels) for levels in (LOCATION_LEVELS, SUBSTATION_LEVELS)],
+            options["repeat"],
+        )
+        self.stdout.write(
+            f"{len(network.feeders)} feeders, {len(network.transformers)} transformers; snapshot loaded in "
+            f"{load * 1000:.1f} ms ({load_queries} queries), trees built in {build * 1000:.1f} ms"
+        )
+        network = get_network()
+
+        totals = {"join": 0.0, "tree": 0.0, "join_queries": 0, "scopes": 0, "mismatches": 0}
+        for level, levels, lookup, node, band_id in self._scopes(network, options["bands"]):
+            band_filter = {} if band_id is None else {"band_id": band_id}
+            tree = get_tree(levels)
+
+            def joined():
+                feeders = set(Feeder.objects.filter(**{lookup: node.id}, **band_filter).values_list("id", flat=True))
+                transformers = set(
+                    DistributionTransformer.objects.filter(
+                        **{f"feeder__{lookup}": node.id}, **{f"feeder__{k}": v for k, v in band_filter.items()}
+                    ).values_list("id", flat=True)
+                )
+                return feeders, transformers
+
+            def sliced():
+                return (
+                    tree.ids_under(level, node.id, "feeder", **band_filter),
+                    tree.ids_under(level, node.id, "transformer", **band_filter),
+                )
+
+            join_s, join_ids, join_queries = self._timed(joined, options["repeat"])
+            tree_s, tree_ids, _ = self._timed(sliced, options["repeat"])
+            if join_ids != tuple(set(ids) for ids in tree_ids):
+                self.stdout.write(self.style.ERROR(f"{level} {node.slug} band={band_id}: id sets differ"))
+                totals["mismatches"] += 1
+                continue
+            totals["join"] += join_s
+            totals["tree"] += tree_s
+            totals["join_queries"] += join_queries
+            totals["scopes"] += 1
+
+        if not totals["scopes"]:
+            self.stdout.write("No scopes to expand.")
+            return
+        n = totals["scopes"]
+        self.stdout.write(f"{'path':<8}{'scopes':>8}{'total ms':>11}{'µs/scope':>11}{'queries':>9}")
+        self.stdout.write(f"{'joins':<8}{n:>8}{totals['join'] * 1000:>11.1f}{totals['join'] / n * 1e6:>11.0f}{totals['join_queries']:>9}")
+        self.stdout.write(f"{'tree':<8}{n:>8}{totals['tree'] * 1000:>11.1f}{totals['tree'] / n * 1e6:>11.0f}{0:>9}")
+        speedup = totals["join"] / max(totals["tree"], 1e-9)
+        if totals["mismatches"]:
+            raise CommandError(f"{totals['mismatches']} scopes returned different ids")
+        self.stdout.write(self.style.SUCCESS(f"✓ {speedup:.0f}x faster, id sets identical"))
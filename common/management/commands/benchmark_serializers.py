@@ -0,0 +1,85 @@
+# common/management/commands/benchmark_serializers.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from common.serializers import ValuesSerializer
+from commercial.serializers import (
+    DailyCollectionSerializer, DailyEnergyDeliveredSerializer, MonthlyCommercialSummarySerializer,
+    MonthlyCustomerStatsSerializer, MonthlyEnergyBilledSerializer, MonthlyRevenueBilledSerializer,
+)
+from financial.serializers import OpexSerializer, SalaryPaymentSerializer
+from technical.serializers import DailyHoursOfSupplySerializer, EnergyDeliveredSerializer, HourlyLoadSerializer
+
+
+TARGETS = {
+    "daily-collection": DailyCollectionSerializer,
+    "daily-energy-delivered": DailyEnergyDeliveredSerializer,
+    "monthly-commercial-summary": MonthlyCommercialSummarySerializer,
+    "monthly-customer-stats": MonthlyCustomerStatsSerializer,
+    "monthly-energy-billed": MonthlyEnergyBilledSerializer,
+    "monthly-revenue-billed": MonthlyRevenueBilledSerializer,
+    "opex": OpexSerializer,
+    "salary-payment": SalaryPaymentSerializer,
+    "hours-of-supply": DailyHoursOfSupplySerializer,
+    "energy-delivered": EnergyDeliveredSerializer,
+    "hourly-load": HourlyLoadSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer list serialisation with the values()-backed "
+        "ValuesSerializer used by the fact-table list/retrieve endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Rows per table (default 5000).")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported.")
+        parser.add_argument("--table", choices=sorted(TARGETS), action="append", help="Only these tables.")
+
+    def _timed(self, fn, repeat):
+        best, result, queries = None, None, 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                result = fn()
+                elapsed = time.perf_counter() - started
+            queries = len(ctx.captured_queries)
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result, queries
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0 or options["repeat"] <= 0:
+            raise CommandError("--rows and --repeat must be positive")
+
+        tables = options["table"] or sorted(TARGETS)
+        self.stdout.write(f"{'table':<28}{'rows':>7}{'model rows/s':>15}{'queries':>9}{'values rows/s':>15}{'queries':>9}{'speedup':>9}")
+
+        for name in tables:
+            serializer_class = TARGETS[name]
+            model = serializer_class.Meta.model
+            mapper = ValuesSerializer.for_serializer(serializer_class)
+            limit = options["rows"]
+
+            # What the list endpoints did before: instances in, ModelSerializer out
+            slow, slow_data, slow_queries = self._timed(
+                lambda: serializer_class(model.objects.order_by("pk")[:limit], many=True).data, options["repeat"])
+            fast, fast_data, fast_queries = self._timed(
+                lambda: mapper.many(model.objects.order_by("pk").values(*dict.fromkeys(mapper.paths))[:limit]), options["repeat"])
+
+            n = len(fast_data)
+            if [dict(row) for row in slow_data] != fast_data:
+                self.stdout.write(self.style.ERROR(f"{name}: outputs differ"))
+                continue
+            if not n:
+                self.stdout.write(f"{name:<28}{0:>7}  (no rows)")
+                continue
+
+            self.stdout.write(
+                f"{name:<28}{n:>7}{n / slow:>15,.0f}{slow_queries:>9}"
+                f"{n / fast:>15,.0f}{fast_queries:>9}{slow / fast:>8.1f}x"
+            )
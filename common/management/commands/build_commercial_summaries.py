@@ -0,0 +1,76 @@
+# common/management/commands/build_commercial_summaries.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from commercial.models import SummaryDirtyKey
+from commercial.summaries import process_dirty, rebuild_range
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring MonthlyCommercialSummary up to date with DailyCollection and "
+        "MonthlyRevenueBilled. By default only the (sales rep, transformer, month) "
+        "keys queued by feed writes are recomputed; --rebuild --from --to recomputes "
+        "every summary in the window (backfills, imports that skipped signals). "
+        "Imported summaries (import_legacy_data history) are never deleted, even "
+        "without feed rows behind them, and keep their totals unless "
+        "--replace-imported lets the feeds overwrite the ones whose key has feed rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recompute every summary between --from and --to.")
+        parser.add_argument("--from", dest="from_month", type=parse_month, metavar="YYYY-MM",
+                            help="First month to rebuild.")
+        parser.add_argument("--to", dest="to_month", type=parse_month, metavar="YYYY-MM",
+                            help="Last month to rebuild.")
+        parser.add_argument("--replace-imported", action="store_true",
+                            help="With --rebuild, overwrite imported summaries whose key has feed rows.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Queued keys per transaction (default 1000).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be written without writing it.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        if not options["rebuild"]:
+            if options["from_month"] or options["to_month"] or options["replace_imported"]:
+                raise CommandError("--from/--to and --replace-imported need --rebuild")
+            if options["dry_run"]:
+                self.stdout.write(f"{SummaryDirtyKey.objects.count()} summary keys queued.")
+                return
+            result = process_dirty(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Recomputed {result['keys']} queued keys: {result['upserted']} summaries upserted, "
+                f"{result['deleted']} deleted, {result['kept']} imported kept."
+            ))
+            return
+
+        start_month, end_month = options["from_month"], options["to_month"]
+        if not start_month or not end_month:
+            raise CommandError("--rebuild needs --from and --to")
+        if start_month > end_month:
+            raise CommandError("--from must not be after --to")
+
+        result = rebuild_range(
+            start_month, end_month, dry_run=options["dry_run"], replace_imported=options["replace_imported"]
+        )
+        window = f"{start_month:%Y-%m} to {end_month:%Y-%m}"
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{result['upserted']} summaries would be written and {result['deleted']} deleted from {window}; "
+                f"{result['kept']} imported would be kept."
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Rebuilt {window}: {result['upserted']} summaries upserted, {result['deleted']} deleted, "
+            f"{result['kept']} imported kept."
+        ))
@@ -1,18 +1,25 @@
 # management/commands/estimate_energy_billed.py
 
+from collections import defaultdict
+
 from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Sum
+from django.db.models.functions import TruncMonth
 from django.db import transaction
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta # type: ignore
-from tqdm import tqdm # type: ignore
 
 from common.models import Feeder
 from commercial.models import MonthlyEnergyBilled
 from technical.models import EnergyDelivered
 
 
+def _as_date(value):
+    # TruncMonth on a DateField returns a date; some backends hand back a datetime
+    return value.date() if isinstance(value, datetime) else value
+
+
 class Command(BaseCommand):
     help = 'Estimate and populate MonthlyEnergyBilled data using proportional allocation'
 
@@ -43,7 +50,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--dry-run',
             action='store_true',
-            help='Show what would be processed without making changes',
+            help='Report the rows that would be created/updated, and their old → new values with --feeder or -v 2, without writing',
         )
         parser.add_argument(
             '--force',
@@ -54,107 +61,102 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.dry_run = options.get('dry_run', False)
         self.force = options.get('force', False)
-        
+        self.verbose = options.get('verbosity', 1) > 1 or bool(options.get('feeder'))
+
         if self.dry_run:
             self.stdout.write(self.style.WARNING("DRY RUN MODE - No changes will be made"))
 
+        if options.get('month') and not options.get('year'):
+            raise CommandError("--month requires --year")
+
         try:
-            if options.get('year') and options.get('month'):
-                # Process specific year and month
-                self.process_specific_month(options['year'], options['month'], options.get('feeder'))
-            elif options.get('year'):
-                # Process entire year
-                self.process_year(options['year'], options.get('feeder'))
-            else:
-                # Process all available data
-                self.process_all_data(options.get('feeder'))
-                
+            months = self.months_to_process(options.get('year'), options.get('month'))
+            stats = self.process_months(months, options.get('feeder'))
+        except CommandError:
+            raise
         except Exception as e:
             raise CommandError(f'Error during processing: {str(e)}')
 
-    def process_all_data(self, feeder_slug=None):
-        """Process all available energy billed data"""
-        self.stdout.write(self.style.HTTP_INFO("Processing all available energy billed data..."))
-        
-        total_processed = 0
-        total_created = 0
-        total_updated = 0
-        total_skipped = 0
-
-        for year, monthly_data in self.ENERGY_BILLED_DATA.items():
-            self.stdout.write(f"\nProcessing year {year}...")
-            
-            year_stats = self.process_year(year, feeder_slug)
-            total_processed += year_stats['processed']
-            total_created += year_stats['created']
-            total_updated += year_stats['updated']
-            total_skipped += year_stats['skipped']
-
-        self.print_summary(total_processed, total_created, total_updated, total_skipped)
-
-    def process_year(self, year, feeder_slug=None):
-        """Process all months in a specific year"""
-        if year not in self.ENERGY_BILLED_DATA:
-            raise CommandError(f"No energy billed data available for year {year}")
+        self.print_summary(stats['processed'], stats['created'], stats['updated'], stats['skipped'], stats['unchanged'])
 
-        monthly_data = self.ENERGY_BILLED_DATA[year]
-        
-        total_processed = 0
-        total_created = 0
-        total_updated = 0
-        total_skipped = 0
-
-        for month_index, energy_gwh in enumerate(monthly_data, 1):
-            month_stats = self.process_specific_month(year, month_index, feeder_slug)
-            total_processed += month_stats['processed']
-            total_created += month_stats['created']
-            total_updated += month_stats['updated']
-            total_skipped += month_stats['skipped']
-
-        return {
-            'processed': total_processed,
-            'created': total_created,
-            'updated': total_updated,
-            'skipped': total_skipped
-        }
-
-    def process_specific_month(self, year, month, feeder_slug=None):
-        """Process a specific year and month"""
-        if year not in self.ENERGY_BILLED_DATA:
+    def months_to_process(self, year=None, month=None):
+        """[(month_date, billed_mwh)] for the requested year/month, or all available data"""
+        if year is not None and year not in self.ENERGY_BILLED_DATA:
             raise CommandError(f"No energy billed data available for year {year}")
-
-        monthly_data = self.ENERGY_BILLED_DATA[year]
-        if month > len(monthly_data):
+        if year is not None and month is not None and not 1 <= month <= len(self.ENERGY_BILLED_DATA[year]):
             raise CommandError(f"No data available for {year}-{month:02d}")
 
-        # Get the energy billed for this month (convert GWh to MWh)
-        energy_gwh = monthly_data[month - 1]
-        disco_total_energy_billed_mwh = Decimal(str(energy_gwh * 1000))  # Convert GWh to MWh
+        months = []
+        for data_year, monthly_data in self.ENERGY_BILLED_DATA.items():
+            if year is not None and data_year != year:
+                continue
+            for month_index, energy_gwh in enumerate(monthly_data, 1):
+                if month is not None and month_index != month:
+                    continue
+                # Convert GWh to MWh
+                months.append((date(data_year, month_index, 1), Decimal(str(energy_gwh * 1000))))
+        return months
+
+    def process_months(self, months, feeder_slug=None):
+        """
+        Allocate each month's DisCo total to feeders in proportion to energy delivered:
+
+            Feeder_Billed_Energy = (Feeder_Delivered / Total_Delivered) × DisCo_Total_Billed
+
+        Energy delivered for the whole window is read in one grouped query and the
+        existing MonthlyEnergyBilled rows in another; each month is then written
+        with a single bulk upsert.
+        """
+        stats = {'processed': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        if not months:
+            return stats
+
+        feeders = Feeder.objects.all()
+        if feeder_slug:
+            feeders = feeders.filter(slug=feeder_slug)
+            if not feeders.exists():
+                raise CommandError(f"Feeder with slug '{feeder_slug}' not found")
+        feeder_names = dict(feeders.values_list('id', 'name'))
+
+        window_start = months[0][0]
+        window_end = months[-1][0] + relativedelta(months=1)
+
+        # {month: {feeder_id: MWh delivered}} for every feeder; shares are of the DisCo total
+        delivered = defaultdict(dict)
+        for row in (
+            EnergyDelivered.objects.filter(date__gte=window_start, date__lt=window_end)
+            .annotate(period=TruncMonth('date'))
+            .values('period', 'feeder_id')
+            .annotate(total=Sum('energy_mwh'))
+            .order_by()
+        ):
+            delivered[_as_date(row['period'])][row['feeder_id']] = row['total'] or Decimal('0')
+
+        existing = {
+            (feeder_id, month): energy
+            for feeder_id, month, energy in MonthlyEnergyBilled.objects.filter(
+                feeder__in=feeders, month__gte=window_start, month__lt=window_end
+            ).values_list('feeder_id', 'month', 'energy_mwh')
+        }
 
-        # Create the month date (first day of month)
-        month_date = date(year, month, 1)
-        month_start = month_date
-        month_end = month_start + relativedelta(months=1)
+        for month_date, disco_total_energy_billed_mwh in months:
+            month_stats = self.process_month(
+                month_date, disco_total_energy_billed_mwh, delivered.get(month_date, {}), feeder_names, existing,
+            )
+            for key, value in month_stats.items():
+                stats[key] += value
+        return stats
+
+    def process_month(self, month_date, disco_total_energy_billed_mwh, delivered, feeder_names, existing):
+        """Compute one month's allocation, report the diff and (unless dry-run) upsert it"""
+        stats = {'processed': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
 
         self.stdout.write(
             f"Processing {month_date.strftime('%B %Y')}: "
-            f"{energy_gwh} GWh ({disco_total_energy_billed_mwh} MWh)"
+            f"{disco_total_energy_billed_mwh / 1000} GWh ({disco_total_energy_billed_mwh} MWh)"
         )
 
-        # Get all feeders or specific feeder
-        if feeder_slug:
-            feeders = Feeder.objects.filter(slug=feeder_slug)
-            if not feeders.exists():
-                raise CommandError(f"Feeder with slug '{feeder_slug}' not found")
-        else:
-            feeders = Feeder.objects.all()
-
-        # Calculate total energy delivered across all feeders for this month
-        total_energy_delivered = EnergyDelivered.objects.filter(
-            date__gte=month_start,
-            date__lt=month_end
-        ).aggregate(total=Sum('energy_mwh'))['total'] or Decimal('0')
-
+        total_energy_delivered = sum(delivered.values(), Decimal('0'))
         if total_energy_delivered == 0:
             self.stdout.write(
                 self.style.WARNING(
@@ -162,99 +164,60 @@ class Command(BaseCommand):
                     f"Skipping this month."
                 )
             )
-            return {'processed': 0, 'created': 0, 'updated': 0, 'skipped': 1}
+            stats['skipped'] = 1
+            return stats
 
         self.stdout.write(f"Total energy delivered: {total_energy_delivered} MWh")
 
-        # Process each feeder
-        processed = 0
-        created = 0
-        updated = 0
-        skipped = 0
-
-        feeders_with_delivery = feeders.filter(
-            energydelivered__date__gte=month_start,
-            energydelivered__date__lt=month_end
-        ).distinct()
-
-        if not feeders_with_delivery.exists():
-            self.stdout.write(
-                self.style.WARNING(
-                    f"No feeders with energy delivery data found for {month_date.strftime('%B %Y')}"
-                )
-            )
-            return {'processed': 0, 'created': 0, 'updated': 0, 'skipped': 1}
-
-        progress_desc = f"Processing feeders for {month_date.strftime('%b %Y')}"
-        
-        for feeder in tqdm(feeders_with_delivery, desc=progress_desc, unit="feeder"):
-            # Calculate feeder's energy delivered for this month
-            feeder_energy_delivered = EnergyDelivered.objects.filter(
-                feeder=feeder,
-                date__gte=month_start,
-                date__lt=month_end
-            ).aggregate(total=Sum('energy_mwh'))['total'] or Decimal('0')
-
+        to_write = []
+        for feeder_id, feeder_energy_delivered in sorted(delivered.items(), key=lambda item: str(feeder_names.get(item[0]))):
+            if feeder_id not in feeder_names:
+                continue
             if feeder_energy_delivered == 0:
-                skipped += 1
+                stats['skipped'] += 1
                 continue
 
-            # Calculate proportional allocation
-            # Feeder_Billed_Energy = (Feeder_Delivered / Total_Delivered) × DisCo_Total_Billed
             proportion = feeder_energy_delivered / total_energy_delivered
             feeder_billed_energy = (proportion * disco_total_energy_billed_mwh).quantize(
                 Decimal('0.01'), rounding=ROUND_HALF_UP
             )
 
-            if not self.dry_run:
-                # Create or update the record
-                monthly_billed, record_created = MonthlyEnergyBilled.objects.update_or_create(
-                    feeder=feeder,
-                    month=month_date,
-                    defaults={'energy_mwh': feeder_billed_energy}
-                )
-
-                if record_created:
-                    created += 1
-                else:
-                    if self.force:
-                        updated += 1
-                    else:
-                        # Record exists and force not specified
-                        skipped += 1
-                        continue
+            current = existing.get((feeder_id, month_date))
+            if current is None:
+                action = 'created'
+            elif not self.force:
+                # Record exists and force not specified
+                action = 'skipped'
+            elif current == feeder_billed_energy:
+                action = 'unchanged'
             else:
-                # Dry run - check if record exists
-                exists = MonthlyEnergyBilled.objects.filter(
-                    feeder=feeder,
-                    month=month_date
-                ).exists()
-                
-                if exists and not self.force:
-                    skipped += 1
-                elif exists:
-                    updated += 1
-                else:
-                    created += 1
-
-            processed += 1
-
-            # Log detailed info for single feeder processing
-            if feeder_slug:
+                action = 'updated'
+
+            stats[action] += 1
+            if action == 'skipped':
+                continue
+            stats['processed'] += 1
+            if action != 'unchanged':
+                to_write.append(MonthlyEnergyBilled(feeder_id=feeder_id, month=month_date, energy_mwh=feeder_billed_energy))
+
+            if self.verbose:
+                change = f"{current} → {feeder_billed_energy}" if current is not None else f"new {feeder_billed_energy}"
                 self.stdout.write(
-                    f"  {feeder.name}: {feeder_energy_delivered} MWh delivered → "
-                    f"{feeder_billed_energy} MWh billed "
-                    f"({proportion:.4%} share)"
+                    f"  {feeder_names[feeder_id]}: {feeder_energy_delivered} MWh delivered → "
+                    f"{change} MWh billed ({proportion:.4%} share) [{action}]"
                 )
 
-        return {
-            'processed': processed,
-            'created': created,
-            'updated': updated,
-            'skipped': skipped
-        }
+        if to_write and not self.dry_run:
+            with transaction.atomic():
+                MonthlyEnergyBilled.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=['feeder', 'month'],
+                    update_fields=['energy_mwh'],
+                )
+        return stats
 
-    def print_summary(self, processed, created, updated, skipped):
+    def print_summary(self, processed, created, updated, skipped, unchanged=0):
         """Print processing summary"""
         self.stdout.write(f"\n{'='*60}")
         if self.dry_run:
@@ -266,6 +229,8 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"Records created: {created}"))
         if updated > 0:
             self.stdout.write(self.style.SUCCESS(f"Records updated: {updated}"))
+        if unchanged > 0:
+            self.stdout.write(f"Records unchanged: {unchanged}")
         if skipped > 0:
             self.stdout.write(self.style.WARNING(f"Records skipped: {skipped}"))
         self.stdout.write(f"{'='*60}")
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from common.models import State, BusinessDistrict, InjectionSubstation, Feeder, Band
 from financial.models import Opex, OpexCategory, GLBreakdown
 from technical.models import HourlyLoad, FeederInterruption
+from technical.supply import refresh_hours_of_supply
 from hr.models import Staff, Department, Role
 from django.utils.dateparse import parse_date
 from decouple import config
@@ -252,6 +253,7 @@ class Command(BaseCommand):
         batch_size = 1000
         load_batch = []
         interruption_batch = []
+        supply_days = 0
 
         # Preload all feeders to avoid repeated queries
         feeder_map = {f.slug: f for f in Feeder.objects.all()}
@@ -278,6 +280,7 @@ class Command(BaseCommand):
                     WHERE DATE(Date) = %s
                 """, (current,))
                 rows = cursor.fetchall()
+                day_keys = set()
 
                 self.stdout.write(self.style.HTTP_INFO(f"  → Rows returned: {len(rows)}"))
 
@@ -313,6 +316,7 @@ class Command(BaseCommand):
                             hour=reading_hour,
                             load_mw=load_value
                         ))
+                        day_keys.add((feeder.id, parsed_date))
                         count += 1
                     elif load_flag:
                         occurred_at = datetime.combine(parsed_date, time(hour=reading_hour))
@@ -343,11 +347,15 @@ class Command(BaseCommand):
                     FeederInterruption.objects.bulk_create(interruption_batch, ignore_conflicts=True)
                     interruption_batch.clear()
 
+                # Derive hours of supply for the feeder-days just loaded
+                supply_days += refresh_hours_of_supply(day_keys)
+
                 current += timedelta(days=1)
 
         # Final logs
         self.stdout.write(self.style.SUCCESS(f"\nHourly loads imported: {count}"))
         self.stdout.write(self.style.SUCCESS(f"Interruption events created: {interruptions_created}"))
+        self.stdout.write(self.style.SUCCESS(f"Feeder-days of supply derived: {supply_days}"))
         self.stdout.write(self.style.WARNING(f"Skipped rows: {len(skipped_rows)}"))
         
         if skipped_rows:
@@ -983,6 +991,8 @@ class Command(BaseCommand):
                     skipped += 1
                     continue
 
+                # Marked imported so build_commercial_summaries keeps it: the legacy
+                # daily collections behind these totals are not imported
                 summary, created = MonthlyCommercialSummary.objects.update_or_create(
                     sales_rep=sales_rep,
                     transformer=transformer,
@@ -992,6 +1002,7 @@ class Command(BaseCommand):
                         "customers_responded": row.get("response") or 0,
                         "revenue_billed": row.get("billed") or 0,
                         "revenue_collected": row.get("payment") or 0,
+                        "source": MonthlyCommercialSummary.IMPORTED,
                     }
                 )
             
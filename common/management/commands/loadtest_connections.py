@@ -0,0 +1,101 @@
+# common/management/commands/loadtest_connections.py
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+
+from common.perf import connection_counter, connection_stats, percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent requests against the database and compare connection-setup "
+        "overhead with and without connection reuse. Each simulated request follows "
+        "Django's request cycle (close_old_connections before and after) around one "
+        "query, so CONN_MAX_AGE and DB_POOL behave as they do under gunicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Simulated requests per mode (default 500).")
+        parser.add_argument("--concurrency", type=int, default=8, help="Worker threads (default 8).")
+        parser.add_argument("--query", default="SELECT 1", help="SQL each request runs (default SELECT 1).")
+        parser.add_argument("--mode", choices=["both", "configured", "no-reuse"], default="both",
+                            help="no-reuse forces CONN_MAX_AGE=0 without a pool, as before persistent connections.")
+
+    def _request(self, sql):
+        started = time.perf_counter()
+        close_old_connections()
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.fetchall()
+        close_old_connections()
+        return (time.perf_counter() - started) * 1000
+
+    def _run(self, options):
+        connection_counter.reset()
+        latencies = []
+        lock = threading.Lock()
+        share, extra = divmod(options["requests"], options["concurrency"])
+
+        def worker(count):
+            timings = [self._request(options["query"]) for _ in range(count)]
+            # Threads keep their own connections; close them so the next mode starts clean
+            connections.close_all()
+            with lock:
+                latencies.extend(timings)
+
+        threads = [
+            threading.Thread(target=worker, args=(share + (i < extra),))
+            for i in range(options["concurrency"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        return {
+            "requests_per_s": round(options["requests"] / wall, 1),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "connections_opened": connection_counter.opened,
+        }
+
+    def _no_reuse(self, options):
+        # Every thread builds its connection from this dict, so edit it in place for the run
+        settings_dict = connections.settings[connection.alias]
+        saved_age, saved_options = settings_dict["CONN_MAX_AGE"], dict(settings_dict.get("OPTIONS", {}))
+        settings_dict["CONN_MAX_AGE"] = 0
+        settings_dict.get("OPTIONS", {}).pop("pool", None)
+        try:
+            return self._run(options)
+        finally:
+            settings_dict["CONN_MAX_AGE"] = saved_age
+            settings_dict["OPTIONS"] = saved_options
+
+    def handle(self, *args, **options):
+        if options["requests"] <= 0 or options["concurrency"] <= 0:
+            raise CommandError("--requests and --concurrency must be positive")
+
+        connections.close_all()
+        results = {}
+        if options["mode"] in ("both", "no-reuse"):
+            results["no-reuse"] = self._no_reuse(options)
+        if options["mode"] in ("both", "configured"):
+            results["configured"] = self._run(options)
+
+        stats = connection_stats()
+        self.stdout.write(
+            f"{connection.vendor}: CONN_MAX_AGE={stats['conn_max_age']}, health checks={stats['health_checks']}, "
+            f"pool={'on' if stats['pool'] is not None else 'off'}; "
+            f"{options['requests']} requests × {options['concurrency']} threads"
+        )
+        self.stdout.write(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'connections':>13}")
+        for mode, row in results.items():
+            self.stdout.write(
+                f"{mode:<12}{row['requests_per_s']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['connections_opened']:>13}"
+            )
+        if stats["pool"]:
+            self.stdout.write("pool: " + ", ".join(f"{k}={v}" for k, v in sorted(stats["pool"].items())))
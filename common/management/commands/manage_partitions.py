@@ -0,0 +1,79 @@
+# common/management/commands/manage_partitions.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from common.partitioning import (
+    PARTITIONED, convert_table, detach_before, ensure_partitions, is_partitioned, partitions, supported,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Range-partition HourlyLoad, DailyCollection (monthly) and FeederInterruption (yearly) "
+        "on PostgreSQL.\n"
+        "  --convert        turn the plain tables into partitioned ones, copying existing rows\n"
+        "  (default)        create the partitions for the current and next --ahead periods\n"
+        "  --detach-before  detach (or --drop) partitions that end on or before a date\n"
+        "  --status         list the partitions\n"
+        "Run it from cron (e.g. monthly) so future partitions exist before data arrives."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", help="Only these models (e.g. technical.HourlyLoad).")
+        parser.add_argument("--ahead", type=int, default=3, help="Future periods to create (default 3).")
+        parser.add_argument("--convert", action="store_true", help="Convert plain tables to partitioned tables.")
+        parser.add_argument("--detach-before", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                            help="Detach partitions whose period ends on or before this date.")
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them.")
+        parser.add_argument("--status", action="store_true", help="List partitions and exit.")
+
+    def handle(self, *args, **options):
+        if not supported():
+            self.stdout.write(
+                f"Partitioning needs PostgreSQL; {connection.vendor} tables stay unpartitioned. Nothing to do."
+            )
+            return
+        if options["ahead"] < 0:
+            raise CommandError("--ahead can't be negative")
+        if options["drop"] and not options["detach_before"]:
+            raise CommandError("--drop only applies with --detach-before")
+
+        specs = PARTITIONED
+        if options["model"]:
+            specs = [s for s in PARTITIONED if s.model in options["model"]]
+            unknown = set(options["model"]) - {s.model for s in specs}
+            if unknown:
+                raise CommandError(f"Not partitioned: {', '.join(sorted(unknown))}")
+
+        for spec in specs:
+            table = spec.table
+            partitioned = is_partitioned(table)
+
+            if options["status"]:
+                rows = partitions(table) if partitioned else []
+                self.stdout.write(f"{spec.model} ({table}): {'partitioned by ' + spec.interval if partitioned else 'not partitioned'}")
+                for name, bound in rows:
+                    self.stdout.write(f"    {name:<45} {bound}")
+                continue
+
+            if options["convert"]:
+                if partitioned:
+                    self.stdout.write(f"{spec.model}: already partitioned")
+                else:
+                    copied = convert_table(spec, options["ahead"])
+                    self.stdout.write(self.style.SUCCESS(f"✔ {spec.model}: partitioned by {spec.interval}, {copied} rows copied"))
+            elif not partitioned:
+                self.stdout.write(self.style.WARNING(f"{spec.model}: not partitioned, run with --convert first"))
+                continue
+
+            created = ensure_partitions(spec, options["ahead"])
+            if created:
+                self.stdout.write(f"{spec.model}: created {', '.join(created)}")
+
+            if options["detach_before"]:
+                affected = detach_before(spec, options["detach_before"], drop=options["drop"])
+                verb = "dropped" if options["drop"] else "detached"
+                self.stdout.write(f"{spec.model}: {verb} {', '.join(affected) or 'nothing'}")
@@ -0,0 +1,89 @@
+# common/management/commands/perf_report.py
+
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.perf import percentile
+
+
+SORT_KEYS = {
+    "queries": "avg_queries",
+    "max-queries": "max_queries",
+    "p95": "p95_ms",
+    "db": "avg_db_ms",
+    "calls": "calls",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarise the per-request JSON log written by QueryInstrumentationMiddleware "
+        "(PERF_LOG_FILE): query counts, DB/Python time and response size per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="Log file (defaults to PERF_LOG_FILE).")
+        parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="queries")
+        parser.add_argument("--top", type=int, default=0, help="Only the first N endpoints.")
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+
+    def _read(self, path):
+        by_endpoint = defaultdict(list)
+        try:
+            with open(path) as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and "endpoint" in entry:
+                        by_endpoint[entry["endpoint"]].append(entry)
+        except OSError as exc:
+            raise CommandError(f"Can't read {path}: {exc}")
+        return by_endpoint
+
+    def _summarise(self, endpoint, entries):
+        calls = len(entries)
+        latencies = [e["db_ms"] + e["python_ms"] for e in entries]
+        return {
+            "endpoint": endpoint,
+            "calls": calls,
+            "avg_queries": round(sum(e["queries"] for e in entries) / calls, 1),
+            "max_queries": max(e["queries"] for e in entries),
+            "avg_db_ms": round(sum(e["db_ms"] for e in entries) / calls, 2),
+            "avg_python_ms": round(sum(e["python_ms"] for e in entries) / calls, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "avg_bytes": round(sum(e["bytes"] for e in entries) / calls),
+            "avg_memo_hits": round(sum(e.get("memo_hits", 0) for e in entries) / calls, 1),
+        }
+
+    def handle(self, *args, **options):
+        path = options["file"] or getattr(settings, "PERF_LOG_FILE", "")
+        if not path:
+            raise CommandError("No log file: pass --file or set PERF_LOG_FILE")
+
+        rows = [self._summarise(endpoint, entries) for endpoint, entries in self._read(path).items()]
+        rows.sort(key=lambda row: row[SORT_KEYS[options["sort"]]], reverse=True)
+        if options["top"]:
+            rows = rows[:options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        if not rows:
+            self.stdout.write("No requests logged.")
+            return
+
+        self.stdout.write(
+            f"{'endpoint':<55}{'calls':>7}{'avg q':>8}{'max q':>7}{'db ms':>9}{'py ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'bytes':>10}{'memo':>7}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint'][:54]:<55}{row['calls']:>7}{row['avg_queries']:>8}{row['max_queries']:>7}"
+                f"{row['avg_db_ms']:>9}{row['avg_python_ms']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['avg_bytes']:>10}{row['avg_memo_hits']:>7}"
+            )
@@ -0,0 +1,40 @@
+# common/management/commands/reconcile_customer_counters.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from commercial.counters import reconcile
+from common.models import DistributionTransformer
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount customers per (transformer, band, category, metering type) and repair "
+        "CustomerCounter rows that drifted (bulk imports and queryset updates bypass "
+        "the signals). Run nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--transformer", action="append", metavar="SLUG", help="Only these transformers.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the drift without fixing it.")
+
+    def handle(self, *args, **options):
+        transformer_ids = None
+        if options["transformer"]:
+            found = dict(
+                DistributionTransformer.objects.filter(slug__in=options["transformer"]).values_list("slug", "id")
+            )
+            unknown = set(options["transformer"]) - found.keys()
+            if unknown:
+                raise CommandError(f"Unknown transformer(s): {', '.join(sorted(unknown))}")
+            transformer_ids = list(found.values())
+
+        drift = reconcile(transformer_ids, dry_run=options["dry_run"])
+
+        if options["verbosity"] >= 2:
+            for (transformer_id, band_id, category, metering_type), (stored, actual) in sorted(drift.items(), key=str):
+                self.stdout.write(
+                    f"  transformer {transformer_id} band {band_id or '-'} {category}/{metering_type}: {stored} → {actual}"
+                )
+        verb = "would fix" if options["dry_run"] else "fixed"
+        style = self.style.WARNING if drift and options["dry_run"] else self.style.SUCCESS
+        self.stdout.write(style(f"✓ {len(drift)} drifted counters {verb}."))
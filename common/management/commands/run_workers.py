@@ -0,0 +1,70 @@
+# common/management/commands/run_workers.py
+
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from common.jobs import work, worker_name
+
+
+def _worker_main(stop, once, poll):
+    import django
+
+    # Needed under the spawn start method; a no-op for forked children
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        work(worker_name(), once=once, poll=poll, stop=stop)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (common.jobs) from the database queue in N worker "
+        "processes. Workers claim jobs with SKIP LOCKED, so several hosts can run "
+        "this side by side. SIGTERM/SIGINT lets running jobs finish, then exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes (default 1).")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once nothing is runnable instead of polling.")
+
+    def handle(self, *args, **options):
+        if options["workers"] <= 0:
+            raise CommandError("--workers must be positive")
+        if options["poll"] <= 0:
+            raise CommandError("--poll must be positive")
+
+        stop = multiprocessing.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after the running jobs…")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        if options["workers"] == 1:
+            done = work(worker_name(), once=options["once"], poll=options["poll"], stop=stop)
+            self.stdout.write(self.style.SUCCESS(f"✓ Ran {done} jobs."))
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_main, args=(stop, options["once"], options["poll"]), daemon=True)
+            for _ in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} workers: {', '.join(str(p.pid) for p in processes)}")
+        for process in processes:
+            process.join()
+        failed = [process.pid for process in processes if process.exitcode]
+        if failed:
+            raise CommandError(f"Workers {', '.join(map(str, failed))} exited with errors")
+        self.stdout.write(self.style.SUCCESS(f"✓ {len(processes)} workers stopped."))
@@ -0,0 +1,128 @@
+# common/memo.py
+"""
+Request-scoped memoisation for composite views.
+
+Dashboard helpers are often called several times per request with the same
+arguments (the previous month is both a history point and the delta base,
+every transformer of a feeder re-sums the same district opex...).
+RequestMemoMiddleware opens a memo per request and drops it at the end, so
+nothing outlives the request and no invalidation is needed.
+
+    @memoize
+    def calculate_energy_delivered(from_date, to_date, feeder_ids): ...
+
+    total = memo_aggregate(Opex.objects.filter(district=d), total=Sum("credit"))["total"]
+
+Keys are built from the arguments; QuerySets are keyed on their compiled SQL
+and params, model instances on (model, pk). Outside a memo (commands, shell,
+tests without the middleware) everything is computed as usual.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+
+
+class RequestMemo:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._store:
+                self.hits += 1
+                return self._store[key]
+        # Computed outside the lock: a concurrent miss on the same key just computes twice
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._store.setdefault(key, value)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_current = contextvars.ContextVar("request_memo", default=None)
+
+
+@contextmanager
+def request_memo():
+    """Memoise everything inside the block; yields the RequestMemo."""
+    memo = RequestMemo()
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        _current.reset(token)
+
+
+def _normalise(value):
+    if isinstance(value, models.QuerySet):
+        try:
+            sql, params = value.query.sql_with_params()
+        except EmptyResultSet:
+            sql, params = "<empty>", ()
+        return ("queryset", value.model._meta.label, sql, _normalise(params))
+    if isinstance(value, models.Model):
+        return ("instance", value._meta.label, value.pk)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_normalise(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalise(v)) for k, v in value.items()))
+    return value
+
+
+def memo_key(*args, **kwargs):
+    return _normalise(args), _normalise(kwargs)
+
+
+def memoize(func):
+    """Cache `func`'s result per request, keyed on its arguments."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = _current.get()
+        if memo is None:
+            return func(*args, **kwargs)
+        return memo.get_or_compute((func, memo_key(*args, **kwargs)), lambda: func(*args, **kwargs))
+    return wrapper
+
+
+def memo_aggregate(queryset, **aggregations):
+    """queryset.aggregate(**aggregations), once per request for the same SQL."""
+    memo = _current.get()
+    if memo is None:
+        return queryset.aggregate(**aggregations)
+    key = ("aggregate", _normalise(queryset), tuple(sorted((k, repr(v)) for k, v in aggregations.items())))
+    return memo.get_or_compute(key, lambda: queryset.aggregate(**aggregations))
+
+
+def memo_get(queryset, **lookups):
+    """queryset.get(**lookups), once per request. DoesNotExist isn't cached."""
+    if isinstance(queryset, type) and issubclass(queryset, models.Model):
+        queryset = queryset._default_manager.all()
+    memo = _current.get()
+    if memo is None:
+        return queryset.get(**lookups)
+    return memo.get_or_compute(("get", _normalise(queryset.filter(**lookups))), lambda: queryset.get(**lookups))
+
+
+class RequestMemoMiddleware:
+    """Opens a memo for each request; its hit/miss counts end up on request.memo_stats."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo() as memo:
+            response = self.get_response(request)
+        request.memo_stats = memo.stats()
+        return response
@@ -1,3 +1,22 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from .dimensions import get_network
+from .jobs import REPLAY_ENVIRON_KEY, enqueue
+from .models import Job
+from .serializers import JobSerializer, ValuesSerializer
+from .tree import LOCATION_LEVELS, SUBSTATION_LEVELS, get_tree
+
+
 class LocationFilterMixin:
     """
     Adds filtering by:
@@ -6,7 +25,9 @@ class LocationFilterMixin:
     - substation
     - feeder
     - transformer
-    Works with models connected via ForeignKey chains.
+    for models with `feeder` and `transformer` foreign keys. State, district
+    and substation scopes are expanded to feeder ids through common.tree
+    instead of joining up the hierarchy.
     """
     def filter_by_location(self, qs):
         request = self.request
@@ -21,15 +42,25 @@ class LocationFilterMixin:
         elif feeder:
             qs = qs.filter(feeder__slug=feeder)
         elif substation:
-            qs = qs.filter(feeder__substation__slug=substation)
+            qs = qs.filter(feeder_id__in=scope_feeder_ids("substation", substation))
         elif district:
-            qs = qs.filter(feeder__substation__district__slug=district)
+            qs = qs.filter(feeder_id__in=scope_feeder_ids("district", district))
         elif state:
-            qs = qs.filter(feeder__substation__district__state__slug=state)
+            qs = qs.filter(feeder_id__in=scope_feeder_ids("state", state))
 
         return qs
 
 
+def scope_feeder_ids(level, slug):
+    """Ids of the feeders under the state/district/substation with this slug."""
+    network = get_network()
+    node = getattr(network, f"{level}s").by_slug(slug)
+    if node is None:
+        return []
+    levels = SUBSTATION_LEVELS if level == "substation" else LOCATION_LEVELS
+    return get_tree(levels).ids_under(level, node.id, "feeder")
+
+
 class DistrictLocationFilterMixin:
     def filter_by_location(self, qs):
         request = self.request
@@ -42,3 +73,191 @@ class DistrictLocationFilterMixin:
             qs = qs.filter(district__state__slug=state)
 
         return qs
+
+
+class FastReadMixin:
+    """
+    Serves list and retrieve from queryset.values() through a ValuesSerializer
+    derived from the view's serializer_class, skipping model instances and
+    ModelSerializer field dispatch. Output matches the regular serializer;
+    only the selected columns (and the joins slug fields need) are queried.
+
+    Writes still go through the regular serializer. Retrieve does not load
+    an instance, so don't use this on views with object-level permissions.
+    """
+
+    def get_values_serializer(self):
+        return ValuesSerializer.for_serializer(self.get_serializer_class())
+
+    def get_values_queryset(self, queryset, mapper, extra=()):
+        fields = dict.fromkeys((*mapper.paths, *extra))
+        return queryset.select_related(None).prefetch_related(None).values(*fields)
+
+    def list(self, request, *args, **kwargs):
+        mapper = self.get_values_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # Keyset pagination reads its position back off each row
+        extra = ()
+        if hasattr(self.paginator, 'get_ordering'):
+            extra = [attname for attname, _, _ in self.paginator.get_ordering(queryset, self)]
+        rows = self.get_values_queryset(queryset, mapper, extra)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(mapper.many(page))
+        return Response(mapper.many(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        mapper = self.get_values_serializer()
+        queryset = self.get_values_queryset(self.filter_queryset(self.get_queryset()), mapper)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(mapper.to_representation(row))
+
+
+class DeferredActionMixin:
+    """
+    Lets heavy actions (bulk ingest) run on the common.jobs queue instead of
+    inside the request. An action opts in by starting with
+
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
+
+    Requests sent with `Prefer: respond-async`, or carrying at least
+    JOB_DEFER_ROWS rows in their list payloads, are stored as a job and
+    answered 202 Accepted with the job's status (Location: /api/jobs/<id>/).
+    A worker later replays the request through this same action, so the
+    job's result is the response the client would have got. An
+    Idempotency-Key header makes client retries of the same method and path
+    return the same job.
+    """
+
+    def should_defer(self, request):
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            return True
+        threshold = getattr(settings, 'JOB_DEFER_ROWS', 0)
+        data = request.data if isinstance(request.data, dict) else {}
+        rows = sum(len(value) for value in data.values() if isinstance(value, list))
+        return bool(threshold) and rows >= threshold
+
+    def defer(self, request):
+        """A 202 response for the job that will run this request, or None to run it now."""
+        if request.META.get(REPLAY_ENVIRON_KEY) or not self.should_defer(request):
+            return None
+        key = request.headers.get('Idempotency-Key')
+        if key:
+            # Clients reuse keys across endpoints; a retry only matches the same action
+            key = f'{request.method} {request.path} {key}'
+            if len(key) > Job._meta.get_field('idempotency_key').max_length:
+                return Response({'error': 'Idempotency-Key is too long'}, status=status.HTTP_400_BAD_REQUEST)
+        job = enqueue(
+            'common.replay_request',
+            {'method': request.method, 'path': request.get_full_path(), 'data': request.data},
+            idempotency_key=key,
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': f'/api/jobs/{job.pk}/'})
+
+
+class StreamingExportMixin:
+    """
+    Adds ?format=csv|ndjson&stream=1 to a viewset's list endpoint.
+
+    Rows are read with values_list().iterator() and written straight into a
+    StreamingHttpResponse, so no model instances or serializers are built and
+    memory stays flat whatever the size of the export. The view's own
+    get_queryset()/filter_queryset() still decide which rows go out.
+
+    `export_fields` lists the columns: a field path ("amount", "feeder__slug")
+    or a (label, path) pair. It defaults to every concrete field, labelled the
+    way the ModelSerializer labels them.
+    """
+    export_formats = ('csv', 'ndjson')
+    export_fields = None
+    export_chunk_size = 2000
+
+    def get_export_format(self, request):
+        fmt = request.query_params.get('format')
+        stream = request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+        if getattr(self, 'action', None) == 'list' and stream and fmt in self.export_formats:
+            return fmt
+        return None
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format=csv has no DRF renderer; skip negotiation so it doesn't 404
+        if self.get_export_format(request):
+            renderer = self.get_renderers()[0]
+            return renderer, renderer.media_type
+        return super().perform_content_negotiation(request, force)
+
+    def list(self, request, *args, **kwargs):
+        fmt = self.get_export_format(request)
+        if fmt:
+            return self.stream_export(fmt)
+        return super().list(request, *args, **kwargs)
+
+    def get_export_columns(self, model):
+        if self.export_fields is None:
+            return [(f.name, f.attname) for f in model._meta.concrete_fields]
+        return [(c, c) if isinstance(c, str) else tuple(c) for c in self.export_fields]
+
+    def get_export_rows(self, paths):
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        ordering = getattr(self, 'keyset_ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset.values_list(*paths).iterator(chunk_size=self.export_chunk_size)
+
+    def stream_export(self, fmt):
+        model = self.get_queryset().model
+        labels, paths = zip(*self.get_export_columns(model))
+        rows = self.get_export_rows(paths)
+
+        if fmt == 'csv':
+            content, content_type = _csv_stream(labels, rows, self.export_chunk_size), 'text/csv'
+        else:
+            content, content_type = _ndjson_stream(labels, rows, self.export_chunk_size), 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{model._meta.model_name}.{fmt}"'
+        return response
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _csv_stream(labels, rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    # Header goes out before the query runs, so the client sees bytes immediately
+    writer.writerow(labels)
+    yield drain()
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_export_value(v) for v in row])
+        if i % chunk_size == 0:
+            yield drain()
+    yield drain()
+
+
+def _ndjson_stream(labels, rows, chunk_size):
+    lines = []
+    for i, row in enumerate(rows):
+        lines.append(json.dumps(dict(zip(labels, row)), cls=DjangoJSONEncoder))
+        # Flush the first row on its own so the client sees bytes immediately
+        if i == 0 or len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,250 @@
+# common/pagination.py
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Below this many rows an exact COUNT(*) is cheap and the planner's guess is least reliable
+EXACT_COUNT_BELOW = 10_000
+
+
+def planner_estimate(queryset):
+    """
+    The PostgreSQL planner's row estimate for a queryset (EXPLAIN, nothing is
+    executed), or None on other backends.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset, exact_below=EXACT_COUNT_BELOW):
+    """
+    Returns (count, exact). Uses the planner's estimate when it is at least
+    `exact_below` rows, falling back to COUNT(*) for small results and on
+    backends without one.
+    """
+    estimate = planner_estimate(queryset)
+    if estimate is None or estimate < exact_below:
+        return queryset.count(), True
+    return estimate, False
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a table's natural ordering.
+
+    The ordering is taken from, in order of preference: the view's
+    `keyset_ordering`, an explicit order_by() on the queryset, the model's
+    Meta.ordering. The primary key is always appended as a tiebreaker, so
+    every position is unique and pages never skip or repeat rows.
+
+    Views can set `page_size` and `max_page_size` to override the defaults.
+    Clients may ask for a smaller/larger page with ?page_size=, capped at
+    max_page_size.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = getattr(settings, 'API_PAGE_SIZE', 100)
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    # ─── Ordering ────────────────────────────────────────────────────────────
+    def get_ordering(self, queryset, view):
+        model = queryset.model
+        ordering = (
+            getattr(view, 'keyset_ordering', None)
+            or [o for o in queryset.query.order_by if isinstance(o, str)]
+            or model._meta.ordering
+            or []
+        )
+
+        fields = []
+        for item in ordering:
+            if not isinstance(item, str) or item == '?':
+                continue
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.name
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Related lookups (a__b) can't be read back off the instance; skip them
+                continue
+            fields.append((field.attname, descending, field.null))
+
+        pk_name = model._meta.pk.attname
+        if pk_name not in [f[0] for f in fields]:
+            fields.append((pk_name, False, False))
+        return fields
+
+    @staticmethod
+    def _order_by(fields, reverse=False):
+        expressions = []
+        for attname, descending, nullable in fields:
+            if reverse:
+                descending = not descending
+            expr = F(attname).desc if descending else F(attname).asc
+            # Keep NULLs last going forwards (first when walking backwards) on every backend
+            expressions.append(expr(nulls_first=True) if nullable and reverse
+                               else expr(nulls_last=True) if nullable
+                               else expr())
+        return expressions
+
+    @staticmethod
+    def _position_filter(fields, position, reverse=False):
+        """Rows strictly after (or before, when reverse) the given position."""
+        condition = Q(pk__in=[])
+        equal_so_far = Q()
+        for (attname, descending, nullable), value in zip(fields, position):
+            forwards_gt = (descending == reverse)  # ascending & forwards, or descending & backwards
+            if value is None:
+                # NULLs sort last: nothing is after a NULL, every non-NULL is before it
+                if reverse:
+                    condition |= equal_so_far & Q(**{f'{attname}__isnull': False})
+                equal_so_far &= Q(**{f'{attname}__isnull': True})
+                continue
+
+            step = Q(**{f"{attname}__{'gt' if forwards_gt else 'lt'}": value})
+            if nullable and not reverse:
+                step |= Q(**{f'{attname}__isnull': True})
+            condition |= equal_so_far & step
+            equal_so_far &= Q(**{attname: value})
+        return condition
+
+    # ─── Cursor encoding ─────────────────────────────────────────────────────
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, (Decimal, UUID)):
+            return str(value)
+        return value
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': [self._encode_value(v) for v in position], 'r': int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, n_fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != n_fields:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    # ─── Paging ──────────────────────────────────────────────────────────────
+    def get_page_size(self, request, view=None):
+        default = getattr(view, 'page_size', None) or self.page_size
+        cap = getattr(view, 'max_page_size', None) or self.max_page_size
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+            if requested > 0:
+                return min(requested, cap)
+        except (KeyError, ValueError):
+            pass
+        return min(default, cap)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request, view)
+        self.fields = self.get_ordering(queryset, view)
+
+        position, reverse = self.decode_cursor(request, len(self.fields))
+        if position is not None:
+            queryset = queryset.filter(self._position_filter(self.fields, position, reverse))
+
+        queryset = queryset.order_by(*self._order_by(self.fields, reverse))
+        results = list(queryset[:self.page_size_value + 1])
+        has_more = len(results) > self.page_size_value
+        results = results[:self.page_size_value]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def _position(self, row):
+        if isinstance(row, dict):  # values() querysets
+            return [row[attname] for attname, _, _ in self.fields]
+        return [getattr(row, attname) for attname, _, _ in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._position(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self._position(self.page[0]), True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,213 @@
+# common/partitioning.py
+"""
+Declarative range partitioning (PostgreSQL) for the unbounded fact tables,
+driven by `manage.py manage_partitions`.
+
+The Django models are unchanged: a partitioned table keeps the same columns,
+indexes and foreign keys, only its primary key becomes (id, <partition key>)
+because PostgreSQL requires the key in every unique constraint. Every
+unique_together on these models already includes it.
+
+Rows outside the created partitions land in `<table>_default`; creating a
+partition moves any such rows out of the default first, so running the
+command ahead of time (cron) is an optimisation, not a correctness need.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.apps import apps
+from django.db import connection, transaction
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    model: str      # app label + model name
+    column: str     # partition key
+    interval: str   # "month" or "year"
+
+    @property
+    def table(self):
+        return apps.get_model(self.model)._meta.db_table
+
+
+PARTITIONED = (
+    PartitionSpec("technical.HourlyLoad", "date", "month"),
+    PartitionSpec("commercial.DailyCollection", "date", "month"),
+    PartitionSpec("technical.FeederInterruption", "occurred_at", "year"),
+)
+
+
+def supported():
+    return connection.vendor == "postgresql"
+
+
+def period_start(day, interval):
+    return day.replace(day=1) if interval == "month" else day.replace(month=1, day=1)
+
+
+def step(interval):
+    return relativedelta(months=1) if interval == "month" else relativedelta(years=1)
+
+
+def partition_name(table, start, interval):
+    return f"{table}_p{start:%Y_%m}" if interval == "month" else f"{table}_p{start:%Y}"
+
+
+def partition_bounds(first, last, interval):
+    """[(start, end)] periods covering first..last inclusive; end is exclusive."""
+    bounds = []
+    start = period_start(first, interval)
+    while start <= last:
+        bounds.append((start, start + step(interval)))
+        start += step(interval)
+    return bounds
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+        return cursor.fetchone() is not None
+
+
+def partitions(table):
+    """[(name, bound expression)] of the partitions attached to `table`."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [table],
+        )
+        return cursor.fetchall()
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def create_partition(spec, start):
+    """
+    Create the partition for the period starting at `start` if it doesn't
+    exist, moving matching rows out of the default partition. Returns True
+    if a partition was created.
+    """
+    table, name = spec.table, partition_name(spec.table, start, spec.interval)
+    end = start + step(spec.interval)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+        default, column = _qn(f"{table}_default"), _qn(spec.column)
+        with transaction.atomic():
+            cursor.execute(f"CREATE TEMP TABLE _moving (LIKE {_qn(table)})")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {default} WHERE {column} >= %s AND {column} < %s RETURNING *) "
+                f"INSERT INTO _moving SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"CREATE TABLE {_qn(name)} PARTITION OF {_qn(table)} FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            cursor.execute(f"INSERT INTO {_qn(table)} SELECT * FROM _moving")
+            cursor.execute("DROP TABLE _moving")
+    return True
+
+
+def ensure_partitions(spec, ahead, today=None):
+    """Create partitions from the current period through `ahead` periods ahead."""
+    today = today or date.today()
+    start = period_start(today, spec.interval)
+    last = start + step(spec.interval) * ahead
+    return [
+        partition_name(spec.table, lower, spec.interval)
+        for lower, _ in partition_bounds(start, last, spec.interval)
+        if create_partition(spec, lower)
+    ]
+
+
+def convert_table(spec, ahead, today=None):
+    """
+    Swap a plain table for a partitioned one in a single transaction: rename
+    it aside, create the partitioned table with the same columns, partitions
+    for every period that has data plus `ahead` future ones, copy the rows,
+    then drop the old table and recreate its indexes and constraints.
+    Returns the number of rows copied.
+    """
+    table = spec.table
+    legacy = f"{table}_legacy"
+    column = _qn(spec.column)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Indexes that don't back a constraint, then the unique/foreign-key constraints themselves
+        cursor.execute(
+            """
+            SELECT indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexname NOT IN (
+                SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s)
+            )
+            """,
+            [table, table],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype IN ('u', 'f') ORDER BY contype DESC",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'", [table])
+        primary_key = cursor.fetchone()[0]
+        cursor.execute(f"SELECT min({column}), max({column}) FROM {_qn(table)}")
+        first, last = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}")
+        cursor.execute(f"ALTER TABLE {_qn(legacy)} RENAME CONSTRAINT {_qn(primary_key)} TO {_qn(legacy + '_pkey')}")
+        cursor.execute(
+            f"CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(primary_key)} PRIMARY KEY (id, {column})")
+        cursor.execute(f"CREATE TABLE {_qn(table + '_default')} PARTITION OF {_qn(table)} DEFAULT")
+
+        today = today or date.today()
+        if first is not None:
+            first = first.date() if hasattr(first, "date") else first
+            for lower, _ in partition_bounds(first, last.date() if hasattr(last, "date") else last, spec.interval):
+                create_partition(spec, lower)
+        ensure_partitions(spec, ahead, today)
+
+        cursor.execute(f"INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}")
+        copied = cursor.rowcount
+        cursor.execute(f"DROP TABLE {_qn(legacy)}")
+
+        # The old indexes and constraints went with the legacy table; their names are free again
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for name, definition in constraints:
+            cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}")
+    return copied
+
+
+def detach_before(spec, cutoff, drop=False):
+    """
+    Detach every partition whose period ends on or before `cutoff`. Detached
+    partitions stay as plain tables (for archiving with pg_dump) unless
+    `drop` is set. Returns the affected partition names.
+    """
+    affected = []
+    for name, _ in partitions(spec.table):
+        if name.endswith("_default"):
+            continue
+        stamp = name.rsplit("_p", 1)[1]
+        start = date(int(stamp[:4]), int(stamp[5:7]) if spec.interval == "month" else 1, 1)
+        if start + step(spec.interval) > cutoff:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {_qn(spec.table)} DETACH PARTITION {_qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {_qn(name)}")
+        affected.append(name)
+    return affected
@@ -0,0 +1,248 @@
+# common/perf.py
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+logger = logging.getLogger("raven.perf")
+
+PERF_PATH = "/api/_perf/"
+
+# The recorder of the request being instrumented, so queries run on other
+# threads for it (common.concurrency) are counted too.
+query_recorder = contextvars.ContextVar("query_recorder", default=None)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that counts queries and the time spent in the database,
+    and with keep_sql the statements too. `parent` is the recorder that was
+    active when this one started; worker threads report to the whole chain.
+    """
+
+    def __init__(self, parent=None, keep_sql=False):
+        self._lock = threading.Lock()
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.sql = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                if self.sql is not None:
+                    self.sql.append(sql)
+
+    def chain(self):
+        recorder = self
+        while recorder is not None:
+            yield recorder
+            recorder = recorder.parent
+
+
+@contextmanager
+def record_queries(keep_sql=False):
+    """
+    Count the queries run in the block, including those that
+    common.concurrency runs on worker threads for it. Nests: an outer
+    recorder still sees everything an inner one counts.
+    """
+    recorder = QueryRecorder(parent=query_recorder.get(), keep_sql=keep_sql)
+    with recording(recorder):
+        yield recorder
+
+
+@contextmanager
+def recording(recorder):
+    """Make `recorder` the active one for the block, e.g. to resume it while a response streams."""
+    token = query_recorder.set(recorder)
+    try:
+        with connection.execute_wrapper(recorder):
+            yield recorder
+    finally:
+        query_recorder.reset(token)
+
+
+class PerfRegistry:
+    """
+    Per-endpoint totals for this process, keyed by URL name.
+    Keeps the last `window` latencies per endpoint for the percentiles.
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, queries, db_ms, python_ms, size, status, memo_hits=0):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "calls": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+                    "python_ms": 0.0, "bytes": 0, "memo_hits": 0, "last_status": None,
+                    "latencies": deque(maxlen=self.window),
+                }
+            stats["calls"] += 1
+            stats["queries"] += queries
+            stats["max_queries"] = max(stats["max_queries"], queries)
+            stats["db_ms"] += db_ms
+            stats["python_ms"] += python_ms
+            stats["bytes"] += size
+            stats["memo_hits"] += memo_hits
+            stats["last_status"] = status
+            stats["latencies"].append(db_ms + python_ms)
+
+    def snapshot(self):
+        with self._lock:
+            rows = []
+            for name, stats in self._stats.items():
+                calls = stats["calls"]
+                latencies = list(stats["latencies"])
+                rows.append({
+                    "endpoint": name,
+                    "calls": calls,
+                    "avg_queries": round(stats["queries"] / calls, 1),
+                    "max_queries": stats["max_queries"],
+                    "avg_db_ms": round(stats["db_ms"] / calls, 2),
+                    "avg_python_ms": round(stats["python_ms"] / calls, 2),
+                    "p50_ms": round(percentile(latencies, 50), 2),
+                    "p95_ms": round(percentile(latencies, 95), 2),
+                    "avg_bytes": round(stats["bytes"] / calls),
+                    "avg_memo_hits": round(stats["memo_hits"] / calls, 1),
+                    "last_status": stats["last_status"],
+                })
+        return sorted(rows, key=lambda row: row["avg_queries"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+registry = PerfRegistry()
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return request.path
+    return match.view_name or match.route or request.path
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records, per URL name, the query count, DB time, Python time, response
+    size and request-memo hits (common.memo) of every request. Totals go to `registry` (served at /api/_perf/) and
+    each request is logged as one JSON line on the "raven.perf" logger.
+    Streamed responses are recorded once their stream finishes, with the
+    bytes sent and the queries run while streaming.
+
+    Enabled with PERF_INSTRUMENTATION (on by default when DEBUG).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(PERF_PATH):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        def finish(size):
+            total_ms = (time.perf_counter() - started) * 1000
+            db_ms = recorder.duration * 1000
+            name = endpoint_name(request)
+            memo_hits = getattr(request, "memo_stats", {}).get("hits", 0)
+            registry.record(name, recorder.count, db_ms, total_ms - db_ms, size, response.status_code, memo_hits)
+            logger.info(json.dumps({
+                "endpoint": name,
+                "method": request.method,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                "streamed": response.streaming,
+                "queries": recorder.count,
+                "db_ms": round(db_ms, 2),
+                "python_ms": round(total_ms - db_ms, 2),
+                "bytes": size,
+                "memo_hits": memo_hits,
+            }))
+
+        if response.streaming:
+            response.streaming_content = self._recorded_stream(response.streaming_content, recorder, finish)
+        else:
+            finish(len(response.content))
+        return response
+
+    @staticmethod
+    def _recorded_stream(chunks, recorder, finish):
+        """Yield `chunks` with `recorder` active while each is produced; report the size at the end."""
+        chunks = iter(chunks)
+        size = 0
+        try:
+            while True:
+                with recording(recorder):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            finish(size)
+
+
+class ConnectionCounter:
+    """Counts new database connections (connection_created), per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def __call__(self, sender, connection, **kwargs):
+        with self._lock:
+            self.opened += 1
+
+    def reset(self):
+        with self._lock:
+            self.opened = 0
+
+
+connection_counter = ConnectionCounter()
+
+
+def connection_stats():
+    """Persistent-connection settings, connections opened and, with DB_POOL, the psycopg pool's counters."""
+    settings_dict = connection.settings_dict
+    pool = getattr(connection, "pool", None)
+    return {
+        "vendor": connection.vendor,
+        "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+        "health_checks": settings_dict.get("CONN_HEALTH_CHECKS"),
+        "connections_opened": connection_counter.opened,
+        "pool": pool.get_stats() if pool is not None else None,
+    }
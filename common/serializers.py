@@ -1,4 +1,7 @@
-from rest_framework import serializers
+import copy
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import relations, serializers
 from .models import *
 
 class StateSerializer(serializers.ModelSerializer):
@@ -30,3 +33,85 @@ class BandSerializer(serializers.ModelSerializer):
     class Meta:
         model = Band
         fields = '__all__'
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ('id', 'name', 'status', 'attempts', 'max_attempts', 'idempotency_key', 'run_after',
+                  'result', 'error', 'created_at', 'finished_at')
+
+
+class ValuesSerializer:
+    """
+    Read-only mapper that produces a ModelSerializer's output from
+    queryset.values() rows instead of model instances.
+
+    The column list is derived from the serializer once per process: plain
+    model fields read their own column, PrimaryKeyRelatedField reads the FK
+    id, SlugRelatedField reads "<fk>__<slug_field>" (joined in the same
+    query). Values are converted with the serializer field's own
+    to_representation, so the output is identical to the ModelSerializer's.
+
+    Serializers with fields that can't be read from a column (properties,
+    method fields, nested or many-to-many fields) raise ImproperlyConfigured.
+    """
+    # Fields whose to_representation is a no-op for values coming from the database
+    passthrough_fields = (serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.ChoiceField)
+
+    _cache = {}
+
+    def __init__(self, serializer_class):
+        model = serializer_class.Meta.model
+        self.names, self.paths, self.converters = [], [], []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            path, converter = self._column(model, name, field)
+            self.names.append(name)
+            self.paths.append(path)
+            self.converters.append(converter)
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        mapper = cls._cache.get(serializer_class)
+        if mapper is None:
+            mapper = cls._cache[serializer_class] = cls(serializer_class)
+        return mapper
+
+    def _column(self, model, name, field):
+        source = field.source
+        try:
+            if source == '*' or '.' in source:
+                raise FieldDoesNotExist(source)
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f"{name}: '{source}' is not a column of {model.__name__}")
+
+        if isinstance(field, relations.SlugRelatedField):
+            return f'{source}__{field.slug_field}', None
+        if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+            return source, None
+        if isinstance(field, (relations.RelatedField, relations.ManyRelatedField, serializers.BaseSerializer)) \
+                or model_field.many_to_many or model_field.one_to_many:
+            raise ImproperlyConfigured(f"{name}: {type(field).__name__} can't be read from values()")
+        if isinstance(field, self.passthrough_fields):
+            return source, None
+        return source, field.to_representation
+
+    def only(self, names):
+        """A copy reading just `names` (in the serializer's field order)."""
+        projected = copy.copy(self)
+        keep = [i for i, name in enumerate(self.names) if name in names]
+        projected.names = [self.names[i] for i in keep]
+        projected.paths = [self.paths[i] for i in keep]
+        projected.converters = [self.converters[i] for i in keep]
+        return projected
+
+    def to_representation(self, row):
+        return {
+            name: value if converter is None or value is None else converter(value)
+            for name, converter, value in zip(self.names, self.converters, (row[p] for p in self.paths))
+        }
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
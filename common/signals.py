@@ -0,0 +1,14 @@
+# common/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from .dimensions import network_changed
+from .models import Band, BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+
+
+def hierarchy_changed(sender, **kwargs):
+    network_changed()
+
+
+for model in (Band, State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer):
+    post_save.connect(hierarchy_changed, sender=model, dispatch_uid=f"network-save-{model._meta.label}")
+    post_delete.connect(hierarchy_changed, sender=model, dispatch_uid=f"network-delete-{model._meta.label}")
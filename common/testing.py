@@ -0,0 +1,33 @@
+# common/testing.py
+from contextlib import contextmanager
+
+from common.perf import record_queries
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(budget, label="block"):
+    """
+    Fail when the block runs more than `budget` SQL queries. Unlike
+    assertNumQueries this is a ceiling, so fixing an N+1 never breaks a test.
+    Queries run_concurrently() sends to worker threads count too.
+    """
+    with record_queries(keep_sql=True) as recorder:
+        yield recorder
+    if recorder.count > budget:
+        sample = "\n".join(sql[:200] for sql in recorder.sql[:10])
+        raise QueryBudgetExceeded(
+            f"{label} ran {recorder.count} queries, budget is {budget}. First queries:\n{sample}"
+        )
+
+
+def assert_query_budget(client, url, budget):
+    """GET `url` once to warm process caches, then assert its query budget."""
+    client.get(url)
+    with query_budget(budget, label=url):
+        response = client.get(url)
+    assert response.status_code == 200, f"{url} returned {response.status_code}"
+    return response
@@ -0,0 +1,36 @@
+import pytest
+from common.benchmark import compare_results, discover_endpoints, endpoint_query, generate_utility, time_endpoint
+from technical.models import HourlyLoad
+
+
+TINY = dict(states=1, districts=1, substations=1, feeders=2, transformers=3,
+            reps=2, staff=1, customers=1, months=2, hourly_days=2)
+
+
+@pytest.mark.django_db
+def test_generate_utility_and_time_endpoints(api_client):
+    counts, context = generate_utility(TINY, seed=1)
+    assert counts["DistributionTransformer"] == 6
+    assert HourlyLoad.objects.count() == counts["HourlyLoad"] == 2 * 2 * 24
+
+    endpoints = dict(discover_endpoints(context))
+    assert endpoints["/api/technical/hourly-load/"] is True
+    assert endpoints["/api/overview/"] is False
+    assert f"/api/financial/sales-reps/{context['rep_id']}/performance/" in endpoints
+    # Write-only actions and detail routes are not timed
+    assert "/api/technical/hourly-load/bulk-update/" not in endpoints
+    assert not any("(?P" in url for url in endpoints)
+
+    url = "/api/overview/"
+    result = time_endpoint(api_client, f"{url}?{endpoint_query(url, context)}", repeat=2)
+    assert result["status"] == 200
+    assert result["queries"] > 0
+
+
+def test_compare_results_flags_query_growth():
+    def doc(queries, p95):
+        return {"scales": {"small": {"endpoints": {"/api/x/": {"status": 200, "queries": queries, "p95_ms": p95}}}}}
+
+    assert compare_results(doc(3, 10.0), doc(3, 11.0))[0]["regression"] is False
+    assert compare_results(doc(3, 10.0), doc(4, 10.0))[0]["regression"] is True
+    assert compare_results(doc(3, 10.0), doc(3, 30.0))[0]["regression"] is True
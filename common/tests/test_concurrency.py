@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+from common.concurrency import THREAD_PREFIX, run_concurrently
+from common.models import State
+from common.perf import QueryRecorder, query_recorder
+
+
+@pytest.mark.django_db
+def test_runs_inline_inside_a_transaction():
+    State.objects.create(name="Kano")
+    results = run_concurrently({
+        "count": lambda: State.objects.count(),
+        "thread": lambda: threading.current_thread().name,
+    })
+    assert results == {"count": 1, "thread": threading.current_thread().name}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fans_out_and_counts_worker_queries():
+    State.objects.create(name="Kano")
+    recorder = QueryRecorder()
+    token = query_recorder.set(recorder)
+    try:
+        results = run_concurrently({i: lambda: (State.objects.count(), threading.current_thread().name) for i in range(4)})
+    finally:
+        query_recorder.reset(token)
+
+    assert [count for count, _ in results.values()] == [1, 1, 1, 1]
+    assert all(name.startswith(THREAD_PREFIX) for _, name in results.values())
+    assert recorder.count == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reraises_task_errors():
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_concurrently({"ok": lambda: 1, "fail": fail})
@@ -0,0 +1,52 @@
+import pytest
+
+from common.dimensions import get_network, invalidate_network
+from common.models import Band, BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+from common.testing import query_budget
+
+
+@pytest.fixture
+def hierarchy():
+    state = State.objects.create(name="Lagos")
+    other = State.objects.create(name="Ogun")
+    district = BusinessDistrict.objects.create(name="Ikeja", state=state)
+    BusinessDistrict.objects.create(name="Abeokuta", state=other)
+    substation = InjectionSubstation.objects.create(name="SS")
+    band = Band.objects.create(name="A")
+    feeders = [
+        Feeder.objects.create(name="F1", substation=substation, business_district=district, band=band),
+        Feeder.objects.create(name="F2", substation=substation, business_district=district),
+    ]
+    transformer = DistributionTransformer.objects.create(name="T1", feeder=feeders[0])
+    return state, district, feeders, transformer
+
+
+@pytest.mark.django_db
+def test_snapshot_lookups(hierarchy):
+    state, district, (f1, f2), transformer = hierarchy
+    network = get_network()
+
+    with query_budget(0):
+        assert get_network() is network
+        assert network.states.by_name("LAGOS").id == state.id
+        assert network.districts.by_slug("ikeja").state_id == state.id
+        assert network.feeders.get(f1.id).band_id == f1.band_id
+        assert network.transformers.by_slug(transformer.slug).feeder_id == f1.id
+        assert network.states.by_name("Kano") is None
+
+
+@pytest.mark.django_db
+def test_snapshot_is_invalidated_by_signals(hierarchy):
+    state, district, _, _ = hierarchy
+    before = get_network()
+
+    district.name = "Ikeja North"
+    district.save()
+    after = get_network()
+    assert after is not before and after.version > before.version
+    assert after.districts.by_name("ikeja north").id == district.id
+
+    State.objects.filter(pk=state.pk).update(name="Eko")  # no signal: served stale until invalidated
+    assert get_network().states.by_name("Lagos") is not None
+    invalidate_network()
+    assert get_network().states.by_name("Eko").id == state.id
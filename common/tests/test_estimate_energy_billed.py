@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from commercial.models import MonthlyEnergyBilled
+from common.factories import FeederFactory
+from common.testing import query_budget
+from technical.models import EnergyDelivered
+
+
+@pytest.fixture
+def delivered():
+    feeders = FeederFactory.create_batch(3)
+    for feeder, mwh in zip(feeders, ("100", "300", "0")):
+        EnergyDelivered.objects.create(feeder=feeder, date=date(2024, 3, 1), energy_mwh=Decimal(mwh))
+        EnergyDelivered.objects.create(feeder=feeder, date=date(2024, 3, 2), energy_mwh=Decimal(mwh))
+    return feeders
+
+
+def billed():
+    return dict(MonthlyEnergyBilled.objects.values_list("feeder__name", "energy_mwh"))
+
+
+@pytest.mark.django_db
+def test_allocates_in_proportion_with_one_upsert(delivered):
+    # March 2024 is 111.1 GWh; feeders delivered 25% / 75% / nothing
+    with query_budget(6):
+        call_command("estimate_energy_billed", year=2024, month=3, stdout=StringIO())
+
+    assert billed() == {delivered[0].name: Decimal("27775.00"), delivered[1].name: Decimal("83325.00")}
+
+    # The full multi-year history costs the same handful of queries
+    with query_budget(4):
+        call_command("estimate_energy_billed", dry_run=True, stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_dry_run_reports_diff_and_force_overwrites(delivered):
+    MonthlyEnergyBilled.objects.create(feeder=delivered[0], month=date(2024, 3, 1), energy_mwh=Decimal("1"))
+
+    out = StringIO()
+    call_command("estimate_energy_billed", year=2024, month=3, dry_run=True, force=True, verbosity=2, stdout=out)
+    assert "1.00 → 27775.00" in out.getvalue()
+    assert billed() == {delivered[0].name: Decimal("1.00")}
+
+    call_command("estimate_energy_billed", year=2024, month=3, stdout=StringIO())
+    assert billed()[delivered[0].name] == Decimal("1.00")  # existing rows need --force
+
+    call_command("estimate_energy_billed", year=2024, month=3, force=True, stdout=StringIO())
+    assert billed()[delivered[0].name] == Decimal("27775.00")
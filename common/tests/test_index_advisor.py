@@ -0,0 +1,55 @@
+import pytest
+
+from common.index_advisor import (
+    advise, existing_indexes, is_covered, predicate_columns, propose, scanned_tables, seq_scans_sqlite,
+)
+from commercial.models import DailyCollection
+from financial.models import Opex
+from hr.models import Staff
+
+
+def test_predicate_columns_orders_equality_before_range():
+    sql = (
+        'SELECT * FROM "financial_opex" INNER JOIN "common_businessdistrict" '
+        'ON ("financial_opex"."district_id" = "common_businessdistrict"."id") '
+        'WHERE ("financial_opex"."date" BETWEEN \'2024-01-01\' AND \'2024-01-31\' '
+        'AND "financial_opex"."district_id" IN (1, 2) AND "financial_opex"."credit" IS NOT NULL)'
+    )
+    equality, ranges, nulls = predicate_columns(sql, "financial_opex")
+    assert equality == ["district_id"]
+    assert ranges == ["date"]
+    assert nulls == {"credit": False}
+
+
+def test_predicate_columns_treats_date_extracts_as_range():
+    sql = 'SELECT 1 FROM "financial_opex" WHERE EXTRACT(MONTH FROM "financial_opex"."date") = 3'
+    assert predicate_columns(sql, "financial_opex") == ([], ["date"], {})
+
+
+def test_seq_scans_sqlite_resolves_aliases():
+    rows = [(2, 0, 0, "SCAN T3"), (5, 0, 0, "SEARCH financial_opex USING INDEX x (date>?)"),
+            (7, 0, 0, "SCAN common_feeder USING COVERING INDEX y")]
+    assert seq_scans_sqlite(rows, {"T3": "commercial_dailycollection"}) == ["commercial_dailycollection"]
+
+
+def test_new_composite_indexes_cover_their_query_shapes():
+    assert is_covered(["transformer_id", "date"], ["transformer_id"], existing_indexes(DailyCollection)) is False
+    assert is_covered(["date", "transformer_id"], [], existing_indexes(DailyCollection))
+    assert is_covered(["district_id", "date"], ["district_id"], existing_indexes(Opex))
+
+    sql = 'SELECT 1 FROM "financial_opex" WHERE ("financial_opex"."district_id" = 1 AND "financial_opex"."date" >= \'2024-01-01\')'
+    assert propose(Opex, sql) is None
+
+
+def test_propose_builds_partial_index_snippet():
+    sql = 'SELECT 1 FROM "hr_staff" WHERE ("hr_staff"."hire_date" <= \'2024-01-31\' AND "hr_staff"."exit_date" IS NULL)'
+    proposal = propose(Staff, sql)
+    assert proposal["fields"] == ["hire_date"]
+    assert proposal["condition"] == {"exit_date__isnull": True}
+
+
+@pytest.mark.django_db
+def test_advise_respects_min_rows():
+    sql = 'SELECT "financial_opex"."id" FROM "financial_opex" WHERE "financial_opex"."date" >= \'2024-01-01\''
+    assert isinstance(scanned_tables(sql), list)
+    assert advise({sql: {"/api/financial/opex/"}}, min_rows=1) == []
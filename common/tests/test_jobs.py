@@ -0,0 +1,134 @@
+import time
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from common.factories import FeederFactory
+from common.jobs import JobFailed, claim, enqueue, register, run, work
+from common.models import Job
+from technical.models import HourlyLoad
+
+calls = []
+
+
+@register("tests.flaky", max_attempts=2)
+def flaky(fail_times=0, key=None):
+    calls.append(key)
+    if calls.count(key) <= fail_times:
+        raise RuntimeError("boom")
+    return {"key": key, "calls": calls.count(key)}
+
+
+@register("tests.hopeless")
+def hopeless():
+    raise JobFailed("bad input")
+
+
+@register("tests.slow")
+def slow(seconds):
+    time.sleep(seconds)
+    # Past the original lease, but the heartbeat kept renewing it
+    return {"stolen": claim("thief") is not None}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls(settings):
+    settings.JOB_RETRY_BACKOFF = 0
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_enqueue_idempotency_and_coalescing():
+    first = enqueue("tests.flaky", {"key": "a"}, idempotency_key="push-1")
+    assert enqueue("tests.flaky", {"key": "b"}, idempotency_key="push-1") == first
+    assert first.max_attempts == 2
+
+    queued = enqueue("tests.hopeless", coalesce=True)
+    assert enqueue("tests.hopeless", coalesce=True) == queued
+    assert Job.objects.count() == 2
+    # Once it has started, the next coalesced enqueue adds a job
+    Job.objects.filter(pk=queued.pk).update(status=Job.RUNNING, attempts=1)
+    assert enqueue("tests.hopeless", coalesce=True) != queued
+
+    with pytest.raises(ValueError):
+        enqueue("tests.unknown")
+
+
+@pytest.mark.django_db
+def test_retries_then_gives_up():
+    recovers = enqueue("tests.flaky", {"fail_times": 1, "key": "r"})
+    fails = enqueue("tests.flaky", {"fail_times": 5, "key": "f"})
+    hopeless_job = enqueue("tests.hopeless")
+
+    assert work("w1", once=True) == 5
+    recovers.refresh_from_db()
+    fails.refresh_from_db()
+    hopeless_job.refresh_from_db()
+    assert (recovers.status, recovers.attempts, recovers.result) == (Job.SUCCEEDED, 2, {"key": "r", "calls": 2})
+    assert (fails.status, fails.attempts) == (Job.FAILED, 2)
+    assert "RuntimeError: boom" in fails.error
+    assert (hopeless_job.status, hopeless_job.attempts, hopeless_job.error) == (Job.FAILED, 1, "bad input")
+
+
+@pytest.mark.django_db
+def test_stale_lease_is_reclaimed(settings):
+    settings.JOB_LEASE_SECONDS = 60
+    job = enqueue("tests.flaky", {"key": "s"})
+    assert claim("dead-worker").pk == job.pk
+    assert claim("w2") is None
+
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=61))
+    reclaimed = claim("w2")
+    assert (reclaimed.pk, reclaimed.attempts) == (job.pk, 2)
+    # The dead worker's late finish is ignored; the new owner's counts
+    job.locked_by = "dead-worker"
+    assert run(job) == 0
+    assert run(reclaimed) == 1
+    reclaimed.refresh_from_db()
+    assert (reclaimed.status, reclaimed.locked_by) == (Job.SUCCEEDED, "w2")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_heartbeat_keeps_a_long_job_leased(settings):
+    settings.JOB_LEASE_SECONDS = 0.5
+    settings.JOB_HEARTBEAT_SECONDS = 0.1
+    job = enqueue("tests.slow", {"seconds": 1})
+    claimed = claim("w1")
+    assert run(claimed) == 1
+
+    job.refresh_from_db()
+    assert (job.status, job.attempts, job.locked_by, job.result) == (Job.SUCCEEDED, 1, "w1", {"stolen": False})
+
+
+@pytest.mark.django_db
+def test_bulk_action_deferred_to_a_worker(api_client):
+    feeder = FeederFactory()
+    payload = {"records": [{"feeder": feeder.slug, "date": "2025-03-01", "hour": h, "load_mw": 1.5} for h in range(3)]}
+    response = api_client.post("/api/technical/hourly-load/bulk-update/", payload, format="json",
+                               HTTP_PREFER="respond-async", HTTP_IDEMPOTENCY_KEY="load-1")
+    assert response.status_code == 202
+    assert response["Location"] == f"/api/jobs/{response.data['id']}/"
+    assert not HourlyLoad.objects.exists()
+
+    # A client retry gets the same job back
+    retry = api_client.post("/api/technical/hourly-load/bulk-update/", payload, format="json",
+                            HTTP_PREFER="respond-async", HTTP_IDEMPOTENCY_KEY="load-1")
+    assert retry.data["id"] == response.data["id"]
+    # The same key on another endpoint is a different request
+    other = api_client.post("/api/commercial/daily-collections/bulk_create/", {"collections": []}, format="json",
+                            HTTP_PREFER="respond-async", HTTP_IDEMPOTENCY_KEY="load-1")
+    assert other.status_code == 202 and other.data["id"] != response.data["id"]
+    Job.objects.filter(pk=other.data["id"]).delete()
+
+    out = StringIO()
+    call_command("run_workers", "--once", stdout=out)
+    assert "Ran 1 jobs" in out.getvalue()
+    assert HourlyLoad.objects.count() == 3
+
+    status = api_client.get(response["Location"]).data
+    assert status["status"] == Job.SUCCEEDED
+    assert status["result"]["status_code"] == 200
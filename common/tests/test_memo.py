@@ -0,0 +1,58 @@
+import pytest
+from django.db.models import Count
+
+from common.memo import memo_aggregate, memo_get, memoize, request_memo
+from common.models import State
+from common.perf import registry
+from common.testing import query_budget
+
+calls = []
+
+
+@memoize
+def states_named(names):
+    calls.append(names)
+    return State.objects.filter(name__in=names).count()
+
+
+@pytest.mark.django_db
+def test_memoize_is_request_scoped():
+    State.objects.create(name="Kano")
+    calls.clear()
+    with request_memo() as memo:
+        assert states_named(["Kano"]) == 1
+        assert states_named(["Kano"]) == 1
+        assert states_named(["Jigawa"]) == 0
+    assert calls == [["Kano"], ["Jigawa"]]
+    assert memo.stats() == {"hits": 1, "misses": 2}
+
+    # No memo outside a request
+    states_named(["Kano"])
+    assert len(calls) == 3
+
+
+@pytest.mark.django_db
+def test_querysets_are_keyed_on_sql():
+    state = State.objects.create(name="Kano")
+    with request_memo() as memo, query_budget(2):
+        assert memo_get(State, name__iexact="kano") == state
+        assert memo_get(State.objects.all(), name__iexact="kano") == state
+        assert memo_aggregate(State.objects.filter(name="Kano"), n=Count("id")) == {"n": 1}
+        assert memo_aggregate(State.objects.filter(name="Kano"), n=Count("id")) == {"n": 1}
+    assert memo.hits == 2
+
+    with request_memo(), pytest.raises(State.DoesNotExist):
+        memo_get(State, name="Jigawa")
+
+
+@pytest.mark.django_db
+def test_memo_hits_are_reported(api_client, settings, build_network):
+    settings.PERF_INSTRUMENTATION = True
+    settings.DEBUG = True
+    registry.reset()
+    build_network(1)
+
+    api_client.get("/api/technical/overview/state/?state=State 1&year=2025&month=3")
+
+    stats = {row["endpoint"]: row for row in api_client.get("/api/_perf/").data["endpoints"]}
+    assert stats["state-technical-summary"]["avg_memo_hits"] > 0
@@ -0,0 +1,59 @@
+import pytest
+from datetime import date
+from common.models import InjectionSubstation, Feeder
+from technical.models import HourlyLoad
+
+
+def _walk(api_client, url, key):
+    seen, pages = [], []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        pages.append(response.data)
+        seen.extend(key(row) for row in response.data["results"])
+        url = response.data["next"]
+    return seen, pages
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_walks_hourly_load_without_gaps(api_client):
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeders = [Feeder.objects.create(name=f"F{i}", substation=substation) for i in range(2)]
+    for feeder in feeders:
+        for day in (1, 2):
+            for hour in range(4):
+                # Same load on every row, so only date/feeder/hour/pk separate them
+                HourlyLoad.objects.create(feeder=feeder, date=date(2025, 3, day), hour=hour, load_mw=1.0)
+
+    seen, pages = _walk(api_client, "/api/technical/hourly-load/?page_size=3",
+                        lambda row: (row["feeder"], row["date"], row["hour"]))
+
+    assert len(seen) == len(set(seen)) == 16
+    assert len(pages) == 6
+    assert pages[0]["previous"] is None
+    assert [row["date"] for row in pages[0]["results"]] == ["2025-03-02"] * 3
+
+    # Walking back from the last page returns the same rows in the same order
+    last = api_client.get(pages[-1]["next"] or pages[-2]["next"]).data
+    back = api_client.get(last["previous"]).data
+    assert back["results"] == pages[-2]["results"]
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_caps_page_size(api_client):
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation)
+    for hour in range(6):
+        HourlyLoad.objects.create(feeder=feeder, date=date(2025, 3, 1), hour=hour, load_mw=1.0)
+
+    response = api_client.get("/api/technical/hourly-load/?page_size=2")
+    assert len(response.data["results"]) == 2
+    assert api_client.get("/api/technical/hourly-load/?cursor=not-a-cursor").status_code == 404
+
+
+@pytest.mark.django_db
+def test_lookup_endpoints_return_full_lists(api_client):
+    InjectionSubstation.objects.create(name="SS")
+    response = api_client.get("/api/substations/")
+    assert response.status_code == 200
+    assert isinstance(response.data, list) and len(response.data) == 1
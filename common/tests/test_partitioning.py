@@ -0,0 +1,78 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from common.factories import FeederFactory
+from common.partitioning import (
+    PARTITIONED, convert_table, create_partition, detach_before, is_partitioned, partition_bounds,
+    partition_name, partitions, period_start,
+)
+from technical.models import HourlyLoad
+
+
+def test_partition_bounds_cover_the_window():
+    bounds = partition_bounds(date(2024, 11, 15), date(2025, 1, 3), "month")
+    assert bounds == [
+        (date(2024, 11, 1), date(2024, 12, 1)),
+        (date(2024, 12, 1), date(2025, 1, 1)),
+        (date(2025, 1, 1), date(2025, 2, 1)),
+    ]
+    assert partition_bounds(date(2023, 6, 1), date(2024, 2, 1), "year") == [
+        (date(2023, 1, 1), date(2024, 1, 1)),
+        (date(2024, 1, 1), date(2025, 1, 1)),
+    ]
+
+
+def test_partition_names():
+    assert period_start(date(2024, 7, 9), "year") == date(2024, 1, 1)
+    assert partition_name("technical_hourlyload", date(2024, 3, 1), "month") == "technical_hourlyload_p2024_03"
+    assert partition_name("technical_feederinterruption", date(2024, 1, 1), "year") == "technical_feederinterruption_p2024"
+    assert {spec.table for spec in PARTITIONED} == {
+        "technical_hourlyload", "commercial_dailycollection", "technical_feederinterruption",
+    }
+
+
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="exercises the non-PostgreSQL fallback")
+def test_command_is_a_noop_without_postgres():
+    out = StringIO()
+    call_command("manage_partitions", "--convert", stdout=out)
+    assert "Nothing to do" in out.getvalue()
+
+
+def _count(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="runs PostgreSQL partitioning DDL")
+@pytest.mark.django_db
+def test_convert_create_and_detach_on_postgres():
+    spec = next(spec for spec in PARTITIONED if spec.model == "technical.HourlyLoad")
+    feeder = FeederFactory()
+    for day in (date(2025, 1, 10), date(2025, 2, 10)):
+        HourlyLoad.objects.create(feeder=feeder, date=day, hour=0, load_mw=1.0)
+
+    assert convert_table(spec, ahead=1, today=date(2025, 2, 1)) == 2
+    assert is_partitioned(spec.table)
+    assert [name for name, _ in partitions(spec.table)] == [
+        f"{spec.table}_default", f"{spec.table}_p2025_01", f"{spec.table}_p2025_02", f"{spec.table}_p2025_03",
+    ]
+
+    # A row past the created partitions waits in the default until its partition exists
+    later = HourlyLoad.objects.create(feeder=feeder, date=date(2025, 6, 5), hour=0, load_mw=2.0)
+    assert _count(f"{spec.table}_default") == 1
+    assert create_partition(spec, date(2025, 6, 1))
+    assert not create_partition(spec, date(2025, 6, 1))
+    assert (_count(f"{spec.table}_default"), _count(f"{spec.table}_p2025_06")) == (0, 1)
+
+    window = HourlyLoad.objects.filter(date__range=(date(2025, 1, 1), date(2025, 6, 30)))
+    assert window.count() == 3
+    assert HourlyLoad.objects.get(date=date(2025, 6, 5)).pk == later.pk
+
+    assert detach_before(spec, date(2025, 2, 1)) == [f"{spec.table}_p2025_01"]
+    assert list(window.order_by("date").values_list("date", flat=True)) == [date(2025, 2, 10), date(2025, 6, 5)]
+    assert _count(f"{spec.table}_p2025_01") == 1  # detached, not dropped
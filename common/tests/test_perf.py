@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.db.backends.signals import connection_created
+from common.concurrency import THREAD_PREFIX, run_concurrently
+from common.perf import connection_counter, connection_stats, record_queries, registry
+from common.testing import QueryBudgetExceeded, query_budget
+from common.models import InjectionSubstation, Feeder, State
+from technical.models import HourlyLoad
+
+
+@pytest.mark.django_db
+def test_perf_endpoint_reports_query_counts(api_client, settings):
+    settings.PERF_INSTRUMENTATION = True
+    settings.PERF_STATS_TOKEN = "s3cret"
+    registry.reset()
+    State.objects.create(name="Kano")
+
+    api_client.get("/api/states/")
+    api_client.get("/api/states/")
+
+    assert api_client.get("/api/_perf/").status_code == 404
+    assert api_client.get("/api/_perf/", HTTP_X_PERF_TOKEN="wrong").status_code == 404
+
+    api_client.credentials(HTTP_X_PERF_TOKEN="s3cret")
+    stats = {row["endpoint"]: row for row in api_client.get("/api/_perf/").data["endpoints"]}
+    assert stats["state-list"]["calls"] == 2
+    assert stats["state-list"]["avg_queries"] == 1
+    assert stats["state-list"]["avg_bytes"] > 0
+
+    assert api_client.delete("/api/_perf/").status_code == 204
+    assert api_client.get("/api/_perf/").data["endpoints"] == []
+
+
+@pytest.mark.django_db
+def test_streamed_exports_are_recorded_when_the_stream_ends(api_client, settings):
+    settings.PERF_INSTRUMENTATION = True
+    registry.reset()
+    feeder = Feeder.objects.create(name="F1", substation=InjectionSubstation.objects.create(name="SS"))
+    for hour in range(3):
+        HourlyLoad.objects.create(feeder=feeder, date="2025-03-01", hour=hour, load_mw=1.0)
+
+    response = api_client.get("/api/technical/hourly-load/?format=csv&stream=1")
+    assert registry.snapshot() == []  # nothing is recorded until the body has been sent
+    body = b"".join(response.streaming_content)
+
+    (stats,) = registry.snapshot()
+    assert stats["avg_bytes"] == len(body) > 0
+    # The export's rows are read while streaming
+    assert stats["avg_queries"] >= 1
+
+
+@pytest.mark.django_db
+def test_query_budget_fails_over_budget():
+    with query_budget(1):
+        list(State.objects.all())
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            list(State.objects.all())
+            list(State.objects.all())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_query_budget_counts_worker_thread_queries(settings):
+    settings.DASHBOARD_QUERY_CONCURRENCY = 4
+    tasks = {i: lambda: (State.objects.count(), threading.current_thread().name) for i in range(4)}
+
+    with pytest.raises(QueryBudgetExceeded, match="ran 4 queries"):
+        with query_budget(3):
+            run_concurrently(tasks)
+
+    # A recorder nested inside the budget (e.g. the perf middleware's) doesn't hide the workers from it
+    with query_budget(4) as budget:
+        with record_queries() as inner:
+            results = run_concurrently(tasks)
+    assert all(name.startswith(THREAD_PREFIX) for _, name in results.values())
+    assert budget.count == inner.count == 4
+
+
+def test_connection_counter_counts_new_connections():
+    connection_counter.reset()
+    connection_created.send(sender=type(connection), connection=connection)
+    stats = connection_stats()
+    assert stats["connections_opened"] == 1
+    assert stats["vendor"] == connection.vendor
+    assert "conn_max_age" in stats and "pool" in stats
@@ -0,0 +1,27 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.core.exceptions import ImproperlyConfigured
+from common.models import InjectionSubstation, Feeder
+from common.serializers import ValuesSerializer
+from technical.models import HourlyLoad
+from technical.serializers import FeederInterruptionSerializer, HourlyLoadSerializer
+
+
+@pytest.mark.django_db
+def test_values_serializer_matches_model_serializer():
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation)
+    HourlyLoad.objects.create(feeder=feeder, date=date(2025, 3, 1), hour=4, load_mw=Decimal("3.5"))
+
+    mapper = ValuesSerializer.for_serializer(HourlyLoadSerializer)
+    rows = HourlyLoad.objects.values(*mapper.paths)
+
+    assert mapper.many(rows) == [dict(row) for row in HourlyLoadSerializer(HourlyLoad.objects.all(), many=True).data]
+    assert mapper.many(rows)[0]["load_mw"] == "3.50"
+
+
+def test_values_serializer_rejects_non_column_fields():
+    # duration_hours is a model property, not a column
+    with pytest.raises(ImproperlyConfigured):
+        ValuesSerializer(FeederInterruptionSerializer)
@@ -0,0 +1,75 @@
+import pytest
+from io import StringIO
+
+from django.core.management import call_command
+
+from common.factories import DistributionTransformerFactory, FeederFactory
+from common.models import Band, BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+from common.testing import query_budget
+from common.tree import SUBSTATION_LEVELS, get_tree
+
+
+@pytest.fixture
+def network():
+    band_a, band_b = Band.objects.create(name="A"), Band.objects.create(name="B")
+    substations = [InjectionSubstation.objects.create(name=f"SS{i}") for i in range(2)]
+    for s in range(2):
+        state = State.objects.create(name=f"State {s}")
+        for d in range(2):
+            district = BusinessDistrict.objects.create(name=f"District {s}{d}", state=state)
+            for f in range(3):
+                feeder = FeederFactory(business_district=district, substation=substations[f % 2],
+                                       band=band_a if f else band_b)
+                DistributionTransformerFactory.create_batch(2, feeder=feeder)
+    FeederFactory(business_district=None, substation=substations[0], band=band_a)  # hangs off the root
+    return band_a
+
+
+@pytest.mark.django_db
+def test_subtree_slices_match_the_joins(network):
+    states = {
+        state.id: set(Feeder.objects.filter(business_district__state=state).values_list("id", flat=True))
+        for state in State.objects.all()
+    }
+    districts = {
+        district.id: set(DistributionTransformer.objects.filter(feeder__business_district=district, feeder__band=network)
+                         .values_list("id", flat=True))
+        for district in BusinessDistrict.objects.all()
+    }
+
+    state_districts = {}
+    for district in BusinessDistrict.objects.all():
+        state_districts.setdefault(district.state_id, set()).add(district.id)
+
+    tree = get_tree()
+    with query_budget(0):
+        for state_id, expected in states.items():
+            assert set(tree.ids_under("state", state_id, "feeder")) == expected
+            assert set(tree.ids_under("state", state_id, "district")) == state_districts[state_id]
+        for district_id, expected in districts.items():
+            assert set(tree.ids_under("district", district_id, "transformer", band_id=network.id)) == expected
+    assert len(tree.ids_under(None, None, "feeder")) == Feeder.objects.count()
+    assert tree.ids_under("state", None, "feeder") == []
+
+    substation = InjectionSubstation.objects.get(name="SS0")
+    transformer = DistributionTransformer.objects.filter(feeder__substation=substation).first()
+    assert get_tree(SUBSTATION_LEVELS).contains("substation", substation.id, "transformer", transformer.id)
+    assert not get_tree().contains("state", State.objects.first().id, "feeder", Feeder.objects.get(business_district=None).id)
+
+
+@pytest.mark.django_db
+def test_tree_follows_snapshot_version(network):
+    tree = get_tree()
+    assert get_tree() is tree
+    district = BusinessDistrict.objects.first()
+    FeederFactory(business_district=district)
+    assert get_tree() is not tree
+    assert len(get_tree().ids_under("district", district.id, "feeder")) == 4
+
+
+@pytest.mark.django_db
+def test_benchmark_agrees_with_the_joins(network):
+    out = StringIO()
+    call_command("benchmark_scope_expansion", "--repeat", "1", "--bands", stdout=out)
+    assert "id sets identical" in out.getvalue()
+    assert "differ" not in out.getvalue()
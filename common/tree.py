@@ -0,0 +1,169 @@
+# common/tree.py
+"""
+Array-backed hierarchy tree for scope expansion.
+
+Nodes are numbered in depth-first (Euler tour) order, so every subtree is a
+contiguous interval: tin/tout on the node for ancestry checks, and for each
+level a [start, end) span into that level's id array. "Feeders under a
+state" or "transformers under a district" is a slice, and a band filter is
+two bisects into that band's positions:
+
+    tree = get_tree()
+    feeder_ids = tree.ids_under("state", state_id, "feeder")
+    dt_ids = tree.ids_under("district", district_id, "transformer", band_id=band_a)
+    EnergyDelivered.objects.filter(feeder_id__in=feeder_ids)
+
+Trees are built from the common.dimensions snapshot and rebuilt when its
+version changes. LOCATION_LEVELS follows feeders' business districts;
+SUBSTATION_LEVELS their injection substations.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+
+from .dimensions import get_network
+
+
+LOCATION_LEVELS = ("state", "district", "feeder", "transformer")
+SUBSTATION_LEVELS = ("substation", "feeder", "transformer")
+
+# Parent column of each level's snapshot node, per level above it
+_PARENT_FIELDS = {
+    ("state", "district"): "state_id",
+    ("district", "feeder"): "business_district_id",
+    ("substation", "feeder"): "substation_id",
+    ("feeder", "transformer"): "feeder_id",
+}
+
+ANY = object()
+
+
+class TreeNode:
+    __slots__ = ("index", "id", "slug", "depth", "band_id", "tin", "tout", "spans")
+
+    def __init__(self, index, id, slug, depth, band_id):
+        self.index = index
+        self.id = id
+        self.slug = slug
+        self.depth = depth
+        self.band_id = band_id
+        self.tin = self.tout = 0
+        self.spans = ()
+
+    def __repr__(self):
+        return f"<TreeNode {self.slug or 'root'} depth={self.depth} [{self.tin}, {self.tout})>"
+
+
+class HierarchyTree:
+    """
+    `rows` maps each level (top-down, as in `levels`) to (id, slug, parent_id,
+    band_id) tuples; parent_id refers to the level above. Nodes whose parent
+    is missing hang off the root, so they only show up in whole-tree queries.
+    """
+
+    def __init__(self, levels, rows, version=0):
+        self.levels = tuple(levels)
+        self.version = version
+        self._depth = {level: depth for depth, level in enumerate(self.levels)}
+
+        self.nodes = [TreeNode(0, None, None, -1, None)]
+        self.parent = array("i", [-1])
+        self._index = {}
+        for depth, level in enumerate(self.levels):
+            above = self._index.get(self.levels[depth - 1], {}) if depth else {}
+            index = self._index[level] = {}
+            for id, slug, parent_id, band_id in rows[level]:
+                node = TreeNode(len(self.nodes), id, slug, depth, band_id)
+                self.nodes.append(node)
+                self.parent.append(above.get(parent_id, 0))
+                index[id] = node.index
+
+        self._ids = [[] for _ in self.levels]
+        self._band_positions = [{} for _ in self.levels]
+        self._tour()
+
+    def _tour(self):
+        children = [[] for _ in self.nodes]
+        for index in range(1, len(self.nodes)):
+            children[self.parent[index]].append(index)
+
+        counts = [0] * len(self.levels)
+        entry = [None] * len(self.nodes)
+        clock = 0
+        stack = [(0, False)]
+        while stack:
+            index, leaving = stack.pop()
+            node = self.nodes[index]
+            if leaving:
+                node.tout = clock
+                node.spans = tuple(zip(entry[index], counts))
+                continue
+            node.tin = clock
+            clock += 1
+            entry[index] = tuple(counts)
+            if node.depth >= 0:
+                position = counts[node.depth]
+                self._ids[node.depth].append(node.id)
+                self._band_positions[node.depth].setdefault(node.band_id, array("i")).append(position)
+                counts[node.depth] += 1
+            stack.append((index, True))
+            stack.extend((child, False) for child in reversed(children[index]))
+
+    @classmethod
+    def from_network(cls, network, levels=LOCATION_LEVELS):
+        feeder_band = {feeder.id: feeder.band_id for feeder in network.feeders}
+        rows = {}
+        for depth, level in enumerate(levels):
+            parent_field = _PARENT_FIELDS.get((levels[depth - 1], level)) if depth else None
+            rows[level] = [
+                (
+                    node.id, node.slug,
+                    getattr(node, parent_field) if parent_field else None,
+                    feeder_band.get(node.id if level == "feeder" else getattr(node, "feeder_id", None)),
+                )
+                for node in getattr(network, f"{level}s")
+            ]
+        return cls(levels, rows, version=network.version)
+
+    def node(self, level, id):
+        index = self._index[level].get(id)
+        return None if index is None else self.nodes[index]
+
+    def ids_under(self, level, id, target, band_id=ANY):
+        """
+        Ids at `target` level in the subtree of (level, id); level=None means
+        the whole tree. band_id keeps only nodes of that band (None for unbanded).
+        """
+        if level is None:
+            node = self.nodes[0]
+        else:
+            node = self.node(level, id)
+            if node is None:
+                return []
+        depth = self._depth[target]
+        start, end = node.spans[depth]
+        ids = self._ids[depth]
+        if band_id is ANY:
+            return ids[start:end]
+        positions = self._band_positions[depth].get(band_id, ())
+        return [ids[p] for p in positions[bisect_left(positions, start):bisect_left(positions, end)]]
+
+    def contains(self, level, id, other_level, other_id):
+        """Whether (other_level, other_id) sits in the subtree of (level, id)."""
+        node, other = self.node(level, id), self.node(other_level, other_id)
+        return node is not None and other is not None and node.tin <= other.tin < node.tout
+
+
+_lock = threading.Lock()
+_trees = {}
+
+
+def get_tree(levels=LOCATION_LEVELS):
+    """The tree for `levels`, rebuilt whenever the network snapshot changes."""
+    network = get_network()
+    levels = tuple(levels)
+    with _lock:
+        tree = _trees.get(levels)
+        if tree is None or tree.version != network.version:
+            tree = _trees[levels] = HierarchyTree.from_network(network, levels)
+        return tree
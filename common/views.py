@@ -1,5 +1,13 @@
-from rest_framework import viewsets
+import hmac
+
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 from .models import *
+from .perf import connection_stats, registry as perf_registry
 from .serializers import *
 
 class StateViewSet(viewsets.ModelViewSet):
@@ -25,3 +33,39 @@ class DistributionTransformerViewSet(viewsets.ModelViewSet):
 class BandViewSet(viewsets.ModelViewSet):
     queryset = Band.objects.all()
     serializer_class = BandSerializer
+
+
+def _perf_stats_allowed(request):
+    token = getattr(settings, 'PERF_STATS_TOKEN', '')
+    if token:
+        return hmac.compare_digest(request.headers.get('X-Perf-Token', ''), token)
+    return settings.DEBUG
+
+
+@api_view(['GET', 'DELETE'])
+def perf_stats_view(request):
+    """
+    Per-endpoint query counts and timings recorded by
+    QueryInstrumentationMiddleware in this process. DELETE resets them.
+    Requires the X-Perf-Token header when PERF_STATS_TOKEN is set; without
+    one it is only served in DEBUG.
+    """
+    if not _perf_stats_allowed(request):
+        raise NotFound()
+
+    if request.method == 'DELETE':
+        perf_registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    return Response({
+        'enabled': getattr(settings, 'PERF_INSTRUMENTATION', False),
+        'database': connection_stats(),
+        'endpoints': perf_registry.snapshot(),
+    })
+
+
+@api_view(['GET'])
+def job_status_view(request, job_id):
+    """Status of a background job (common.jobs); deferred bulk actions answer 202 with its id."""
+    job = get_object_or_404(Job, pk=job_id)
+    return Response(JobSerializer(job).data)
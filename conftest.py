@@ -0,0 +1,75 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework.test import APIClient
+
+from common.models import Band, State, BusinessDistrict, InjectionSubstation, Feeder, DistributionTransformer
+from commercial.models import SalesRepresentative, MonthlyCommercialSummary
+from financial.models import Opex, NBETInvoice, MOInvoice
+from common.dimensions import invalidate_network
+from financial.tariffs import invalidate_tariff_index
+from technical.models import EnergyDelivered
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def reset_process_caches():
+    # Test rollbacks delete rows without firing signals, so drop in-process indexes between tests
+    invalidate_tariff_index()
+    invalidate_network()
+    yield
+    invalidate_tariff_index()
+    invalidate_network()
+
+
+@pytest.fixture
+def build_network():
+    """
+    Benchmark fixture: each call adds `groups` states, `groups` districts under a
+    shared "Hub" state and `groups` bands, with feeders, energy, costs and sales.
+    """
+    counter = {"n": 0}
+
+    def build(groups):
+        month = date(2025, 3, 1)
+        NBETInvoice.objects.get_or_create(month=month, defaults={"amount": Decimal("1000")})
+        MOInvoice.objects.get_or_create(month=month, defaults={"amount": Decimal("100")})
+
+        hub = State.objects.get_or_create(name="Hub")[0]
+
+        for _ in range(groups):
+            counter["n"] += 1
+            n = counter["n"]
+            state = State.objects.create(name=f"State {n}")
+            bands = [Band.objects.create(name=f"Band {n}")]
+            for district in (
+                BusinessDistrict.objects.create(name=f"District {n}", state=state),
+                BusinessDistrict.objects.create(name=f"Hub District {n}", state=hub),
+            ):
+                _add_district_data(district, bands, month)
+
+    return build
+
+
+def _add_district_data(district, bands, month):
+    substation = InjectionSubstation.objects.create(name=f"SS {district.name}")
+    Opex.objects.create(
+        district=district, date=month, purpose="Fuel", payee="Vendor",
+        transaction_id=Opex.objects.count() + 1, debit=Decimal("10"), credit=Decimal("5"),
+    )
+    rep = SalesRepresentative.objects.create(name=f"Rep {district.name}", slug=f"rep-{district.slug}")
+    for band in bands:
+        feeder = Feeder.objects.create(
+            name=f"F {district.name} {band.name}", substation=substation, business_district=district, band=band
+        )
+        EnergyDelivered.objects.create(feeder=feeder, date=month, energy_mwh=Decimal("2.5"))
+        transformer = DistributionTransformer.objects.create(name=f"T {district.name} {band.name}", feeder=feeder)
+        rep.assigned_transformers.add(transformer)
+        MonthlyCommercialSummary.objects.create(
+            sales_rep=rep, transformer=transformer, month=month,
+            revenue_billed=Decimal("500"), revenue_collected=Decimal("400"),
+        )
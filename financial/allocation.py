@@ -0,0 +1,224 @@
+# financial/allocation.py
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta  # type: ignore
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from common.models import BusinessDistrict, DistributionTransformer, Feeder, State
+from technical.models import EnergyDelivered
+from .models import Opex, SalaryPayment, NBETInvoice, MOInvoice
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+class AllocationScope:
+    """
+    The slice of the network costs are attributed to.
+
+    feeder_ids / district_ids of None mean "everything".
+    energy_fraction and pool_fraction are the extra equal-split factors
+    applied at transformer level (None when not splitting).
+    """
+    __slots__ = ("feeder_ids", "district_ids", "energy_fraction", "pool_fraction")
+
+    def __init__(self, feeder_ids=None, district_ids=None, energy_fraction=None, pool_fraction=None):
+        self.feeder_ids = feeder_ids
+        self.district_ids = district_ids
+        self.energy_fraction = energy_fraction
+        self.pool_fraction = pool_fraction
+
+
+class CostAllocationEngine:
+    """
+    Loads the cost pools (Opex, SalaryPayment, NBET, MO) and energy delivered
+    for a window of months in a handful of grouped queries, then allocates
+    them to any scope / level in memory.
+
+    Allocation rules (unchanged from financial_overview_view):
+      - Opex and salaries belong to the scope's district(s).
+      - NBET and MO invoices are shared by energy delivered.
+      - A transformer takes 1/N of its feeder's energy share (N transformers
+        on the feeder) and 1/M of its district's Opex and salaries
+        (M transformers in the district).
+    """
+
+    def __init__(self, months):
+        self.months = sorted({month_start(m) for m in months})
+        self.start = self.months[0]
+        self.end = self.months[-1] + relativedelta(months=1)
+
+        self._load_hierarchy()
+        self._load_energy()
+        self._load_pools()
+
+    # ─── Loading ─────────────────────────────────────────────────────────────
+    def _load_hierarchy(self):
+        self.state_names = dict(State.objects.values_list("id", "name"))
+
+        self.district_state = {}
+        self.district_names = {}
+        for district_id, name, state_id in BusinessDistrict.objects.values_list("id", "name", "state_id"):
+            self.district_state[district_id] = state_id
+            self.district_names[district_id] = name
+
+        self.feeder_district = dict(Feeder.objects.values_list("id", "business_district_id"))
+
+        self.transformers_per_feeder = dict(
+            DistributionTransformer.objects.values("feeder_id")
+            .annotate(n=Count("id"))
+            .values_list("feeder_id", "n")
+        )
+        self.transformers_per_district = defaultdict(int)
+        for feeder_id, n in self.transformers_per_feeder.items():
+            self.transformers_per_district[self.feeder_district.get(feeder_id)] += n
+
+    def _load_energy(self):
+        self.energy = defaultdict(dict)  # month -> feeder_id -> MWh
+        self.total_energy = defaultdict(Decimal)  # month -> MWh
+
+        rows = (
+            EnergyDelivered.objects.filter(date__gte=self.start, date__lt=self.end)
+            .annotate(period=TruncMonth("date"))
+            .values("period", "feeder_id")
+            .annotate(total=Sum("energy_mwh"))
+            .order_by()
+        )
+        for row in rows:
+            period = month_start(row["period"])
+            total = row["total"] or Decimal("0")
+            self.energy[period][row["feeder_id"]] = total
+            self.total_energy[period] += total
+
+    def _grouped_by_district(self, qs, date_field, *sum_fields):
+        pools = defaultdict(lambda: defaultdict(Decimal))  # month -> district_id -> amount
+        rows = (
+            qs.filter(**{f"{date_field}__gte": self.start, f"{date_field}__lt": self.end})
+            .annotate(period=TruncMonth(date_field))
+            .values("period", "district_id")
+            .annotate(**{f: Sum(f) for f in sum_fields})
+            .order_by()
+        )
+        for row in rows:
+            period = month_start(row["period"])
+            for f in sum_fields:
+                pools[period][row["district_id"]] += row[f] or 0
+        return pools
+
+    def _grouped_by_month(self, model):
+        rows = (
+            model.objects.filter(month__gte=self.start, month__lt=self.end)
+            .annotate(period=TruncMonth("month"))
+            .values("period")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+        return {month_start(row["period"]): row["total"] or Decimal("0") for row in rows}
+
+    def _load_pools(self):
+        self.opex = self._grouped_by_district(Opex.objects.all(), "date", "debit", "credit")
+        self.salaries = self._grouped_by_district(SalaryPayment.objects.all(), "month", "amount")
+        self.nbet = self._grouped_by_month(NBETInvoice)
+        self.mo = self._grouped_by_month(MOInvoice)
+
+    # ─── Scopes ──────────────────────────────────────────────────────────────
+    def _feeders_in_districts(self, district_ids):
+        return {f for f, d in self.feeder_district.items() if d in district_ids}
+
+    def scope_for_transformer(self, transformer):
+        district_id = self.feeder_district.get(transformer.feeder_id)
+        feeder_count = self.transformers_per_feeder.get(transformer.feeder_id, 0)
+        district_count = self.transformers_per_district.get(district_id, 0)
+        return AllocationScope(
+            feeder_ids={transformer.feeder_id},
+            district_ids={district_id},
+            energy_fraction=Decimal("1") / Decimal(feeder_count) if feeder_count > 0 else Decimal("1"),
+            pool_fraction=Decimal("1") / Decimal(district_count) if district_count > 0 else Decimal("1"),
+        )
+
+    def scope_for_feeder(self, feeder_id):
+        return AllocationScope(feeder_ids={feeder_id}, district_ids={self.feeder_district.get(feeder_id)})
+
+    def scope_for_feeders(self, feeder_ids):
+        """A set of feeders (e.g. a band's) with the opex and salaries of every district they run through."""
+        feeder_ids = set(feeder_ids)
+        district_ids = {self.feeder_district.get(f) for f in feeder_ids} - {None}
+        return AllocationScope(feeder_ids=feeder_ids, district_ids=district_ids)
+
+    def scope_for_districts(self, district_ids):
+        district_ids = set(district_ids)
+        return AllocationScope(feeder_ids=self._feeders_in_districts(district_ids), district_ids=district_ids)
+
+    def scope_for_states(self, state_ids):
+        state_ids = set(state_ids)
+        return self.scope_for_districts(d for d, s in self.district_state.items() if s in state_ids)
+
+    def scope_for(self, state_name=None, district_name=None, feeder=None, transformer=None):
+        """Same precedence as the overview filters: transformer > feeder > district > state."""
+        if transformer is not None:
+            return self.scope_for_transformer(transformer)
+        if feeder is not None:
+            return self.scope_for_feeder(feeder.id)
+        if district_name:
+            name = district_name.lower()
+            return self.scope_for_districts(d for d, n in self.district_names.items() if n.lower() == name)
+        if state_name:
+            name = state_name.lower()
+            return self.scope_for_states(s for s, n in self.state_names.items() if n.lower() == name)
+        return AllocationScope()
+
+    # ─── Allocation ──────────────────────────────────────────────────────────
+    def energy_for(self, scope, month):
+        by_feeder = self.energy.get(month_start(month), {})
+        if scope.feeder_ids is None:
+            return self.total_energy.get(month_start(month), Decimal("0"))
+        return sum((by_feeder.get(f, Decimal("0")) for f in scope.feeder_ids), Decimal("0"))
+
+    def energy_share(self, scope, month):
+        total_energy = self.total_energy.get(month_start(month), Decimal("0"))
+        share = self.energy_for(scope, month) / total_energy if total_energy > 0 else Decimal("0")
+        if scope.energy_fraction is not None:
+            share = share * scope.energy_fraction
+        return share
+
+    def _pool_for(self, pools, scope, month):
+        by_district = pools.get(month_start(month), {})
+        if scope.district_ids is None:
+            return sum(by_district.values(), Decimal("0"))
+        return sum((by_district.get(d, Decimal("0")) for d in scope.district_ids), Decimal("0"))
+
+    def invoice_totals(self, month):
+        """The month's full NBET and MO invoices, before any energy sharing."""
+        month = month_start(month)
+        return self.nbet.get(month, Decimal("0")), self.mo.get(month, Decimal("0"))
+
+    def costs_for(self, scope, month):
+        """Cost components for one scope and month (same shape the overview has always returned)."""
+        month = month_start(month)
+        energy_share = self.energy_share(scope, month)
+
+        opex = self._pool_for(self.opex, scope, month)
+        salaries = self._pool_for(self.salaries, scope, month)
+        if scope.pool_fraction is not None:
+            opex_total = float(opex * scope.pool_fraction)
+            salary_total = float(salaries * scope.pool_fraction)
+        else:
+            opex_total = float(opex)
+            salary_total = float(salaries)
+
+        nbet_allocated = float(self.nbet.get(month, Decimal("0")) * energy_share)
+        mo_allocated = float(self.mo.get(month, Decimal("0")) * energy_share)
+
+        return {
+            "opex": opex_total,
+            "salaries": salary_total,
+            "nbet": nbet_allocated,
+            "mo": mo_allocated,
+            "total": opex_total + salary_total + nbet_allocated + mo_allocated,
+            "energy_share": float(energy_share),
+            "transformer_opex_share": float(scope.pool_fraction) if scope.pool_fraction is not None else None,
+        }
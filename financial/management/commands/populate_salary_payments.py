@@ -1,5 +1,5 @@
-from django.core.management.base import BaseCommand
-from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
 from hr.models import Staff
@@ -12,63 +12,91 @@ def last_day_of_month(any_day):
     next_month = any_day.replace(day=28) + timedelta(days=4)
     return next_month - timedelta(days=next_month.day)
 
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
+
+
 class Command(BaseCommand):
     help = (
         "Populate SalaryPayment entries for every month "
-        "from Jan 2022 through Jul 2025 based on each Staff's "
-        "hire_date/exit_date and salary."
+        "from Jan 2022 through Jul 2025 (or --from/--to) based on each Staff's "
+        "hire_date/exit_date and salary. Existing payments are left untouched."
     )
 
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from_month", type=parse_month, default=date(2022, 1, 1),
+                            metavar="YYYY-MM", help="First month to generate (default 2022-01).")
+        parser.add_argument("--to", dest="to_month", type=parse_month, default=date(2025, 7, 1),
+                            metavar="YYYY-MM", help="Last month to generate (default 2025-07).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT (default 1000).")
+        parser.add_argument("--dry-run", action="store_true", help="Count the missing payments without inserting them.")
+
+    def eligible_payments(self, staff_rows, months):
+        """
+        The (district, month, staff) grid of payments that should exist: a staff
+        member is paid for every month from hire to exit, if they have a district.
+        Returns (payments, ineligible count).
+        """
+        payments = []
+        ineligible = 0
+        for current in months:
+            payment_dt = last_day_of_month(current)
+            for staff in staff_rows:
+                # Hired after this month, exited before it, or no district to charge it to
+                if (
+                    staff["hire_date"] > current
+                    or (staff["exit_date"] is not None and staff["exit_date"] < current)
+                    or staff["district_id"] is None
+                ):
+                    ineligible += 1
+                    continue
+                payments.append((staff["district_id"], current, staff["id"], payment_dt, staff["salary"]))
+        return payments, ineligible
+
     def handle(self, *args, **options):
-        start_month = date(2022, 1, 1)
-        end_month   = date(2025, 7, 1)
+        start_month = options["from_month"]
+        end_month = options["to_month"]
+        if start_month > end_month:
+            raise CommandError("--from must not be after --to")
 
+        months = []
         current = start_month
-        created = 0
-        skipped = 0
-
         while current <= end_month:
-            for staff in Staff.objects.all():
-                hire = staff.hire_date        # DateField
-                exit = staff.exit_date        # DateField or None
-
-                # Skip if hired after this month
-                if hire > current:
-                    skipped += 1
-                    continue
-
-                # Skip if exited before this month
-                if exit is not None and exit < current:
-                    skipped += 1
-                    continue
+            months.append(current)
+            current += relativedelta(months=1)
 
-                # Determine payment_date = last day of 'current' month
-                payment_dt = last_day_of_month(current)
+        staff_rows = list(Staff.objects.values("id", "hire_date", "exit_date", "district_id", "salary"))
+        payments, ineligible = self.eligible_payments(staff_rows, months)
 
-                # District is required on SalaryPayment; staff.district per your model
-                district = staff.district
-                if district is None:
-                    # Skip any staff without an assigned district
-                    skipped += 1
-                    continue
+        # One query for what already exists in the window
+        existing = set(
+            SalaryPayment.objects.filter(month__gte=start_month, month__lte=end_month)
+            .values_list("district_id", "month", "staff_id")
+        )
+        missing = [p for p in payments if p[:3] not in existing]
 
-                # Create or skip if already exists
-                obj, was_created = SalaryPayment.objects.get_or_create(
-                    district=district,
-                    month=current,
-                    staff=staff,
-                    defaults={
-                        "payment_date": payment_dt,
-                        "amount": staff.salary,
-                    }
-                )
-                if was_created:
-                    created += 1
-                else:
-                    skipped += 1
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{len(missing)} payments missing between {start_month:%Y-%m} and {end_month:%Y-%m}; "
+                f"{len(payments) - len(missing)} already exist."
+            )
+            return
 
-            # Next month
-            current += relativedelta(months=1)
+        created = len(SalaryPayment.objects.bulk_create(
+            [
+                SalaryPayment(district_id=district_id, month=month, staff_id=staff_id,
+                              payment_date=payment_dt, amount=amount)
+                for district_id, month, staff_id, payment_dt, amount in missing
+            ],
+            batch_size=options["batch_size"],
+            # Rows inserted concurrently since the diff are skipped, not errors
+            ignore_conflicts=True,
+        ))
+        skipped = ineligible + len(payments) - len(missing)
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -1,8 +1,13 @@
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta  # type: ignore
 from django.db.models import Sum
+from django.db.models.functions import TruncMonth
 from commercial.utils import get_filtered_feeders
 from commercial.date_filters import get_date_range_from_request
 from financial.models import *
 from commercial.models import MonthlyCommercialSummary, SalesRepresentative
+from technical.models import EnergyDelivered
+from financial.tariffs import tariff_for
 
 def get_total_cost(request):
     feeders = get_filtered_feeders(request)
@@ -56,13 +61,46 @@ def get_opex_breakdown(request):
 
 
 def get_tariff_loss(request):
-    # MYTO allowed tariff and actual collected tariff will be modeled separately in future
-    # Placeholder for now
-    myto_allowed_tariff = 100  # Simulated value 
-    actual_collected_tariff = 80  # Simulated value
+    """
+    Tariff loss (%) = 1 - collections / revenue at MYTO tariff.
 
-    tariff_loss = 1 - (actual_collected_tariff / myto_allowed_tariff)
-    return round(tariff_loss * 100, 2)  # As a percentage
+    Revenue at tariff prices each band-month of energy delivered at the tariff
+    in force for that band and month (one grouped query + the tariff index).
+    Feeders without a band use the latest tariff of any band.
+    """
+    feeders = get_filtered_feeders(request)
+    month_from, month_to = get_date_range_from_request(request, 'month')
+
+    energy = EnergyDelivered.objects.filter(feeder__in=feeders)
+    collections = MonthlyCommercialSummary.objects.filter(transformer__feeder__in=feeders)
+
+    # Both sides cover whole months, so a mid-month bound keeps that month's energy and collections
+    if month_from:
+        energy = energy.filter(date__gte=month_from.replace(day=1))
+        collections = collections.filter(month__gte=month_from.replace(day=1))
+    if month_to:
+        energy = energy.filter(date__lt=month_to.replace(day=1) + relativedelta(months=1))
+        collections = collections.filter(month__lte=month_to.replace(day=1))
+
+    rows = list(
+        energy.annotate(period=TruncMonth('date'))
+        .values('feeder__band_id', 'period')
+        .annotate(energy_mwh=Sum('energy_mwh'))
+        .order_by()
+    )
+    rates = tariff_for([r['feeder__band_id'] for r in rows], [r['period'] for r in rows])
+
+    revenue_at_tariff = sum(
+        ((r['energy_mwh'] or 0) * 1000 * rate for r, rate in zip(rows, rates)),
+        Decimal('0')
+    )
+    if revenue_at_tariff <= 0:
+        return 0.0
+
+    collected = collections.aggregate(total=Sum('revenue_collected'))['total'] or Decimal('0')
+
+    tariff_loss = 1 - (collected / revenue_at_tariff)
+    return round(float(tariff_loss) * 100, 2)  # As a percentage
 
 
 
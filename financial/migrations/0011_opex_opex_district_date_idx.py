@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_alter_distributiontransformer_unique_together'),
+        ('financial', '0010_hqopex'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opex',
+            index=models.Index(fields=['district', 'date'], name='opex_district_date_idx'),
+        ),
+    ]
@@ -78,6 +78,9 @@ class Opex(UUIDModel, models.Model):
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['district', 'date'], name='opex_district_date_idx'),
+        ]
         verbose_name = "OPEX"
         verbose_name_plural = "OPEX Records"
 
@@ -0,0 +1,12 @@
+# financial/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import MYTOTariff
+from .tariffs import invalidate_tariff_index
+
+
+@receiver(post_save, sender=MYTOTariff)
+@receiver(post_delete, sender=MYTOTariff)
+def myto_tariff_changed(sender, **kwargs):
+    invalidate_tariff_index()
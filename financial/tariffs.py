@@ -0,0 +1,108 @@
+# financial/tariffs.py
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import MYTOTariff
+
+
+DEFAULT_MYTO_TARIFF = Decimal("60")
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+class TariffIndex:
+    """
+    In-memory effective-dated index of MYTO tariffs.
+
+    Per band the effective dates are kept sorted, so the tariff in force for
+    a month is a bisect instead of a filter/order_by/first query.
+    """
+
+    def __init__(self, rows):
+        by_band = {}
+        for band_id, effective_date, rate in rows:
+            by_band.setdefault(band_id, []).append((effective_date, rate))
+
+        self._dates = {}
+        self._rates = {}
+        for band_id, entries in by_band.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._dates[band_id] = [entry[0] for entry in entries]
+            self._rates[band_id] = [entry[1] for entry in entries]
+
+        # Any-band timeline: the latest tariff of any band in force on a date
+        timeline = sorted(
+            ((d, r) for band_id in self._dates for d, r in zip(self._dates[band_id], self._rates[band_id])),
+            key=lambda entry: entry[0],
+        )
+        self._all_dates = [entry[0] for entry in timeline]
+        self._all_rates = [entry[1] for entry in timeline]
+
+    @classmethod
+    def load(cls):
+        return cls(MYTOTariff.objects.values_list("band_id", "effective_date", "rate_per_kwh"))
+
+    @staticmethod
+    def _lookup(dates, rates, month):
+        i = bisect_right(dates, month)
+        return rates[i - 1] if i else None
+
+    def rate_for(self, band_id, month, default=None):
+        """
+        Tariff in force on `month` for a band. band_id=None means the latest
+        tariff of any band. Returns `default` when none is in force yet.
+        """
+        if band_id is None:
+            rate = self._lookup(self._all_dates, self._all_rates, month)
+        else:
+            rate = self._lookup(self._dates.get(band_id, []), self._rates.get(band_id, []), month)
+        return rate if rate is not None else default
+
+    def tariff_for(self, band_ids, months, default=None):
+        """Vectorised lookup: one rate per (band_id, month) pair."""
+        band_ids = list(band_ids)
+        months = list(months)
+        if len(band_ids) != len(months):
+            raise ValueError("band_ids and months must be the same length")
+        return [self.rate_for(band_id, month, default) for band_id, month in zip(band_ids, months)]
+
+
+_lock = threading.Lock()
+_index = None
+_loaded_at = 0.0
+
+
+def get_tariff_index():
+    """
+    Process-wide index, loaded on first use. Saves and deletes invalidate it
+    through signals; MYTO_TARIFF_INDEX_TTL bounds staleness across workers.
+    """
+    global _index, _loaded_at
+    ttl = getattr(settings, "MYTO_TARIFF_INDEX_TTL", 300)
+    with _lock:
+        if _index is None or (ttl and time.monotonic() - _loaded_at > ttl):
+            _index = TariffIndex.load()
+            _loaded_at = time.monotonic()
+        return _index
+
+
+def invalidate_tariff_index(**kwargs):
+    global _index
+    with _lock:
+        _index = None
+
+
+def tariff_for(band_ids, months, default=DEFAULT_MYTO_TARIFF):
+    return get_tariff_index().tariff_for(band_ids, months, default)
+
+
+def latest_tariff(month, default=DEFAULT_MYTO_TARIFF):
+    """Latest tariff of any band in force on `month` (what the dashboards display)."""
+    return get_tariff_index().rate_for(None, month, default)
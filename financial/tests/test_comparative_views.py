@@ -0,0 +1,50 @@
+import pytest
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def _query_count(api_client, url):
+    api_client.get(url)  # warm process-level caches (e.g. the tariff index)
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/api/financial/all-states-metrics/?year=2025&month=3",
+    "/api/financial/all-business-districts-metrics/?year=2025&month=3&state=Hub",
+    "/api/financial/service-band-financial-metrics/?year=2025&month=3",
+])
+def test_query_count_independent_of_group_count(api_client, build_network, url):
+    build_network(2)
+    small = _query_count(api_client, url)
+
+    build_network(6)
+    large = _query_count(api_client, url)
+
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_total_costs_by_hand(api_client, build_network):
+    # Four districts (District 1/2 and Hub District 1/2), each with 15 of opex and one
+    # 2.5 MWh feeder: 10 MWh in all, against NBET 1000 and MO 100
+    build_network(2)
+
+    states = api_client.get("/api/financial/all-states-metrics/?year=2025&month=3").data
+    # States carry the full NBET and MO invoices on top of their own opex
+    assert {row["state"]: row["total_cost"] for row in states} == {
+        "Hub": Decimal("1130.00"), "State 1": Decimal("1115.00"), "State 2": Decimal("1115.00"),
+    }
+
+    districts = api_client.get("/api/financial/all-business-districts-metrics/?year=2025&month=3&state=Hub").data
+    # 15 + a quarter of the energy, so a quarter of 1100
+    assert {row["district"]: row["total_cost"] for row in districts} == {"Hub District 1": 290.0, "Hub District 2": 290.0}
+
+    bands = api_client.get("/api/financial/service-band-financial-metrics/?year=2025&month=3").data
+    # Each band runs through two districts: 30 + half of 1100
+    assert {row["band"]: row["total_cost"] for row in bands} == {"Band 1": 580.0, "Band 2": 580.0}
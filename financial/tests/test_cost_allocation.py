@@ -0,0 +1,86 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from common.models import BusinessDistrict, DistributionTransformer, Feeder, InjectionSubstation, State
+from financial.allocation import CostAllocationEngine
+from financial.models import MOInvoice, NBETInvoice, Opex, SalaryPayment
+from technical.models import EnergyDelivered
+
+MARCH = date(2025, 3, 1)
+
+
+@pytest.fixture
+def network(db):
+    """
+    Two states. D1 (state S1) has feeders F1 (60 MWh, 2 transformers) and F2
+    (20 MWh, 1 transformer); D3 (state S2) has F3 (20 MWh, 1 transformer).
+    NBET 1000 and MO 200 are shared by energy; D1 spends 150 opex + 300
+    salaries, D3 30 + 100.
+    """
+    s1, s2 = State.objects.create(name="S1"), State.objects.create(name="S2")
+    d1 = BusinessDistrict.objects.create(name="D1", state=s1)
+    BusinessDistrict.objects.create(name="D2", state=s1)
+    d3 = BusinessDistrict.objects.create(name="D3", state=s2)
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeders = {}
+    for name, district, mwh, transformers in (("F1", d1, 60, 2), ("F2", d1, 20, 1), ("F3", d3, 20, 1)):
+        feeder = feeders[name] = Feeder.objects.create(name=name, substation=substation, business_district=district)
+        EnergyDelivered.objects.create(feeder=feeder, date=MARCH, energy_mwh=Decimal(mwh))
+        for i in range(transformers):
+            DistributionTransformer.objects.create(name=f"{name}-T{i}", feeder=feeder)
+
+    for n, (district, debit, credit) in enumerate(((d1, 100, 50), (d3, 30, 0)), start=1):
+        Opex.objects.create(district=district, date=date(2025, 3, 10), purpose="Fuel", payee="Vendor",
+                            transaction_id=n, debit=Decimal(debit), credit=Decimal(credit))
+    for district, amount in ((d1, 300), (d3, 100)):
+        SalaryPayment.objects.create(district=district, month=MARCH, payment_date=date(2025, 3, 28),
+                                     amount=Decimal(amount))
+    NBETInvoice.objects.create(month=MARCH, amount=Decimal("1000"))
+    MOInvoice.objects.create(month=MARCH, amount=Decimal("200"))
+    return feeders
+
+
+def _costs(engine, scope):
+    costs = engine.costs_for(scope, MARCH)
+    return {k: pytest.approx(costs[k]) for k in ("opex", "salaries", "nbet", "mo", "total", "energy_share")}
+
+
+@pytest.mark.django_db
+def test_costs_and_energy_per_scope(network):
+    engine = CostAllocationEngine([MARCH])
+
+    # Half of F1's energy share, a third of D1's opex and salaries
+    transformer = DistributionTransformer.objects.get(name="F1-T0")
+    scope = engine.scope_for(transformer=transformer)
+    assert engine.energy_for(scope, MARCH) == Decimal("60")
+    assert _costs(engine, scope) == {"opex": 50, "salaries": 100, "nbet": 300, "mo": 60, "total": 510,
+                                     "energy_share": 0.3}
+    assert engine.costs_for(scope, MARCH)["transformer_opex_share"] == pytest.approx(1 / 3)
+
+    scope = engine.scope_for(feeder=network["F2"])
+    assert engine.energy_for(scope, MARCH) == Decimal("20")
+    assert _costs(engine, scope) == {"opex": 150, "salaries": 300, "nbet": 200, "mo": 40, "total": 690,
+                                     "energy_share": 0.2}
+
+    scope = engine.scope_for(district_name="d1")
+    assert engine.energy_for(scope, MARCH) == Decimal("80")
+    assert _costs(engine, scope) == {"opex": 150, "salaries": 300, "nbet": 800, "mo": 160, "total": 1410,
+                                     "energy_share": 0.8}
+
+    scope = engine.scope_for(state_name="S2")
+    assert engine.energy_for(scope, MARCH) == Decimal("20")
+    assert _costs(engine, scope) == {"opex": 30, "salaries": 100, "nbet": 200, "mo": 40, "total": 370,
+                                     "energy_share": 0.2}
+
+    # No filter: everything
+    scope = engine.scope_for()
+    assert engine.energy_for(scope, MARCH) == Decimal("100")
+    assert _costs(engine, scope)["total"] == pytest.approx(1780)
+
+
+@pytest.mark.django_db
+def test_months_without_data_cost_nothing(network):
+    engine = CostAllocationEngine([MARCH, date(2025, 4, 1)])
+    costs = engine.costs_for(engine.scope_for(state_name="S1"), date(2025, 4, 1))
+    assert costs["total"] == 0 and costs["energy_share"] == 0
@@ -0,0 +1,36 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from common.factories import BusinessDistrictFactory, StaffFactory
+from common.testing import query_budget
+from financial.models import SalaryPayment
+
+
+@pytest.mark.django_db
+def test_generates_missing_payments_for_a_month_range():
+    district = BusinessDistrictFactory()
+    stayer = StaffFactory(district=district, hire_date=date(2023, 12, 1))
+    leaver = StaffFactory(district=district, hire_date=date(2020, 1, 1), exit_date=date(2024, 2, 10))
+    StaffFactory(district=None, hire_date=date(2020, 1, 1))
+    SalaryPayment.objects.create(
+        district=district, month=date(2024, 1, 1), staff=stayer, payment_date=date(2024, 1, 31), amount=1,
+    )
+
+    with query_budget(4):
+        call_command("populate_salary_payments", "--from", "2024-01", "--to", "2024-03", stdout=StringIO())
+
+    paid = set(SalaryPayment.objects.values_list("staff_id", "month"))
+    assert paid == {
+        (stayer.id, date(2024, 1, 1)), (stayer.id, date(2024, 2, 1)), (stayer.id, date(2024, 3, 1)),
+        (leaver.id, date(2024, 1, 1)), (leaver.id, date(2024, 2, 1)),
+    }
+    # Existing rows are not overwritten
+    assert SalaryPayment.objects.get(staff=stayer, month=date(2024, 1, 1)).amount == 1
+    assert SalaryPayment.objects.get(staff=stayer, month=date(2024, 3, 1)).payment_date == date(2024, 3, 31)
+
+    out = StringIO()
+    call_command("populate_salary_payments", "--from", "2024-01", "--to", "2024-03", "--dry-run", stdout=out)
+    assert out.getvalue().startswith("0 payments missing")
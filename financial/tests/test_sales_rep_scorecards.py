@@ -0,0 +1,61 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from commercial.models import MonthlyCommercialSummary
+from common.factories import DistributionTransformerFactory, SalesRepresentativeFactory
+
+URL = "/api/financial/sales-reps/scorecards/"
+
+
+@pytest.fixture
+def reps(db):
+    dt = DistributionTransformerFactory()
+    alice, bola, chidi = (SalesRepresentativeFactory(name=name) for name in ("Alice", "Bola", "Chidi"))
+
+    def summary(rep, month, billed, collected):
+        MonthlyCommercialSummary.objects.create(sales_rep=rep, transformer=dt, month=month,
+                                                revenue_billed=billed, revenue_collected=collected)
+
+    summary(alice, date(2025, 6, 1), 1000, 600)
+    summary(alice, date(2025, 3, 1), 200, 50)
+    # Before the five-month window: counts towards all-time outstanding only
+    summary(alice, date(2025, 1, 1), 500, 100)
+    summary(bola, date(2025, 6, 1), 3000, 1000)
+    summary(chidi, date(2025, 6, 1), 10, 0)
+    return alice, bola, chidi
+
+
+@pytest.mark.django_db
+def test_window_covers_the_month_and_the_four_before(api_client, reps):
+    alice = reps[0]
+    data = api_client.get(URL, {"year": 2025, "month": 6, "ids": str(alice.id)}).data
+    assert (data["count"], data["total"]) == (1, 1)
+
+    card = data["results"][0]
+    assert card["current"]["revenue_billed"]["value"] == Decimal("1000")
+    assert card["current"]["outstanding_billed"]["value"] == Decimal("400")
+    assert [(m["month"], m["revenue_billed"]) for m in card["previous_months"]] == [
+        ("Feb", 0), ("Mar", Decimal("200")), ("Apr", 0), ("May", 0),
+    ]
+    assert card["outstanding_all_time"] == Decimal("950")
+
+
+@pytest.mark.django_db
+def test_ids_filter_sort_and_top(api_client, reps):
+    alice, bola, chidi = reps
+    data = api_client.get(URL, {
+        "year": 2025, "month": 6, "ids": f"{alice.id}, {chidi.id}", "sort": "revenue_billed", "order": "asc",
+    }).data
+    assert [card["sales_rep"]["name"] for card in data["results"]] == ["Chidi", "Alice"]
+
+    data = api_client.get(URL, {"year": 2025, "month": 6, "sort": "revenue_billed", "top": 2}).data
+    assert [card["sales_rep"]["name"] for card in data["results"]] == ["Bola", "Alice"]
+    # count is what came back, total what matched before the cut
+    assert (data["count"], data["total"]) == (2, 3)
+
+
+@pytest.mark.django_db
+def test_malformed_ids_are_rejected(api_client, reps):
+    response = api_client.get(URL, {"ids": f"{reps[0].id},not-a-uuid"})
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.test import RequestFactory
+
+from commercial.models import MonthlyCommercialSummary
+from common.factories import DistributionTransformerFactory, SalesRepresentativeFactory
+from common.models import Band
+from financial.metrics import get_tariff_loss
+from financial.models import MYTOTariff
+from financial.tariffs import get_tariff_index, tariff_for
+from technical.models import EnergyDelivered
+
+
+@pytest.mark.django_db
+def test_tariff_for_picks_rate_in_force_per_band():
+    band_a = Band.objects.create(name="A")
+    band_b = Band.objects.create(name="B")
+    MYTOTariff.objects.create(band=band_a, effective_date=date(2024, 1, 1), rate_per_kwh=Decimal("200"))
+    MYTOTariff.objects.create(band=band_a, effective_date=date(2024, 4, 1), rate_per_kwh=Decimal("209.5"))
+    MYTOTariff.objects.create(band=band_b, effective_date=date(2024, 2, 1), rate_per_kwh=Decimal("63"))
+
+    rates = tariff_for(
+        [band_a.id, band_a.id, band_a.id, band_b.id, band_b.id],
+        [date(2023, 12, 1), date(2024, 3, 1), date(2024, 4, 1), date(2024, 1, 1), date(2025, 1, 1)],
+        default=None,
+    )
+    assert rates == [None, Decimal("200"), Decimal("209.5"), None, Decimal("63")]
+
+
+@pytest.mark.django_db
+def test_tariff_index_invalidated_on_save():
+    band = Band.objects.create(name="A")
+    tariff = MYTOTariff.objects.create(band=band, effective_date=date(2024, 1, 1), rate_per_kwh=Decimal("200"))
+    assert get_tariff_index().rate_for(band.id, date(2024, 5, 1)) == Decimal("200")
+
+    tariff.rate_per_kwh = Decimal("225")
+    tariff.save()
+    assert get_tariff_index().rate_for(band.id, date(2024, 5, 1)) == Decimal("225")
+
+
+@pytest.mark.django_db
+def test_tariff_loss_prices_energy_at_the_tariff_in_force():
+    dt = DistributionTransformerFactory()
+    feeder, rep = dt.feeder, SalesRepresentativeFactory()
+    MYTOTariff.objects.create(band=feeder.band, effective_date=date(2024, 1, 1), rate_per_kwh=Decimal("200"))
+    MYTOTariff.objects.create(band=feeder.band, effective_date=date(2025, 3, 1), rate_per_kwh=Decimal("250"))
+    for day, mwh in ((date(2025, 2, 3), "4"), (date(2025, 2, 17), "6"), (date(2025, 3, 9), "8"), (date(2025, 4, 1), "50")):
+        EnergyDelivered.objects.create(feeder=feeder, date=day, energy_mwh=Decimal(mwh))
+    for month, collected in ((date(2025, 2, 1), 1_800_000), (date(2025, 3, 1), 1_200_000), (date(2025, 4, 1), 999)):
+        MonthlyCommercialSummary.objects.create(sales_rep=rep, transformer=dt, month=month, revenue_collected=collected)
+
+    request = RequestFactory().get("/", {"month_from": "2025-02-01", "month_to": "2025-03-01"})
+    # 10 MWh at 200/kWh + 8 MWh at 250/kWh = 4,000,000 at tariff; 3,000,000 collected
+    assert get_tariff_loss(request) == 25.0
+    # Mid-month bounds cover the same whole months on both sides
+    request = RequestFactory().get("/", {"month_from": "2025-02-15", "month_to": "2025-03-10"})
+    assert get_tariff_loss(request) == 25.0
@@ -1,5 +1,6 @@
 # financial/views.py
 import random
+import uuid
 from random import randint
 from datetime import date, datetime, timedelta
 from calendar import monthrange
@@ -9,6 +10,7 @@ from dateutil.relativedelta import relativedelta  # type: ignore
 from django.db.models import (
     Sum, Q, Count
 )
+from django.db.models.functions import TruncMonth, ExtractMonth
 from django.utils.timezone import now
 
 from django_filters.rest_framework import DjangoFilterBackend
@@ -23,10 +25,15 @@ from .models import *
 from .serializers import *
 from .metrics import get_financial_feeder_data
 
-from common.mixins import DistrictLocationFilterMixin
+from common.concurrency import run_concurrently
+from common.dimensions import get_network
+from common.memo import memo_aggregate
+from common.mixins import DistrictLocationFilterMixin, FastReadMixin, StreamingExportMixin
 from common.models import (
     Feeder, State, BusinessDistrict, Band, DistributionTransformer
 )
+from common.pagination import KeysetPagination
+from common.tree import get_tree
 
 from commercial.models import (
     MonthlyCommercialSummary,
@@ -40,6 +47,8 @@ from commercial.date_filters import get_date_range_from_request
 from commercial.metrics import get_total_collections
 
 from financial.models import Opex
+from financial.allocation import CostAllocationEngine
+from financial.tariffs import latest_tariff
 from financial.metrics import (
     get_total_cost,
     get_total_revenue_billed,
@@ -89,9 +98,11 @@ class OpexCategoryViewSet(viewsets.ModelViewSet):
 #         qs = Opex.objects.all()
 #         return self.filter_by_location(qs)
 
-class OpexViewSet(DistrictLocationFilterMixin, viewsets.ModelViewSet):
+class OpexViewSet(StreamingExportMixin, FastReadMixin, DistrictLocationFilterMixin, viewsets.ModelViewSet):
     queryset = Opex.objects.all()
     serializer_class = OpexSerializer
+    pagination_class = KeysetPagination
+    page_size = 500
     filter_backends = [DjangoFilterBackend]
     filterset_fields = {'district', 'gl_breakdown', 'opex_category', 'date'}
 
@@ -911,7 +922,7 @@ class MonthlyRevenueBilledViewSet(viewsets.ModelViewSet):
 
         return qs
     
-class SalaryPaymentViewSet(viewsets.ModelViewSet):
+class SalaryPaymentViewSet(FastReadMixin, viewsets.ModelViewSet):
     queryset = SalaryPayment.objects.all()
     serializer_class = SalaryPaymentSerializer
     filterset_fields = ["district", "month", "staff"]
@@ -955,8 +966,6 @@ def financial_overview_view(request):
     # Determine filtering level and build base filters
     commercial_base = Q()
     opex_base = Q()
-    salary_base = Q()
-    energy_base = Q()
 
     if transformer_slug:
         # Transformer-level filtering (highest precedence)
@@ -964,8 +973,6 @@ def financial_overview_view(request):
             transformer = DistributionTransformer.objects.get(slug=transformer_slug)
             commercial_base = Q(sales_rep__assigned_transformers=transformer)
             opex_base = Q(district=transformer.feeder.business_district)
-            salary_base = Q(district=transformer.feeder.business_district)
-            energy_base = Q(feeder=transformer.feeder)
         except DistributionTransformer.DoesNotExist:
             return Response({"error": "Transformer not found"}, status=400)
     elif feeder_slug:
@@ -974,22 +981,16 @@ def financial_overview_view(request):
             feeder = Feeder.objects.get(slug=feeder_slug)
             commercial_base = Q(sales_rep__assigned_transformers__feeder=feeder)
             opex_base = Q(district=feeder.business_district)
-            salary_base = Q(district=feeder.business_district)
-            energy_base = Q(feeder=feeder)
         except Feeder.DoesNotExist:
             return Response({"error": "Feeder not found"}, status=400)
     elif district_name:
         # Business district filtering
         commercial_base = Q(sales_rep__assigned_transformers__feeder__business_district__name__iexact=district_name)
         opex_base = Q(district__name__iexact=district_name)
-        salary_base = Q(district__name__iexact=district_name)
-        energy_base = Q(feeder__business_district__name__iexact=district_name)
     elif state_name:
         # State filtering
         commercial_base = Q(sales_rep__assigned_transformers__feeder__business_district__state__name__iexact=state_name)
         opex_base = Q(district__state__name__iexact=state_name)
-        salary_base = Q(district__state__name__iexact=state_name)
-        energy_base = Q(feeder__business_district__state__name__iexact=state_name)
 
     def calculate_delta(current, previous):
         """Calculate percentage change between current and previous values"""
@@ -997,110 +998,86 @@ def financial_overview_view(request):
             return round(((current - previous) / previous) * 100, 2)
         return None
 
-    def get_energy_share(start_date, end_date, energy_filter):
-        """Calculate energy share for proportional allocation"""
-        # Energy delivered for filtered scope
-        filtered_energy = EnergyDelivered.objects.filter(
-            energy_filter & Q(date__gte=start_date, date__lt=end_date)
-        ).aggregate(total=Sum("energy_mwh"))["total"] or Decimal("0")
-        
-        # Total energy delivered across all feeders
-        total_energy = EnergyDelivered.objects.filter(
-            date__gte=start_date, date__lt=end_date
-        ).aggregate(total=Sum("energy_mwh"))["total"] or Decimal("0")
-        
-        # Calculate share (0-1)
-        if total_energy > 0:
-            return filtered_energy / total_energy
-        return Decimal("0")
+    # All periods the response needs: 4 months of history up to the selected month
+    window_start = selected_date - relativedelta(months=4)
+    window_months = [window_start + relativedelta(months=i) for i in range(5)]
 
-    def get_costs_for_period(start_date, end_date):
-        """Get all cost components for a given period"""
-        # For transformer and feeder level, we need to calculate transformer's share of feeder energy
-        if transformer_slug:
-            # Transformer share calculation
-            # Since we don't have direct transformer energy data, we'll use a simplified approach:
-            # 1. Get all transformers on the feeder
-            # 2. Assume equal distribution (can be enhanced with actual transformer load data)
-            transformer = DistributionTransformer.objects.get(slug=transformer_slug)
-            feeder_transformers_count = DistributionTransformer.objects.filter(
-                feeder=transformer.feeder
-            ).count()
-            
-            # Transformer gets equal share of feeder's allocations
-            transformer_share = Decimal("1") / Decimal(feeder_transformers_count) if feeder_transformers_count > 0 else Decimal("1")
-            
-            # Get feeder's energy share first
-            feeder_energy_share = get_energy_share(start_date, end_date, Q(feeder=transformer.feeder))
-            # Transformer's final share is its portion of the feeder's share
-            energy_share = feeder_energy_share * transformer_share
-        else:
-            # Regular energy share calculation for feeder/district/state
-            energy_share = get_energy_share(start_date, end_date, energy_base)
-
-        # OPEX (both debit and credit) - transformer uses feeder's district OPEX
-        opex_filter = opex_base & Q(date__gte=start_date, date__lt=end_date)
-        opex_data = Opex.objects.filter(opex_filter).aggregate(
-            debit=Sum("debit"), 
-            credit=Sum("credit")
-        )
-        
-        if transformer_slug:
-            # Transformer gets proportional share of district OPEX based on transformer count
-            transformer = DistributionTransformer.objects.get(slug=transformer_slug)
-            district_transformers_count = DistributionTransformer.objects.filter(
-                feeder__business_district=transformer.feeder.business_district
-            ).count()
-            transformer_opex_share = Decimal("1") / Decimal(district_transformers_count) if district_transformers_count > 0 else Decimal("1")
-            
-            opex_total = float(((opex_data["debit"] or 0) + (opex_data["credit"] or 0)) * transformer_opex_share)
-        else:
-            opex_total = float((opex_data["debit"] or 0) + (opex_data["credit"] or 0))
+    yearly_commercial_filter = commercial_base & Q(month__year=year)
+    current_opex_filter = opex_base & Q(date__gte=selected_date, date__lt=selected_end)
+    prev_opex_filter = opex_base & Q(date__gte=prev_date, date__lt=selected_date)
+    qs_current = Opex.objects.filter(current_opex_filter)
+    qs_previous = Opex.objects.filter(prev_opex_filter) if prev_opex_filter else None
 
-        # Salaries - transformer uses proportional share of district salaries
-        salary_filter = salary_base & Q(month__gte=start_date, month__lt=end_date)
-        district_salary_total = SalaryPayment.objects.filter(salary_filter).aggregate(
-            total=Sum("amount"))["total"] or Decimal("0")
-        
-        if transformer_slug:
-            salary_total = float(district_salary_total * transformer_opex_share)
-        else:
-            salary_total = float(district_salary_total)
+    def opex_rows(qs, field_name):
+        if qs is None:
+            return None
+        if field_name == 'both':
+            return list(qs.values("opex_category__name").annotate(total=Sum("credit") + Sum("debit")))
+        return list(qs.values("opex_category__name").annotate(total=Sum(field_name)))
 
-        # NBET Invoice (allocated proportionally based on energy share)
-        nbet_total_invoice = NBETInvoice.objects.filter(
-            month__gte=start_date, month__lt=end_date
-        ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-        nbet_allocated = float(nbet_total_invoice * energy_share)
+    opex_variants = {
+        "all": (qs_current, qs_previous, "both"),
+        "credit_only": (
+            qs_current.filter(credit__gt=0), qs_previous.filter(credit__gt=0) if qs_previous else None, "credit"
+        ),
+        "debit_only": (
+            qs_current.filter(debit__gt=0), qs_previous.filter(debit__gt=0) if qs_previous else None, "debit"
+        ),
+    }
 
-        # MO Invoice (allocated proportionally based on energy share)
-        mo_total_invoice = MOInvoice.objects.filter(
-            month__gte=start_date, month__lt=end_date
-        ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-        mo_allocated = float(mo_total_invoice * energy_share)
+    # The cost engine and every aggregate below are independent: run them concurrently
+    tasks = {
+        # Cost pools and energy are loaded once for the whole window and allocated in memory
+        "engine": lambda: CostAllocationEngine(window_months),
+        # Revenue for every month of the window in one grouped query
+        "revenue": lambda: list(
+            MonthlyCommercialSummary.objects.filter(
+                commercial_base & Q(month__gte=window_start, month__lt=selected_end)
+            ).annotate(period=TruncMonth("month")).values("period").annotate(
+                revenue_billed=Sum("revenue_billed"),
+                revenue_collected=Sum("revenue_collected"),
+            ).order_by()
+        ),
+        "collections_by_month": lambda: dict(
+            MonthlyCommercialSummary.objects.filter(yearly_commercial_filter)
+            .annotate(m=ExtractMonth("month"))
+            .values("m")
+            .annotate(collections=Sum("revenue_collected"))
+            .values_list("m", "collections")
+            .order_by()
+        ),
+        "vendor_collections": lambda: list(
+            DailyCollection.objects.filter(
+                date__gte=selected_date,
+                date__lt=selected_end
+            ).values("vendor_name").annotate(amount=Sum("amount"))
+        ),
+    }
+    for key, (current_qs, previous_qs, field_name) in opex_variants.items():
+        tasks[key, "current"] = lambda qs=current_qs, f=field_name: opex_rows(qs, f)
+        tasks[key, "previous"] = lambda qs=previous_qs, f=field_name: opex_rows(qs, f)
+    results = run_concurrently(tasks)
+
+    engine = results["engine"]
+    scope = engine.scope_for(
+        state_name=state_name,
+        district_name=district_name,
+        feeder=feeder if feeder_slug and not transformer_slug else None,
+        transformer=transformer if transformer_slug else None,
+    )
 
-        total_cost = opex_total + salary_total + nbet_allocated + mo_allocated
+    def get_costs_for_period(start_date, end_date):
+        """Get all cost components for a given period"""
+        return engine.costs_for(scope, start_date)
 
-        return {
-            "opex": opex_total,
-            "salaries": salary_total,
-            "nbet": nbet_allocated,
-            "mo": mo_allocated,
-            "total": total_cost,
-            "energy_share": float(energy_share),
-            "transformer_opex_share": float(transformer_opex_share) if transformer_slug else None
-        }
+    revenue_by_month = {row["period"]: row for row in results["revenue"]}
 
     def get_revenue_for_period(start_date, end_date):
         """Get revenue data for a given period"""
-        commercial_filter = commercial_base & Q(month__gte=start_date, month__lt=end_date)
-        revenue_data = MonthlyCommercialSummary.objects.filter(commercial_filter).aggregate(
-            revenue_billed=Sum("revenue_billed"),
-            revenue_collected=Sum("revenue_collected"),
-        )
+        revenue_data = revenue_by_month.get(start_date, {})
         return {
-            "billed": float(revenue_data["revenue_billed"] or 0),
-            "collected": float(revenue_data["revenue_collected"] or 0)
+            "billed": float(revenue_data.get("revenue_billed") or 0),
+            "collected": float(revenue_data.get("revenue_collected") or 0)
         }
 
     # ─── 2) OPERATING EXPENDITURE (Selected Month + Delta) ─────────────────────
@@ -1171,14 +1148,11 @@ def financial_overview_view(request):
         prev_collections = period_revenue["collected"]
 
     # ─── 5) MONTHLY COLLECTIONS FOR ENTIRE YEAR ───────────────────────────────
-    yearly_commercial_filter = commercial_base & Q(month__year=year)
+    collections_by_month = results["collections_by_month"]
     monthly_collections_year = []
     
     for m in range(1, 13):
-        month_filter = yearly_commercial_filter & Q(month__month=m)
-        month_collections = MonthlyCommercialSummary.objects.filter(month_filter).aggregate(
-            collections=Sum("revenue_collected")
-        )["collections"] or 0
+        month_collections = collections_by_month.get(m) or 0
         
         monthly_collections_year.append({
             "month": date(year, m, 1).strftime("%b"),
@@ -1187,12 +1161,9 @@ def financial_overview_view(request):
         })
 
     # ─── 6) COLLECTIONS BY VENDOR ──────────────────────────────────────────────
-    vendor_collections = DailyCollection.objects.filter(
-        date__gte=selected_date, 
-        date__lt=selected_end
-    ).values("vendor_name").annotate(amount=Sum("amount"))
-    
-    if vendor_collections.exists():
+    vendor_collections = results["vendor_collections"]
+
+    if vendor_collections:
         collections_by_vendor = [
             {"vendor": row["vendor_name"], "amount": float(row["amount"] or 0)}
             for row in vendor_collections
@@ -1203,34 +1174,13 @@ def financial_overview_view(request):
         ]
 
     # ─── 7) OPEX BREAKDOWN (AFTER COLLECTIONS BY VENDOR) ──────────────────────
-    current_opex_filter = opex_base & Q(date__gte=selected_date, date__lt=selected_end)
-    prev_opex_filter = opex_base & Q(date__gte=prev_date, date__lt=selected_date)
-    
-    def get_opex_breakdown_by_type(qs_current, qs_previous, field_name):
-        if field_name == 'both':
-            current_data = qs_current.values("opex_category__name").annotate(
-                total=Sum("credit") + Sum("debit")
-            )
-        else:
-            current_data = qs_current.values("opex_category__name").annotate(
-                total=Sum(field_name)
-            )
-        
+    def get_opex_breakdown_by_type(current_data, prev_data):
         current_breakdown = {
             row["opex_category__name"] or "Uncategorized": float(row["total"] or 0)
             for row in current_data
         }
-        
-        if qs_previous is not None:
-            if field_name == 'both':
-                prev_data = qs_previous.values("opex_category__name").annotate(
-                    total=Sum("credit") + Sum("debit")
-                )
-            else:
-                prev_data = qs_previous.values("opex_category__name").annotate(
-                    total=Sum(field_name)
-                )
-            
+
+        if prev_data is not None:
             prev_breakdown = {
                 row["opex_category__name"] or "Uncategorized": float(row["total"] or 0)
                 for row in prev_data
@@ -1251,22 +1201,10 @@ def financial_overview_view(request):
         
         result.sort(key=lambda x: x["amount"], reverse=True)
         return result
-    
-    qs_current = Opex.objects.filter(current_opex_filter)
-    qs_previous = Opex.objects.filter(prev_opex_filter) if prev_opex_filter else None
-    
+
     opex_breakdown = {
-        "all": get_opex_breakdown_by_type(qs_current, qs_previous, "both"),
-        "credit_only": get_opex_breakdown_by_type(
-            qs_current.filter(credit__gt=0), 
-            qs_previous.filter(credit__gt=0) if qs_previous else None, 
-            "credit"
-        ),
-        "debit_only": get_opex_breakdown_by_type(
-            qs_current.filter(debit__gt=0), 
-            qs_previous.filter(debit__gt=0) if qs_previous else None, 
-            "debit"
-        ),
+        key: get_opex_breakdown_by_type(results[key, "current"], results[key, "previous"])
+        for key in opex_variants
     }
 
     # ─── 8) HISTORICAL COSTS BREAKDOWN (4 MONTHS INCLUDING SELECTED) ──────────
@@ -1301,19 +1239,13 @@ def financial_overview_view(request):
         period_end = period_date + relativedelta(months=1)
         
         # Energy delivered for tariff calculations
-        energy_delivered = EnergyDelivered.objects.filter(
-            energy_base & Q(date__gte=period_date, date__lt=period_end)
-        ).aggregate(total=Sum("energy_mwh"))["total"] or Decimal("0")
+        energy_delivered = engine.energy_for(scope, period_date)
 
         # Commercial data for tariff calculations
-        period_commercial_filter = commercial_base & Q(month__gte=period_date, month__lt=period_end)
-        commercial_data = MonthlyCommercialSummary.objects.filter(period_commercial_filter).aggregate(
-            revenue_billed=Sum("revenue_billed"), 
-            revenue_collected=Sum("revenue_collected")
-        )
+        commercial_data = revenue_by_month.get(period_date, {})
         
-        revenue_billed = commercial_data["revenue_billed"] or 0
-        revenue_collected = commercial_data["revenue_collected"] or 0
+        revenue_billed = commercial_data.get("revenue_billed") or 0
+        revenue_collected = commercial_data.get("revenue_collected") or 0
 
         # Calculate tariffs
         billing_tariff = (revenue_billed / (energy_delivered * 1000)) if energy_delivered else 0
@@ -1321,10 +1253,7 @@ def financial_overview_view(request):
         tariff_loss = billing_tariff - collection_tariff
 
         # Get MYTO tariff
-        myto_tariff_obj = MYTOTariff.objects.filter(
-            effective_date__lte=period_date
-        ).order_by("-effective_date").first()
-        myto_tariff = float(myto_tariff_obj.rate_per_kwh) if myto_tariff_obj else 60.0
+        myto_tariff = float(latest_tariff(period_date))
 
         historical_tariffs.append({
             "month": period_date.strftime("%b"),
@@ -1408,58 +1337,68 @@ def calculate_percentage_change(current_value, previous_value):
     return ((current_value - previous_value) / previous_value) * 100
 
 
-@api_view(["GET"])
-def sales_rep_performance_view(request, rep_id):
-    try:
-        rep = SalesRepresentative.objects.get(id=rep_id)
-    except SalesRepresentative.DoesNotExist:
-        return Response({"error": "Sales rep not found."}, status=status.HTTP_404_NOT_FOUND)
-
-    mode = request.GET.get("mode", "monthly")
-    year = int(request.GET.get("year", datetime.now().year))
-    month = int(request.GET.get("month", datetime.now().month))
+SCORECARD_SORT_FIELDS = (
+    "revenue_billed",
+    "revenue_collected",
+    "outstanding_billed",
+    "daily_run_rate",
+    "collections_on_outstanding",
+    "active_accounts",
+    "suspended_accounts",
+)
 
-    start_date = datetime(year, month, 1)
-    end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
-    
-    # Previous month dates for delta calculations
-    prev_month_start = start_date - relativedelta(months=1)
-    prev_month_end = (prev_month_start + relativedelta(months=1)) - timedelta(days=1)
 
-    # Current month summary
-    current_summary = MonthlyCommercialSummary.objects.filter(
-        sales_rep=rep,
+def get_sales_rep_monthly_totals(reps, start_date, end_date):
+    """
+    One grouped query over (sales_rep, month) for a window of months, plus one
+    for all-time totals. Returns ({rep_id: {month: totals}}, {rep_id: all_time}).
+    """
+    monthly = {}
+    rows = MonthlyCommercialSummary.objects.filter(
+        sales_rep__in=reps,
         month__range=(start_date, end_date)
-    ).aggregate(
+    ).annotate(period=TruncMonth("month")).values("sales_rep_id", "period").annotate(
         revenue_billed=Sum("revenue_billed"),
         revenue_collected=Sum("revenue_collected"),
         customers_billed=Sum("customers_billed"),
         customers_responded=Sum("customers_responded"),
-    )
+    ).order_by()
+    for row in rows:
+        monthly.setdefault(row["sales_rep_id"], {})[row["period"]] = row
+
+    all_time = {
+        row["sales_rep_id"]: row
+        for row in MonthlyCommercialSummary.objects.filter(sales_rep__in=reps)
+        .values("sales_rep_id")
+        .annotate(
+            all_time_billed=Sum("revenue_billed"),
+            all_time_collected=Sum("revenue_collected")
+        ).order_by()
+    }
+    return monthly, all_time
 
-    # Previous month summary for delta calculations
-    previous_summary = MonthlyCommercialSummary.objects.filter(
-        sales_rep=rep,
-        month__range=(prev_month_start, prev_month_end)
-    ).aggregate(
-        revenue_billed=Sum("revenue_billed"),
-        revenue_collected=Sum("revenue_collected"),
-        customers_billed=Sum("customers_billed"),
-        customers_responded=Sum("customers_responded"),
-    )
+
+def build_sales_rep_scorecard(rep, monthly_totals, all_time_summary, start_date, end_date):
+    """Metric block for one sales rep from pre-aggregated monthly totals."""
+    # Previous month dates for delta calculations
+    prev_month_start = start_date - relativedelta(months=1)
+    prev_month_end = (prev_month_start + relativedelta(months=1)) - timedelta(days=1)
+
+    current_summary = monthly_totals.get(start_date.date(), {})
+    previous_summary = monthly_totals.get(prev_month_start.date(), {})
 
     # Current month values
-    revenue_billed = current_summary["revenue_billed"] or 0
-    revenue_collected = current_summary["revenue_collected"] or 0
-    customers_billed = current_summary["customers_billed"] or 0
-    customers_responded = current_summary["customers_responded"] or 0
+    revenue_billed = current_summary.get("revenue_billed") or 0
+    revenue_collected = current_summary.get("revenue_collected") or 0
+    customers_billed = current_summary.get("customers_billed") or 0
+    customers_responded = current_summary.get("customers_responded") or 0
     outstanding_billed = revenue_billed - revenue_collected
 
     # Previous month values
-    prev_revenue_billed = previous_summary["revenue_billed"] or 0
-    prev_revenue_collected = previous_summary["revenue_collected"] or 0
-    prev_customers_billed = previous_summary["customers_billed"] or 0
-    prev_customers_responded = previous_summary["customers_responded"] or 0
+    prev_revenue_billed = previous_summary.get("revenue_billed") or 0
+    prev_revenue_collected = previous_summary.get("revenue_collected") or 0
+    prev_customers_billed = previous_summary.get("customers_billed") or 0
+    prev_customers_responded = previous_summary.get("customers_responded") or 0
     prev_outstanding_billed = prev_revenue_billed - prev_revenue_collected
 
     # Calculate additional metrics
@@ -1490,29 +1429,16 @@ def sales_rep_performance_view(request, rep_id):
     suspended_accounts_delta = calculate_percentage_change(suspended_accounts, prev_suspended_accounts)
 
     # All-time summary
-    all_time_summary = MonthlyCommercialSummary.objects.filter(sales_rep=rep).aggregate(
-        all_time_billed=Sum("revenue_billed"),
-        all_time_collected=Sum("revenue_collected")
-    )
-    outstanding_all_time = (all_time_summary["all_time_billed"] or 0) - (all_time_summary["all_time_collected"] or 0)
+    outstanding_all_time = (all_time_summary.get("all_time_billed") or 0) - (all_time_summary.get("all_time_collected") or 0)
 
     # ---- Previous 4 Months (excluding current month) ---- #
     monthly_summaries = []
     for i in range(1, 5):  # Start from 1 to exclude current month, go to 5 to get 4 months
-        ref_date = start_date - relativedelta(months=i)
-        month_start = ref_date.replace(day=1)
-        month_end = (month_start + relativedelta(months=1)) - timedelta(days=1)
-
-        summary = MonthlyCommercialSummary.objects.filter(
-            sales_rep=rep,
-            month__range=(month_start, month_end)
-        ).aggregate(
-            revenue_billed=Sum("revenue_billed") or 0,
-            revenue_collected=Sum("revenue_collected") or 0,
-        )
+        month_start = (start_date - relativedelta(months=i)).replace(day=1)
+        summary = monthly_totals.get(month_start.date(), {})
 
-        billed = summary["revenue_billed"] or 0
-        collected = summary["revenue_collected"] or 0
+        billed = summary.get("revenue_billed") or 0
+        collected = summary.get("revenue_collected") or 0
         outstanding = billed - collected
 
         monthly_summaries.append({
@@ -1524,7 +1450,7 @@ def sales_rep_performance_view(request, rep_id):
 
     monthly_summaries.reverse()  # Reverse to show oldest to newest
 
-    return Response({
+    return {
         "sales_rep": {
             "id": str(rep.id),
             "name": rep.name
@@ -1561,6 +1487,95 @@ def sales_rep_performance_view(request, rep_id):
         },
         "outstanding_all_time": outstanding_all_time,
         "previous_months": monthly_summaries
+    }
+
+
+def _scorecard_window(request):
+    year = int(request.GET.get("year", datetime.now().year))
+    month = int(request.GET.get("month", datetime.now().month))
+
+    start_date = datetime(year, month, 1)
+    end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
+    # Current month plus the 4 months before it
+    window_start = start_date - relativedelta(months=4)
+    return start_date, end_date, window_start
+
+
+@api_view(["GET"])
+def sales_rep_performance_view(request, rep_id):
+    try:
+        rep = SalesRepresentative.objects.get(id=rep_id)
+    except SalesRepresentative.DoesNotExist:
+        return Response({"error": "Sales rep not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    start_date, end_date, window_start = _scorecard_window(request)
+    monthly, all_time = get_sales_rep_monthly_totals([rep], window_start, end_date)
+
+    return Response(build_sales_rep_scorecard(
+        rep, monthly.get(rep.id, {}), all_time.get(rep.id, {}), start_date, end_date
+    ))
+
+
+@api_view(["GET"])
+def sales_rep_scorecards_view(request):
+    """
+    Scorecards for every sales rep (or a subset) in one response.
+
+    Filters: ids (comma-separated UUIDs), state, business_district.
+    Sorting: sort=<metric> (any current metric or outstanding_all_time),
+    order=asc|desc (default desc), top=N. `count` is the number of
+    scorecards returned, `total` the number of reps that matched.
+    """
+    start_date, end_date, window_start = _scorecard_window(request)
+
+    reps = SalesRepresentative.objects.all()
+    ids = request.GET.get("ids")
+    if ids:
+        try:
+            rep_ids = [uuid.UUID(i.strip()) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            return Response({"error": "ids must be comma-separated UUIDs"}, status=status.HTTP_400_BAD_REQUEST)
+        reps = reps.filter(id__in=rep_ids)
+    if request.GET.get("business_district"):
+        reps = reps.filter(
+            assigned_transformers__feeder__business_district__name__iexact=request.GET["business_district"]
+        )
+    elif request.GET.get("state"):
+        reps = reps.filter(
+            assigned_transformers__feeder__business_district__state__name__iexact=request.GET["state"]
+        )
+    reps = list(reps.distinct().order_by("name"))
+
+    sort = request.GET.get("sort")
+    if sort and sort not in SCORECARD_SORT_FIELDS + ("outstanding_all_time", "name"):
+        return Response({"error": f"Invalid sort field '{sort}'"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        top = int(request.GET["top"]) if request.GET.get("top") else None
+    except ValueError:
+        return Response({"error": "top must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    monthly, all_time = get_sales_rep_monthly_totals(reps, window_start, end_date)
+    scorecards = [
+        build_sales_rep_scorecard(rep, monthly.get(rep.id, {}), all_time.get(rep.id, {}), start_date, end_date)
+        for rep in reps
+    ]
+
+    if sort:
+        if sort == "name":
+            key = lambda card: card["sales_rep"]["name"]
+        elif sort == "outstanding_all_time":
+            key = lambda card: card["outstanding_all_time"]
+        else:
+            key = lambda card: card["current"][sort]["value"]
+        scorecards.sort(key=key, reverse=request.GET.get("order", "desc") != "asc")
+
+    if top is not None:
+        scorecards = scorecards[:max(top, 0)]
+
+    return Response({
+        "count": len(scorecards),
+        "total": len(reps),
+        "results": scorecards
     })
 
 @api_view(["GET"])
@@ -1578,77 +1593,87 @@ def list_sales_reps(request):
 
 
 
+# ─── Comparative views: grouped aggregates ───────────────────────────────────
+# Costs and energy come from one CostAllocationEngine per request; commercial
+# figures are one GROUP BY query with a conditional Sum per period. Neither
+# grows with the number of states / districts / bands.
+
+def _grouped_period_sums(qs, group_field, periods, *fields):
+    """
+    {group: {period_label: {field: total}}} from a single grouped query.
+    `periods` maps a label to the Q selecting that period's rows.
+    """
+    window = Q()
+    for condition in periods.values():
+        window |= condition
+
+    annotations = {
+        f"{label}_{field}": Sum(field, filter=condition)
+        for label, condition in periods.items()
+        for field in fields
+    }
+
+    result = {}
+    for row in qs.filter(window).values(group_field).annotate(**annotations).order_by():
+        result[row[group_field]] = {
+            label: {field: row[f"{label}_{field}"] or Decimal("0") for field in fields}
+            for label in periods
+        }
+    return result
+
+
+def _period_total(grouped, groups, label, field):
+    """Sum one field of `_grouped_period_sums` output over a set of groups."""
+    total = Decimal("0")
+    for group in groups:
+        if group in grouped:
+            total += grouped[group][label][field]
+    return total
+
+
+def _sales_reps_by(transformer_path):
+    """Map each value of `transformer_path` (e.g. feeder__business_district_id) to its sales reps."""
+    through = SalesRepresentative.assigned_transformers.through
+    reps_by_group = {}
+    for rep_id, group in through.objects.values_list(
+        "salesrepresentative_id", f"distributiontransformer__{transformer_path}"
+    ).distinct():
+        reps_by_group.setdefault(group, set()).add(rep_id)
+    return reps_by_group
+
+
 class FinancialAllStatesView(APIView):
     def get(self, request):
         year = int(request.GET.get("year"))
         month = int(request.GET.get("month"))
         target_month = date(year, month, 1)
 
+        engine = CostAllocationEngine([target_month])
+        commercial_by_rep = _grouped_period_sums(
+            MonthlyCommercialSummary.objects.all(), "sales_rep_id",
+            {"current": Q(month=target_month)},
+            "revenue_billed", "revenue_collected",
+        )
+        reps_by_state = _sales_reps_by("feeder__business_district__state_id")
+        myto_tariff = latest_tariff(target_month)
+        # Every state is charged the full NBET and MO invoices, as this view always has
+        nbet_total, mo_total = engine.invoice_totals(target_month)
+
         results = []
 
         for state in State.objects.all():
-            # --- Total Cost (Complete cost calculation) ---
-            # OPEX (both credit and debit)
-            opex_data = Opex.objects.filter(
-                date__year=year,
-                date__month=month,
-                district__state=state
-            ).aggregate(
-                credit_total=Sum("credit"),
-                debit_total=Sum("debit")
-            )
-            
-            opex_total = Decimal(opex_data["credit_total"] or 0) + Decimal(opex_data["debit_total"] or 0)
-
-            # Salaries
-            salary_total = SalaryPayment.objects.filter(
-                month=target_month,
-                district__state=state
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-            # NBET Invoice
-            nbet_total = NBETInvoice.objects.filter(
-                month=target_month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            
-            # MO Invoice
-            mo_total = MOInvoice.objects.filter(
-                month=target_month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-            # Total cost
-            total_cost = opex_total + salary_total + nbet_total + mo_total
+            # --- Total Cost: the state's OPEX + Salaries (financial.allocation) + NBET + MO ---
+            scope = engine.scope_for_states([state.id])
+            costs = engine.costs_for(scope, target_month)
+            total_cost = Decimal(str(costs["opex"] + costs["salaries"])) + nbet_total + mo_total
 
             # --- Revenue Billed and Collections (from MonthlyCommercialSummary) ---
-            sales_reps = SalesRepresentative.objects.filter(
-                assigned_transformers__feeder__business_district__state=state
-            ).distinct()
-
-            commercial_data = MonthlyCommercialSummary.objects.filter(
-                month=target_month,
-                sales_rep__in=sales_reps
-            ).aggregate(
-                revenue_billed=Sum("revenue_billed"),
-                collections=Sum("revenue_collected")
-            )
-
-            revenue_billed = commercial_data["revenue_billed"] or Decimal("0")
-            collections = commercial_data["collections"] or Decimal("0")
+            sales_reps = reps_by_state.get(state.id, set())
+            revenue_billed = _period_total(commercial_by_rep, sales_reps, "current", "revenue_billed")
+            collections = _period_total(commercial_by_rep, sales_reps, "current", "revenue_collected")
 
             # --- Real Tariff Calculations ---
-            # Get energy delivered for tariff calculations
-            energy_delivered = EnergyDelivered.objects.filter(
-                feeder__business_district__state=state,
-                date__year=year,
-                date__month=month
-            ).aggregate(total_energy=Sum("energy_mwh"))["total_energy"] or Decimal("0")
-
-            # MYTO Tariff (get the latest applicable tariff)
-            myto_tariff_obj = MYTOTariff.objects.filter(
-                effective_date__lte=target_month
-            ).order_by("-effective_date").first()
-            
-            myto_tariff = myto_tariff_obj.rate_per_kwh if myto_tariff_obj else Decimal("60")
+            energy_delivered = engine.energy_for(scope, target_month)
 
             # Calculate actual tariff collected (Collections / Energy in kWh)
             if energy_delivered > 0:
@@ -1683,101 +1708,41 @@ class FinancialAllBusinessDistrictsView(APIView):
         if not state_name:
             return Response({"error": "state is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            state = State.objects.get(name__iexact=state_name)
-        except State.DoesNotExist:
+        network = get_network()
+        state = network.states.by_name(state_name)
+        if state is None:
             return Response({"error": "State not found"}, status=status.HTTP_404_NOT_FOUND)
+        district_ids = get_tree().ids_under("state", state.id, "district")
 
         target_month = date(year, month, 1)
-        target_month_end = target_month + relativedelta(months=1)
-        results = []
+        engine = CostAllocationEngine([target_month])
+        commercial_by_rep = _grouped_period_sums(
+            MonthlyCommercialSummary.objects.all(), "sales_rep_id",
+            {"current": Q(month=target_month)},
+            "revenue_billed", "revenue_collected",
+        )
+        reps_by_district = _sales_reps_by("feeder__business_district_id")
+        myto_tariff = latest_tariff(target_month)
 
-        districts = BusinessDistrict.objects.filter(state=state)
+        results = []
 
-        for district in districts:
-            # --- Total Cost Calculation (All cost components) ---
-            # OPEX (both credit and debit)
-            opex_data = Opex.objects.filter(
-                district=district,
-                date__year=year,
-                date__month=month
-            ).aggregate(
-                credit_total=Sum("credit"),
-                debit_total=Sum("debit")
-            )
-            
-            opex_total = Decimal(opex_data["credit_total"] or 0) + Decimal(opex_data["debit_total"] or 0)
-
-            # Salaries for the district
-            salary_total = SalaryPayment.objects.filter(
-                district=district,
-                month=target_month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-            # --- Energy-based NBET/MO Allocation ---
-            # Get district's energy share for proportional allocation
-            district_energy = EnergyDelivered.objects.filter(
-                feeder__business_district=district,
-                date__year=year,
-                date__month=month
-            ).aggregate(total_energy=Sum("energy_mwh"))["total_energy"] or Decimal("0")
-
-            # Total energy delivered across all feeders for the month
-            total_energy = EnergyDelivered.objects.filter(
-                date__year=year,
-                date__month=month
-            ).aggregate(total_energy=Sum("energy_mwh"))["total_energy"] or Decimal("0")
-
-            # Calculate energy share (0-1)
-            energy_share = (district_energy / total_energy) if total_energy > 0 else Decimal("0")
-
-            # NBET Invoice (allocated proportionally)
-            nbet_total = NBETInvoice.objects.filter(
-                month=target_month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            nbet_allocated = nbet_total * energy_share
-
-            # MO Invoice (allocated proportionally)
-            mo_total = MOInvoice.objects.filter(
-                month=target_month
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            mo_allocated = mo_total * energy_share
-
-            # Total cost = OPEX + Salaries + Allocated NBET + Allocated MO
-            total_cost = opex_total + salary_total + nbet_allocated + mo_allocated
+        for district in map(network.districts.get, district_ids):
+            # --- Total Cost: OPEX + Salaries + energy-shared NBET/MO (financial.allocation) ---
+            scope = engine.scope_for_districts([district.id])
+            total_cost = engine.costs_for(scope, target_month)["total"]
+            district_energy = engine.energy_for(scope, target_month)
 
             # --- Revenue Billed and Collections ---
-            sales_reps = SalesRepresentative.objects.filter(
-                assigned_transformers__feeder__business_district=district
-            ).distinct()
-
-            commercial_data = MonthlyCommercialSummary.objects.filter(
-                month=target_month,
-                sales_rep__in=sales_reps
-            ).aggregate(
-                revenue_billed=Sum("revenue_billed"),
-                collections=Sum("revenue_collected")
-            )
-
-            revenue_billed = commercial_data["revenue_billed"] or Decimal("0")
-            collections = commercial_data["collections"] or Decimal("0")
+            sales_reps = reps_by_district.get(district.id, set())
+            revenue_billed = _period_total(commercial_by_rep, sales_reps, "current", "revenue_billed")
+            collections = _period_total(commercial_by_rep, sales_reps, "current", "revenue_collected")
 
             # --- Real Tariff Loss Calculation ---
-            # Get MYTO tariff (latest applicable)
-            myto_tariff_obj = MYTOTariff.objects.filter(
-                effective_date__lte=target_month
-            ).order_by("-effective_date").first()
-            
-            myto_tariff = myto_tariff_obj.rate_per_kwh if myto_tariff_obj else Decimal("60")
-
-            # Calculate actual tariff collected (Collections / Energy in kWh)
             if district_energy > 0:
                 district_energy_kwh = district_energy * 1000  # Convert MWh to kWh
                 actual_tariff_collected = collections / district_energy_kwh
-                billing_tariff = revenue_billed / district_energy_kwh
             else:
                 actual_tariff_collected = Decimal("0")
-                billing_tariff = Decimal("0")
 
             # Tariff Loss = MYTO Tariff - Actual Tariff Collected
             tariff_loss = myto_tariff - actual_tariff_collected
@@ -1803,101 +1768,47 @@ class FinancialServiceBandMetricsView(APIView):
 
         state_name = request.GET.get("state")
         selected_date = date(year, month, 1)
-        selected_end = selected_date + relativedelta(months=1)
 
-        bands = Band.objects.all()
-        results = []
+        # Feeders for every band (filtered by state if provided), loaded once
+        feeders = Feeder.objects.filter(band__isnull=False)
+        if state_name:
+            feeders = feeders.filter(business_district__state__name__iexact=state_name)
 
-        for band in bands:
-            # Get feeders for the band (filtered by state if provided)
-            feeders = Feeder.objects.filter(band=band)
-            if state_name:
-                feeders = feeders.filter(business_district__state__name__iexact=state_name)
+        feeders_by_band = {}
+        for feeder_id, band_id in feeders.values_list("id", "band_id"):
+            feeders_by_band.setdefault(band_id, set()).add(feeder_id)
 
-            if not feeders.exists():
-                continue
+        engine = CostAllocationEngine([selected_date])
+        commercial_by_rep = _grouped_period_sums(
+            MonthlyCommercialSummary.objects.all(), "sales_rep_id",
+            {"current": Q(month=selected_date)},
+            "revenue_billed", "revenue_collected",
+        )
+        reps_by_feeder = _sales_reps_by("feeder_id")
+        myto_tariff = latest_tariff(selected_date)
 
-            # Get distinct business districts tied to the feeders
-            district_ids = feeders.values_list("business_district_id", flat=True).distinct()
+        results = []
 
-            # --- Total Cost Calculation (All cost components) ---
-            # OPEX (both credit and debit) from relevant districts
-            opex_data = Opex.objects.filter(
-                district__in=district_ids,
-                date__year=year,
-                date__month=month
-            ).aggregate(
-                credit_total=Sum("credit"),
-                debit_total=Sum("debit")
-            )
-            
-            opex_total = Decimal(opex_data["credit_total"] or 0) + Decimal(opex_data["debit_total"] or 0)
-
-            # Salaries for the districts
-            salary_total = SalaryPayment.objects.filter(
-                district__in=district_ids,
-                month=selected_date
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-            # --- Energy-based NBET/MO Allocation ---
-            # Get band's energy share for proportional allocation
-            band_energy = EnergyDelivered.objects.filter(
-                feeder__in=feeders,
-                date__year=year,
-                date__month=month
-            ).aggregate(total_energy=Sum("energy_mwh"))["total_energy"] or Decimal("0")
-
-            # Total energy delivered across all feeders for the month
-            total_energy = EnergyDelivered.objects.filter(
-                date__year=year,
-                date__month=month
-            ).aggregate(total_energy=Sum("energy_mwh"))["total_energy"] or Decimal("0")
-
-            # Calculate energy share (0-1)
-            energy_share = (band_energy / total_energy) if total_energy > 0 else Decimal("0")
-
-            # NBET Invoice (allocated proportionally)
-            nbet_total = NBETInvoice.objects.filter(
-                month=selected_date
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            nbet_allocated = nbet_total * energy_share
-
-            # MO Invoice (allocated proportionally)
-            mo_total = MOInvoice.objects.filter(
-                month=selected_date
-            ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-            mo_allocated = mo_total * energy_share
-
-            # Total cost = OPEX + Salaries + Allocated NBET + Allocated MO
-            total_cost = opex_total + salary_total + nbet_allocated + mo_allocated
+        for band in Band.objects.all():
+            band_feeders = feeders_by_band.get(band.id)
+            if not band_feeders:
+                continue
+
+            # --- Total Cost: the band's feeders and their districts (financial.allocation) ---
+            scope = engine.scope_for_feeders(band_feeders)
+            total_cost = engine.costs_for(scope, selected_date)["total"]
+            band_energy = engine.energy_for(scope, selected_date)
 
             # --- Revenue and Collections ---
-            # Get all sales reps tied to feeders via transformers
-            sales_reps = SalesRepresentative.objects.filter(
-                assigned_transformers__feeder__in=feeders
-            ).distinct()
-
-            # Aggregate commercial revenue & collections
-            commercial = MonthlyCommercialSummary.objects.filter(
-                sales_rep__in=sales_reps,
-                month=selected_date
-            ).aggregate(
-                revenue_billed=Sum("revenue_billed"),
-                revenue_collected=Sum("revenue_collected")
-            )
+            # All sales reps tied to the band's feeders via transformers
+            sales_reps = set()
+            for feeder_id in band_feeders:
+                sales_reps |= reps_by_feeder.get(feeder_id, set())
 
-            revenue_billed = commercial["revenue_billed"] or Decimal("0")
-            revenue_collected = commercial["revenue_collected"] or Decimal("0")
+            revenue_billed = _period_total(commercial_by_rep, sales_reps, "current", "revenue_billed")
+            revenue_collected = _period_total(commercial_by_rep, sales_reps, "current", "revenue_collected")
 
             # --- Real Tariff Calculations ---
-            # Get MYTO tariff (latest applicable)
-            myto_tariff_obj = MYTOTariff.objects.filter(
-                effective_date__lte=selected_date
-            ).order_by("-effective_date").first()
-            
-            myto_tariff = myto_tariff_obj.rate_per_kwh if myto_tariff_obj else Decimal("60")
-
-            # Calculate actual tariff collected (Collections / Energy in kWh)
             if band_energy > 0:
                 band_energy_kwh = band_energy * 1000  # Convert MWh to kWh
                 actual_tariff_collected = revenue_collected / band_energy_kwh
@@ -1997,10 +1908,11 @@ def financial_transformer_view(request):
         revenue_billed = summary["revenue_billed"] or 0
         revenue_collected = summary["revenue_collected"] or 0
 
-        total_cost = Opex.objects.filter(
+        # The same district total for every transformer: computed once per request
+        total_cost = memo_aggregate(Opex.objects.filter(
             district=feeder.business_district,
             date__range=(date_from, date_to)
-        ).aggregate(total=Sum("credit"))["total"] or 0
+        ), total=Sum("credit"))["total"] or 0
 
         transformer_data.append({
             "transformer": transformer.name,
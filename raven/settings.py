@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.perf.QueryInstrumentationMiddleware',
+    'common.memo.RequestMemoMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -111,6 +113,26 @@ LOGGING = {
     },
 }
 
+# Per-request query counts and timings (see common/perf.py). Served at /api/_perf/;
+# set PERF_LOG_FILE to also write one JSON line per request for `manage.py perf_report`.
+# /api/_perf/ answers only requests sending PERF_STATS_TOKEN in X-Perf-Token (any request in DEBUG when unset).
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=DEBUG, cast=bool)
+PERF_STATS_TOKEN = config('PERF_STATS_TOKEN', default='')
+PERF_LOG_FILE = config('PERF_LOG_FILE', default='')
+
+if PERF_LOG_FILE:
+    LOGGING['formatters'] = {'message': {'format': '%(message)s'}}
+    LOGGING['handlers']['perf_file'] = {
+        'class': 'logging.FileHandler',
+        'filename': PERF_LOG_FILE,
+        'formatter': 'message',
+    }
+    LOGGING['loggers']['raven.perf'] = {
+        'handlers': ['perf_file'],
+        'level': 'INFO',
+        'propagate': False,
+    }
+
 db_name = config('DB_NAME')
 db_user = config('DB_USER')
 db_password = config('DB_PASSWORD')
@@ -128,9 +150,31 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open between requests (seconds; 0 closes after each request)
+        # and ping them before reuse so a dropped connection doesn't fail a request.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {},
     }
 }
 
+# psycopg 3 connection pool, shared by the threads of a worker process. Django
+# requires CONN_MAX_AGE = 0 with a pool: connections go back to the pool after
+# each request instead of being kept per thread. Install requirements-pool.txt
+# for it; that moves the whole deployment from psycopg2 to psycopg 3.
+if config('DB_POOL', default=False, cast=bool):
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    }
+    if DATABASES['default']['CONN_HEALTH_CHECKS']:
+        DATABASES['default']['OPTIONS']['pool']['check'] = ConnectionPool.check_connection
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -187,6 +231,42 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# Page size of the fact-table viewsets that set pagination_class =
+# common.pagination.KeysetPagination. Lookup endpoints (states, bands, ...)
+# are not paginated and return full lists.
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=100, cast=int)
+
+# Seconds a worker may serve the in-memory MYTO tariff index before reloading it.
+# Local saves invalidate it immediately; the TTL covers edits made by other workers.
+MYTO_TARIFF_INDEX_TTL = config('MYTO_TARIFF_INDEX_TTL', default=300, cast=int)
+
+# Seconds a worker may serve the in-memory network hierarchy (common.dimensions)
+# before reloading it; local saves invalidate it immediately. With
+# NETWORK_SNAPSHOT_WARM the WSGI worker builds it at startup instead of on the
+# first request.
+NETWORK_SNAPSHOT_TTL = config('NETWORK_SNAPSHOT_TTL', default=300, cast=int)
+NETWORK_SNAPSHOT_WARM = config('NETWORK_SNAPSHOT_WARM', default=False, cast=bool)
+
+# Worker threads composite dashboard views (overview endpoints) use to run
+# independent queries concurrently; each holds its own database connection.
+# 1 runs them sequentially on the request thread.
+DASHBOARD_QUERY_CONCURRENCY = config('DASHBOARD_QUERY_CONCURRENCY', default=4, cast=int)
+
+# Background jobs (common.jobs). Queued jobs only run while a
+# `manage.py run_workers` process is up, so deferral is opt-in: with
+# JOB_DEFER_ROWS set, bulk actions whose list payloads hold at least that many
+# rows are queued and answered 202, and the feed summaries are refreshed by a
+# worker instead of inline. Clients can always ask with `Prefer: respond-async`.
+# Failed jobs are retried JOB_MAX_ATTEMPTS times in all, JOB_RETRY_BACKOFF
+# seconds apart doubling per attempt. Workers renew a running job's lease every
+# JOB_HEARTBEAT_SECONDS; one not renewed for JOB_LEASE_SECONDS is taken to
+# belong to a dead worker and handed to another.
+JOB_DEFER_ROWS = config('JOB_DEFER_ROWS', default=0, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=30, cast=int)
+JOB_LEASE_SECONDS = config('JOB_LEASE_SECONDS', default=300, cast=int)
+JOB_HEARTBEAT_SECONDS = config('JOB_HEARTBEAT_SECONDS', default=60, cast=int)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Raven API',
     'VERSION': '1.0.0',
@@ -29,6 +29,7 @@ from commercial.views import (
     SalesRepPerformanceViewSet,
     SalesRepMetricsView,
     DailyCollectionViewSet,
+    MonthlyCommercialSummaryViewSet,
     OverviewAPIView,
 
     CommercialOverviewAPIView,
@@ -70,6 +71,7 @@ from financial.views import (
     financial_overview_view,
     financial_feeder_view,
     sales_rep_performance_view,
+    sales_rep_scorecards_view,
     list_sales_reps,
     FinancialAllStatesView,
     FinancialAllBusinessDistrictsView,
@@ -126,6 +128,7 @@ router.register(r'commercial/collections', DailyCollectionViewSet, basename='dai
 # added this under commercial
 router.register(r'commercial/monthly-revenue-billed', MonthlyRevenueBilledViewSet, basename='monthly-revenue-billed')
 router.register(r'commercial/daily-collections', DailyCollectionViewSet, basename='daily-collections')
+router.register(r'commercial/monthly-commercial-summaries', MonthlyCommercialSummaryViewSet, basename='monthly-commercial-summary')
 
 
 router.register(r'regulatory/energy-offtake', MonthlyEnergyOfftakeViewSet, basename='reg-energy-offtake')
@@ -143,6 +146,8 @@ router.register(r'hr/staff', StaffViewSet, basename='hr-staff')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/_perf/', perf_stats_view, name='perf-stats'),
+    path('api/jobs/<uuid:job_id>/', job_status_view, name='job-status'),
     path('api/', include(router.urls)),
     path('api/overview/', OverviewAPIView.as_view(), name='overview'),
     path('api/metrics/feeder/', FeederMetricsView.as_view(), name='feeder-metrics'),
@@ -169,6 +174,7 @@ urlpatterns = [
     path('api/financial/overview/', financial_overview_view, name='financial-overview'),
     path("api/financial/feeder/", financial_feeder_view),
     path("api/financial/sales-reps/<uuid:rep_id>/performance/", sales_rep_performance_view),
+    path("api/financial/sales-reps/scorecards/", sales_rep_scorecards_view),
     path("api/financial/sales-reps/", list_sales_reps),
     path("api/financial/all-states-metrics/", FinancialAllStatesView.as_view(), name="financial-all-states"),
     path("api/financial/all-business-districts-metrics/", FinancialAllBusinessDistrictsView.as_view(), name="financial-business-districts"),
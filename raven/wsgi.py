@@ -14,3 +14,17 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'raven.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from django.db import DatabaseError, connections  # noqa: E402
+
+if settings.NETWORK_SNAPSHOT_WARM:
+    from common.dimensions import warm_network
+
+    try:
+        warm_network()
+    except DatabaseError:
+        pass  # Database not reachable yet: the first request builds it
+    finally:
+        # Don't hand this connection to forked workers (gunicorn --preload)
+        connections.close_all()
@@ -0,0 +1,44 @@
+# backend/technical/management/commands/derive_hours_of_supply.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.models import Feeder
+from technical.supply import rebuild_hours_of_supply
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill DailyHoursOfSupply from HourlyLoad.\n"
+        "New hourly writes keep the daily table current on their own; "
+        "use this for history or after manual data fixes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="Start date (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", help="End date (YYYY-MM-DD).")
+        parser.add_argument("--feeder", help="Only this feeder (slug).")
+
+    def _parse(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        date_from = self._parse(options["date_from"])
+        date_to = self._parse(options["date_to"])
+
+        feeder_ids = None
+        if options["feeder"]:
+            feeder_ids = list(Feeder.objects.filter(slug=options["feeder"]).values_list("id", flat=True))
+            if not feeder_ids:
+                raise CommandError(f"Feeder '{options['feeder']}' not found")
+
+        written = rebuild_hours_of_supply(date_from, date_to, feeder_ids)
+        self.stdout.write(self.style.SUCCESS(f"✔ Derived hours of supply for {written} feeder-days"))
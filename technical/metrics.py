@@ -70,9 +70,11 @@ def get_top_or_bottom_loaded_feeders(request, top=True, limit=5):
 
 
 
+from common.dimensions import get_network
+from common.tree import get_tree
 from common.models import Feeder
 from django.db.models import Q
-from .models import HourlyLoad, FeederInterruption
+from .models import DailyHoursOfSupply, FeederInterruption
 from datetime import timedelta
 
 def get_feeder_availability_summary(month=None, year=None, from_date=None, to_date=None, state=None, business_district=None):
@@ -88,26 +90,33 @@ def get_feeder_availability_summary(month=None, year=None, from_date=None, to_da
     elif from_date and to_date:
         interruption_filters &= Q(occurred_at__date__range=[from_date, to_date])
 
+    network = get_network()
     if business_district:
-        feeders = Feeder.objects.filter(business_district__name=business_district)
+        feeders = Feeder.objects.filter(business_district_id__in=[
+            district.id for district in network.districts.named(business_district) if district.name == business_district
+        ])
     elif state:
-        feeders = Feeder.objects.filter(business_district__state__name=state)
+        feeders = Feeder.objects.filter(business_district_id__in=[
+            district_id for node in network.states.named(state) if node.name == state
+            for district_id in get_tree().ids_under("state", node.id, "district")
+        ])
     else:
         feeders = Feeder.objects.all()
 
+    # Hours of supply come from the derived daily table in one grouped query
+    supply_by_feeder = dict(
+        DailyHoursOfSupply.objects.filter(feeder__in=feeders, hours_supplied__gt=0)
+        .filter(load_filters)
+        .values("feeder_id")
+        .annotate(avg=Avg("hours_supplied"))
+        .values_list("feeder_id", "avg")
+    )
+
     result = []
     for feeder in feeders:
-        load_data = HourlyLoad.objects.filter(feeder=feeder).filter(load_filters)
         interruption_data = FeederInterruption.objects.filter(feeder=feeder).filter(interruption_filters)
 
-        # Compute daily hours with load > 0
-        daily_hours = {}
-        for entry in load_data:
-            if entry.load_mw > 0:
-                daily_hours.setdefault(entry.date, 0)
-                daily_hours[entry.date] += 1
-
-        avg_supply = round(sum(daily_hours.values()) / len(daily_hours), 2) if daily_hours else 0
+        avg_supply = round(float(supply_by_feeder.get(feeder.id) or 0), 2)
 
         # Compute average duration of interruptions
         durations = [
@@ -130,20 +139,20 @@ def get_feeder_availability_summary(month=None, year=None, from_date=None, to_da
     return result
 
 
-from common.models import DistributionTransformer, Feeder
-from .models import HourlyLoad, FeederInterruption
+from common.models import Feeder
+from .models import DailyHoursOfSupply, FeederInterruption
 from django.db.models import Q
 
 def get_transformer_availability_summary(feeder_slug=None, month=None, year=None, from_date=None, to_date=None):
     if not feeder_slug:
         return []
 
-    try:
-        feeder = Feeder.objects.get(slug=feeder_slug)
-    except Feeder.DoesNotExist:
+    network = get_network()
+    feeder = network.feeders.by_slug(feeder_slug)
+    if feeder is None:
         return []
 
-    transformers = DistributionTransformer.objects.filter(feeder=feeder)
+    transformers = [network.transformers.get(t) for t in network.transformers_of_feeder.get(feeder.id, ())]
 
     load_filters = Q()
     interruption_filters = Q()
@@ -155,35 +164,31 @@ def get_transformer_availability_summary(feeder_slug=None, month=None, year=None
         load_filters &= Q(date__range=[from_date, to_date])
         interruption_filters &= Q(occurred_at__date__range=[from_date, to_date])
 
+    # Load and interruptions are recorded per feeder; transformers inherit their feeder's figures
+    avg_supply = DailyHoursOfSupply.objects.filter(
+        feeder_id=feeder.id, hours_supplied__gt=0
+    ).filter(load_filters).aggregate(avg=Avg("hours_supplied"))["avg"] or 0
+    avg_supply = round(float(avg_supply), 2)
+
+    interruption_data = FeederInterruption.objects.filter(feeder_id=feeder.id).filter(interruption_filters)
+    durations = [
+        (i.restored_at - i.occurred_at).total_seconds() / 3600
+        for i in interruption_data
+        if i.occurred_at and i.restored_at
+    ]
+    avg_duration = round(sum(durations) / len(durations), 2) if durations else 0
+    ftc = interruption_data.count()
+
     result = []
 
     for transformer in transformers:
-        load_data = HourlyLoad.objects.filter(transformer=transformer).filter(load_filters)
-        interruption_data = FeederInterruption.objects.filter(transformer=transformer).filter(interruption_filters)
-
-        # Daily load hours > 0
-        daily_hours = {}
-        for entry in load_data:
-            if entry.load_mw > 0:
-                daily_hours.setdefault(entry.date, 0)
-                daily_hours[entry.date] += 1
-
-        avg_supply = round(sum(daily_hours.values()) / len(daily_hours), 2) if daily_hours else 0
-
-        durations = [
-            (i.restored_at - i.occurred_at).total_seconds() / 3600
-            for i in interruption_data
-            if i.occurred_at and i.restored_at
-        ]
-        avg_duration = round(sum(durations) / len(durations), 2) if durations else 0
-
         result.append({
             "transformer_name": transformer.name,
             "slug": transformer.slug,
             "avg_hours_of_supply": avg_supply,
             "duration_of_interruptions": avg_duration,
             "turnaround_time": avg_duration,
-            "ftc": interruption_data.count(),
+            "ftc": ftc,
         })
 
-    return result
\ No newline at end of file
+    return result
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_alter_distributiontransformer_unique_together'),
+        ('technical', '0003_feederenergydaily_feederenergymonthly'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='energydelivered',
+            index=models.Index(fields=['date', 'feeder'], name='energy_date_feeder_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feederinterruption',
+            index=models.Index(fields=['occurred_at'], name='interruption_occurred_idx'),
+        ),
+    ]
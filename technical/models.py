@@ -11,6 +11,9 @@ class EnergyDelivered(UUIDModel, models.Model):
 
     class Meta:
         unique_together = ('feeder', 'date')
+        indexes = [
+            models.Index(fields=['date', 'feeder'], name='energy_date_feeder_idx'),
+        ]
 
 
 class HourlyLoad(UUIDModel, models.Model):
@@ -71,6 +74,9 @@ class FeederInterruption(UUIDModel, models.Model):
 
     class Meta:
         unique_together = ("feeder", "occurred_at", "interruption_type")
+        indexes = [
+            models.Index(fields=["occurred_at"], name="interruption_occurred_idx"),
+        ]
 
     @property
     def duration_hours(self):
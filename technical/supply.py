@@ -0,0 +1,85 @@
+# technical/supply.py
+from collections import defaultdict
+
+from django.db.models import Count, Q
+
+from .models import HourlyLoad, DailyHoursOfSupply
+
+
+UPSERT_BATCH_SIZE = 1000
+KEY_CHUNK_SIZE = 200
+
+
+def _upsert_hours(rows):
+    """Bulk upsert (feeder_id, date, hours) rows into DailyHoursOfSupply."""
+    objs = [
+        DailyHoursOfSupply(feeder_id=feeder_id, date=day, hours_supplied=hours)
+        for feeder_id, day, hours in rows
+    ]
+    for i in range(0, len(objs), UPSERT_BATCH_SIZE):
+        DailyHoursOfSupply.objects.bulk_create(
+            objs[i:i + UPSERT_BATCH_SIZE],
+            update_conflicts=True,
+            unique_fields=["feeder", "date"],
+            update_fields=["hours_supplied"],
+        )
+    return len(objs)
+
+
+def _hours_by_key(qs):
+    """Count supplied hours (load > 0) per (feeder, date) in an HourlyLoad queryset."""
+    return (
+        qs.values("feeder_id", "date")
+        .annotate(hours=Count("id", filter=Q(load_mw__gt=0)))
+        .order_by()
+    )
+
+
+def refresh_hours_of_supply(keys):
+    """
+    Recompute DailyHoursOfSupply for the given (feeder_id, date) keys only.
+    Hours supplied = number of HourlyLoad rows with load > 0 on that day.
+    Returns the number of daily rows written.
+    """
+    dates_by_feeder = defaultdict(set)
+    for feeder_id, day in keys:
+        dates_by_feeder[feeder_id].add(day)
+
+    if not dates_by_feeder:
+        return 0
+
+    feeder_ids = list(dates_by_feeder)
+    written = 0
+
+    for i in range(0, len(feeder_ids), KEY_CHUNK_SIZE):
+        key_filter = Q()
+        for feeder_id in feeder_ids[i:i + KEY_CHUNK_SIZE]:
+            key_filter |= Q(feeder_id=feeder_id, date__in=dates_by_feeder[feeder_id])
+
+        rows = [
+            (row["feeder_id"], row["date"], row["hours"])
+            for row in _hours_by_key(HourlyLoad.objects.filter(key_filter))
+        ]
+        written += _upsert_hours(rows)
+
+    return written
+
+
+def rebuild_hours_of_supply(date_from=None, date_to=None, feeder_ids=None):
+    """
+    Backfill DailyHoursOfSupply for a date window (and optional feeders)
+    with a single grouped pass over HourlyLoad.
+    """
+    qs = HourlyLoad.objects.all()
+    if date_from:
+        qs = qs.filter(date__gte=date_from)
+    if date_to:
+        qs = qs.filter(date__lte=date_to)
+    if feeder_ids is not None:
+        qs = qs.filter(feeder_id__in=feeder_ids)
+
+    rows = [
+        (row["feeder_id"], row["date"], row["hours"])
+        for row in _hours_by_key(qs).iterator(chunk_size=5000)
+    ]
+    return _upsert_hours(rows)
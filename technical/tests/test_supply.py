@@ -0,0 +1,23 @@
+import pytest
+from datetime import date
+from common.models import InjectionSubstation, Feeder
+from technical.models import HourlyLoad, DailyHoursOfSupply
+from technical.supply import refresh_hours_of_supply
+
+
+@pytest.mark.django_db
+def test_refresh_hours_of_supply_only_touches_given_keys():
+    substation = InjectionSubstation.objects.create(name="SS")
+    feeder = Feeder.objects.create(name="F1", substation=substation)
+
+    for hour, load in [(0, 4.0), (1, 0), (2, 3.5)]:
+        HourlyLoad.objects.create(feeder=feeder, date=date(2025, 3, 1), hour=hour, load_mw=load)
+    HourlyLoad.objects.create(feeder=feeder, date=date(2025, 3, 2), hour=0, load_mw=2.0)
+
+    refresh_hours_of_supply({(feeder.id, date(2025, 3, 1))})
+    assert DailyHoursOfSupply.objects.get(feeder=feeder, date=date(2025, 3, 1)).hours_supplied == 2
+    assert not DailyHoursOfSupply.objects.filter(date=date(2025, 3, 2)).exists()
+
+    HourlyLoad.objects.filter(feeder=feeder, hour=1).update(load_mw=1.0)
+    refresh_hours_of_supply({(feeder.id, date(2025, 3, 1))})
+    assert DailyHoursOfSupply.objects.get(feeder=feeder, date=date(2025, 3, 1)).hours_supplied == 3
@@ -0,0 +1,28 @@
+import pytest
+from common.testing import assert_query_budget
+
+
+# Ceilings measured on build_network(4). Lower them as endpoints are optimised;
+# a rise means a new per-row query (N+1) slipped into technical/views.py.
+QUERY_BUDGETS = [
+    ("/api/metrics/technical-summary/", 5),
+    ("/api/metrics/technical-monthly/", 1),
+    ("/api/technical/overview/?year=2025&month=3", 163),
+    ("/api/technical/overview/all-states/?year=2025&month=3", 29),
+    ("/api/technical/overview/state/?state=Hub&year=2025&month=3", 33),
+    ("/api/technical/overview/business-districts/?state=Hub&year=2025&month=3", 25),
+    ("/api/technical/overview/business-district/?business_district=Hub District 1&year=2025&month=3", 33),
+    ("/api/technical/feeder/?year=2025&month=3", 14),
+    ("/api/technical/service-band-technical-metrics/?year=2025&month=3", 19),
+    ("/api/technical/hourly-load/", 1),
+    ("/api/technical/energy-delivered/", 1),
+    ("/api/technical/feeder-interruptions/?year=2025&month=3", 1),
+    ("/api/technical/hours-of-supply/", 1),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url,budget", QUERY_BUDGETS)
+def test_technical_query_budget(api_client, build_network, url, budget):
+    build_network(4)
+    assert_query_budget(api_client, url, budget)
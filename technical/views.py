@@ -4,6 +4,9 @@ from .models import *
 from .serializers import *
 from commercial.mixins import FeederFilteredQuerySetMixin
 from commercial.date_filters import get_date_range_from_request
+from common.memo import memoize
+from common.mixins import DeferredActionMixin, FastReadMixin, StreamingExportMixin
+from common.pagination import KeysetPagination
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from technical.metrics import (
@@ -18,6 +21,7 @@ from django.db.models import Avg
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from technical.supply import refresh_hours_of_supply
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.db.models import Q
@@ -30,8 +34,10 @@ import pytz # type: ignore
 
 
 
-class EnergyDeliveredViewSet(viewsets.ModelViewSet):
+class EnergyDeliveredViewSet(FastReadMixin, viewsets.ModelViewSet):
     serializer_class = EnergyDeliveredSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', 'feeder')
 
     def get_queryset(self):
         feeders = get_filtered_feeders(self.request)
@@ -67,8 +73,13 @@ class EnergyDeliveredViewSet(viewsets.ModelViewSet):
 
 #         return qs
 
-class HourlyLoadViewSet(viewsets.ModelViewSet):
+class HourlyLoadViewSet(DeferredActionMixin, StreamingExportMixin, FastReadMixin, viewsets.ModelViewSet):
     serializer_class = HourlyLoadSerializer
+    pagination_class = KeysetPagination
+    export_fields = ('id', ('feeder', 'feeder__slug'), 'date', 'hour', 'load_mw')
+    keyset_ordering = ('-date', 'feeder', 'hour')
+    page_size = 500
+    max_page_size = 5000
 
     def get_queryset(self):
         feeders = get_filtered_feeders(self.request)
@@ -87,6 +98,9 @@ class HourlyLoadViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk-update')
     def bulk_update(self, request):
+        deferred = self.defer(request)
+        if deferred:
+            return deferred
         try:
             records = request.data.get('records', [])
             print(f"🔄 Received {len(records)} records for bulk update")
@@ -230,6 +244,14 @@ class HourlyLoadViewSet(viewsets.ModelViewSet):
                     updated_count = len(records_to_update)
                     print(f"✅ Bulk updated {updated_count} existing records")
 
+                # Re-derive daily hours of supply for the touched (feeder, date) keys only
+                touched_keys = {
+                    (r.feeder_id, r.date) for r in records_to_create + records_to_update
+                }
+                if touched_keys:
+                    refreshed = refresh_hours_of_supply(touched_keys)
+                    print(f"🕒 Refreshed hours of supply for {refreshed} feeder-days")
+
             # Response
             response_data = {
                 "success": True,
@@ -261,6 +283,8 @@ class HourlyLoadViewSet(viewsets.ModelViewSet):
 
 class FeederInterruptionViewSet(viewsets.ModelViewSet):
     serializer_class = FeederInterruptionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-occurred_at',)
 
     def get_queryset(self):
         feeders = get_filtered_feeders(self.request)
@@ -271,7 +295,7 @@ class FeederInterruptionViewSet(viewsets.ModelViewSet):
         
         # Only apply date filtering for normal list/detail views
         try:
-            date_from, date_to = get_date_range_from_request(self.request)
+            date_from, date_to = get_period_from_request(self.request)
             qs = FeederInterruption.objects.filter(feeder__in=feeders)
             
             if date_from and date_to:
@@ -451,8 +475,10 @@ class FeederInterruptionViewSet(viewsets.ModelViewSet):
 
     
 
-class DailyHoursOfSupplyViewSet(viewsets.ModelViewSet):
+class DailyHoursOfSupplyViewSet(FastReadMixin, viewsets.ModelViewSet):
     serializer_class = DailyHoursOfSupplySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', 'feeder')
 
     def get_queryset(self):
         feeders = get_filtered_feeders(self.request)
@@ -537,7 +563,7 @@ from django.db.models import Avg, Sum, Count
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
-from technical.models import EnergyDelivered, HourlyLoad, FeederInterruption
+from technical.models import EnergyDelivered, HourlyLoad, FeederInterruption, DailyHoursOfSupply
 from common.models import Feeder
 
 
@@ -553,16 +579,16 @@ def delta(current, previous):
     return round(((current - previous) / previous) * 100, 2)
 
 
+@memoize
 def calculate_hours_of_supply(from_date, to_date):
-    hours = HourlyLoad.objects.filter(
+    hours = DailyHoursOfSupply.objects.filter(
         date__range=(from_date, to_date),
-        load_mw__gt=0
-    ).values('feeder', 'date').annotate(
-        count=Count('hour')
-    ).aggregate(avg=Avg('count'))['avg'] or 0
-    return round(hours, 2)
+        hours_supplied__gt=0
+    ).aggregate(avg=Avg('hours_supplied'))['avg'] or 0
+    return round(float(hours), 2)
 
 
+@memoize
 def get_avg_interruption_duration(from_date, to_date):
     qs = FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -688,11 +714,11 @@ from django.db.models import Avg, Sum, Max
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
-from technical.models import HourlyLoad, FeederInterruption
+from technical.models import HourlyLoad, FeederInterruption, DailyHoursOfSupply
 from common.models import Feeder
 
 
-def get_date_range_from_request(request):
+def get_period_from_request(request):
     mode = request.GET.get("mode", "monthly")
     if mode == "range":
         try:
@@ -712,13 +738,15 @@ def get_date_range_from_request(request):
     return from_date, to_date
 
 
+@memoize
 def calculate_avg_supply(from_date, to_date, feeder_ids):
-    hours = HourlyLoad.objects.filter(
-        date__range=(from_date, to_date), load_mw__gt=0, feeder_id__in=feeder_ids
-    ).values("feeder", "date").annotate(count=Count("hour")).aggregate(avg=Avg("count"))
-    return round(hours["avg"] or 0, 2)
+    hours = DailyHoursOfSupply.objects.filter(
+        date__range=(from_date, to_date), hours_supplied__gt=0, feeder_id__in=feeder_ids
+    ).aggregate(avg=Avg("hours_supplied"))
+    return round(float(hours["avg"] or 0), 2)
 
 
+@memoize
 def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
     interruptions = FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -732,7 +760,7 @@ def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
 
 @api_view(["GET"])
 def all_states_technical_summary(request):
-    from_date, to_date = get_date_range_from_request(request)
+    from_date, to_date = get_period_from_request(request)
 
     states = Feeder.objects.values_list("business_district__state__name", flat=True).distinct()
     overview = []
@@ -776,7 +804,7 @@ from django.db.models import Avg, Sum, Count, Max
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
-from technical.models import HourlyLoad, FeederInterruption, EnergyDelivered
+from technical.models import HourlyLoad, FeederInterruption, EnergyDelivered, DailyHoursOfSupply
 from common.models import Feeder
 
 
@@ -811,13 +839,15 @@ def get_metric_with_history(model_fn, feeder_ids, year, month):
     }
 
 
+@memoize
 def calculate_avg_supply(from_date, to_date, feeder_ids):
-    hours = HourlyLoad.objects.filter(
-        date__range=(from_date, to_date), load_mw__gt=0, feeder_id__in=feeder_ids
-    ).values("feeder", "date").annotate(count=Count("hour")).aggregate(avg=Avg("count"))
-    return hours["avg"] or 0
+    hours = DailyHoursOfSupply.objects.filter(
+        date__range=(from_date, to_date), hours_supplied__gt=0, feeder_id__in=feeder_ids
+    ).aggregate(avg=Avg("hours_supplied"))
+    return float(hours["avg"] or 0)
 
 
+@memoize
 def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
     interruptions = FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -829,6 +859,7 @@ def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
     return total_hours / count if count else 0
 
 
+@memoize
 def calculate_interruptions(from_date, to_date, feeder_ids):
     return FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -836,6 +867,7 @@ def calculate_interruptions(from_date, to_date, feeder_ids):
     ).count()
 
 
+@memoize
 def calculate_energy_delivered(from_date, to_date, feeder_ids):
     return EnergyDelivered.objects.filter(
         date__range=(from_date, to_date),
@@ -921,7 +953,7 @@ from django.db.models import Count, Max, Avg
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
-from technical.models import HourlyLoad, FeederInterruption
+from technical.models import HourlyLoad, FeederInterruption, DailyHoursOfSupply
 from common.models import Feeder
 
 
@@ -960,13 +992,11 @@ def all_business_districts_technical_summary(request):
         feeder_ids = feeders.values_list("id", flat=True)
 
         # Metrics
-        hours_of_supply = HourlyLoad.objects.filter(
+        hours_of_supply = float(DailyHoursOfSupply.objects.filter(
             date__range=(from_date, to_date),
             feeder_id__in=feeder_ids,
-            load_mw__gt=0
-        ).values("feeder", "date").annotate(
-            hours_count=Count("hour")
-        ).aggregate(avg_hours=Avg("hours_count"))["avg_hours"] or 0
+            hours_supplied__gt=0
+        ).aggregate(avg_hours=Avg("hours_supplied"))["avg_hours"] or 0)
 
         interruptions = FeederInterruption.objects.filter(
             occurred_at__date__range=(from_date, to_date),
@@ -1012,7 +1042,7 @@ from django.db.models import Avg, Count, Max
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta # type: ignore
 
-from technical.models import HourlyLoad, FeederInterruption
+from technical.models import HourlyLoad, FeederInterruption, DailyHoursOfSupply
 from common.models import Feeder
 
 
@@ -1051,13 +1081,15 @@ def get_metric_with_history(calc_fn, feeder_ids, year, month):
     }
 
 
+@memoize
 def calculate_avg_supply(from_date, to_date, feeder_ids):
-    hours = HourlyLoad.objects.filter(
-        date__range=(from_date, to_date), feeder_id__in=feeder_ids, load_mw__gt=0
-    ).values("feeder", "date").annotate(hour_count=Count("hour")).aggregate(avg=Avg("hour_count"))
-    return hours["avg"] or 0
+    hours = DailyHoursOfSupply.objects.filter(
+        date__range=(from_date, to_date), feeder_id__in=feeder_ids, hours_supplied__gt=0
+    ).aggregate(avg=Avg("hours_supplied"))
+    return float(hours["avg"] or 0)
 
 
+@memoize
 def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
     interruptions = FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -1068,6 +1100,7 @@ def calculate_avg_interruption_duration(from_date, to_date, feeder_ids):
     return total_duration / interruptions.count() if interruptions.exists() else 0
 
 
+@memoize
 def calculate_avg_interruptions(from_date, to_date, feeder_ids):
     days = (to_date - from_date).days or 1
     total = FeederInterruption.objects.filter(
@@ -1077,6 +1110,7 @@ def calculate_avg_interruptions(from_date, to_date, feeder_ids):
     return total / days
 
 
+@memoize
 def calculate_faults(from_date, to_date, feeder_ids):
     return FeederInterruption.objects.filter(
         occurred_at__date__range=(from_date, to_date),
@@ -1173,7 +1207,7 @@ from rest_framework.response import Response
 from datetime import datetime
 from django.db.models import Avg, Count
 from common.models import Feeder
-from commercial.models import SalesRepresentative
+from commercial.counters import count_customers
 from technical.models import EnergyDelivered
 
 
@@ -1199,10 +1233,7 @@ def service_band_technical_metrics(request):
         # Simulated metrics
         feeder_count = band_feeders.count()
 
-        sales_reps = SalesRepresentative.objects.filter(
-            assigned_transformers__feeder__in=feeder_ids
-        ).distinct()
-        customer_count = sales_reps.count() * 100  # Simulated
+        customer_count = count_customers(transformer__feeder__in=feeder_ids)
 
         avg_peak_load = round(
             EnergyDelivered.objects.filter(